@@ -0,0 +1,486 @@
+"""
+Headless JSON API for SARAL.
+
+A plain ASGI app (no web framework) over the same DatabaseManager,
+SchemeTranslator and RAGChatbot the Streamlit UI uses, served by uvicorn
+with several worker processes. The supervisor process is the single
+writer of the shared index files: it builds the search index, publishes
+it to the index directory and republishes when the data changes. Workers
+map the files read-only (database/shared_index.py), so adding workers
+adds CPU without adding another copy of the index.
+
+Usage:
+    python -m api.server --workers 4 --port 8000
+
+Endpoints (GET unless noted; `language` translates from the cache/LLM):
+    /health
+    /schemes?category=&limit=&offset=&language=
+    /schemes/<id>?language=
+    /search?q=&limit=&language=
+    /autocomplete?q=&limit=
+    /eligibility?age=&income=&gender=&state=&social_category=&occupation=&limit=
+    POST /chat  {"query": "..."}
+    /metrics    (Prometheus text; needs SARAL_METRICS=1)
+
+Read endpoints answer with an ETag and Last-Modified and honour
+If-None-Match / If-Modified-Since with 304s. Their bodies are cached per
+worker until the data signature changes (for autocomplete, also until new
+searches are logged), so a repeat request costs a few MAX(id) lookups
+instead of a search and a JSON encode.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qs
+
+from database.db_manager import DatabaseManager
+from database.search_index import MultilingualSearchIndex
+from database.shared_index import SEARCH_INDEX_FILE, SharedSearchIndex, publish_search_index
+from utils import metrics
+from utils.render_cache import FragmentCache
+
+DEFAULT_DB = 'database/schemes.db'
+DEFAULT_INDEX_DIR = 'database/shared'
+MAX_LIMIT = 100
+MAX_BODY_BYTES = 64 * 1024
+REFRESH_INTERVAL = 5  # Seconds between the supervisor's data-change checks
+RESPONSE_CACHE_ENTRIES = 2000  # Cached response bodies per worker
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Services:
+    """Per-process handles, created on first use (after the worker has started)"""
+
+    def __init__(self, db_name, index_dir):
+        self.db = DatabaseManager(db_name)
+        self.index_dir = index_dir
+        self._lock = threading.RLock()  # The chatbot factory creates the translator
+        self._search = None
+        self._fuzzy = None
+        self._autocomplete = None
+        self._translator = None
+        self._chatbot = None
+        self._chatbot_signature = None
+
+    def _once(self, attribute, factory):
+        value = getattr(self, attribute)
+        if value is None:
+            with self._lock:
+                value = getattr(self, attribute)
+                if value is None:
+                    value = factory()
+                    setattr(self, attribute, value)
+        return value
+
+    @property
+    def search(self):
+        def open_index():
+            path = os.path.join(self.index_dir, SEARCH_INDEX_FILE)
+            if os.path.exists(path):
+                return SharedSearchIndex(path, self.db)
+            # Started without the supervisor: keep a private index
+            return MultilingualSearchIndex(self.db)
+        index = self._once('_search', open_index)
+        index.refresh_if_stale()
+        return index
+
+    @property
+    def fuzzy(self):
+        from database.fuzzy_index import FuzzyIndex
+        index = self._once('_fuzzy', FuzzyIndex)
+        index.sync_if_stale(self.db)
+        return index
+
+    @property
+    def autocomplete(self):
+        from database.autocomplete import AutocompleteIndex
+        index = self._once('_autocomplete', lambda: AutocompleteIndex(self.db))
+        index.refresh_if_stale()
+        return index
+
+    @property
+    def translator(self):
+        from llm.translator import SchemeTranslator
+        return self._once('_translator', lambda: SchemeTranslator(self.db))
+
+    @property
+    def chatbot(self):
+        """The chatbot over the current catalogue; rebuilt after a crawl, snapshot import or dedup run"""
+        from llm.rag_chatbot import RAGChatbot
+        schemes_marker, _, aliases_marker, version = self.db.get_data_signature()
+        signature = (schemes_marker, aliases_marker, version)  # New translations do not change its context
+        with self._lock:
+            if self._chatbot is None or self._chatbot_signature != signature:
+                model = self._chatbot.model if self._chatbot else None  # Keep the model handle
+                self._chatbot = RAGChatbot(self.db.get_all_schemes(canonical_only=True), model=model,
+                                           usage_tracker=self.translator.usage)
+                self._chatbot_signature = signature
+            return self._chatbot
+
+
+def _int_param(params, name, default=None, minimum=0, maximum=None):
+    value = params.get(name, '')
+    if value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be an integer")
+    if number < minimum or (maximum is not None and number > maximum):
+        raise HTTPError(400, f"'{name}' must be between {minimum} and {maximum}")
+    return number
+
+
+def _translate(services, schemes, params, payload):
+    """Translated schemes; flags payload when some fell back to English (not cached)"""
+    language = params.get('language')
+    if not language or language == 'English':
+        return schemes
+    translator = services.translator
+    translated = [translator.translate_scheme(scheme, language) for scheme in schemes]
+    # translate_scheme() returns the source scheme itself when it could not translate
+    if any(t is s for t, s in zip(translated, schemes)):
+        payload['translation_pending'] = True
+    return translated
+
+
+def health(services, params, body):
+    return {'status': 'ok', 'pid': os.getpid(), 'schemes': services.db.get_stats().get('total_schemes', 0)}
+
+
+def list_schemes(services, params, body):
+    limit = _int_param(params, 'limit', 20, 1, MAX_LIMIT)
+    offset = _int_param(params, 'offset', 0)
+    schemes, total = services.db.get_schemes_page(limit, offset, params.get('category') or None,
+                                                  canonical_only=True)
+    payload = {'total': total, 'offset': offset}
+    payload['schemes'] = _translate(services, schemes, params, payload)
+    return payload
+
+
+def get_scheme(services, params, body, scheme_id):
+    scheme = services.db.get_scheme_by_id(scheme_id)
+    if scheme is None:
+        raise HTTPError(404, f"No scheme with id {scheme_id}")
+    payload = {}
+    canonical_id = services.db.get_canonical_id(scheme_id)
+    if canonical_id != scheme_id:
+        payload['canonical_id'] = canonical_id  # Near-duplicate of another listing
+    payload['scheme'] = _translate(services, [scheme], params, payload)[0]
+    return payload
+
+
+def search(services, params, body):
+    query = params.get('q', '').strip()
+    if not query:
+        raise HTTPError(400, "'q' is required")
+    limit = _int_param(params, 'limit', 20, 1, MAX_LIMIT)
+
+    # Same order as the Search tab: index hits, substring matches, then typo-tolerant matches
+    results = services.search.search(query, limit=limit)
+    if len(results) < limit:
+        seen_ids = {s['id'] for s in results}
+        results += [s for s in services.db.search_schemes(query, canonical_only=True) if s['id'] not in seen_ids]
+    suggestion = None
+    if not results:
+        fuzzy = services.fuzzy
+        results = services.db.get_schemes_by_ids([doc_id for doc_id, _ in fuzzy.lookup(query, limit=limit)],
+                                                canonical_only=True)
+        suggestion = fuzzy.suggest(query)
+    payload = {'query': query, 'suggestion': suggestion}
+    payload['schemes'] = _translate(services, results[:limit], params, payload)
+    return payload
+
+
+def autocomplete(services, params, body):
+    limit = _int_param(params, 'limit', 8, 1, 20)
+    return {'completions': services.autocomplete.complete(params.get('q', ''), limit=limit)}
+
+
+def eligibility(services, params, body):
+    profile = {
+        'age': _int_param(params, 'age', maximum=150),
+        'income': _int_param(params, 'income')
+    }
+    for key in ('gender', 'state', 'social_category', 'occupation'):
+        if params.get(key):
+            profile[key] = params[key]
+    limit = _int_param(params, 'limit', 50, 1, MAX_LIMIT)
+    return {'schemes': services.db.match_eligibility(profile, limit=limit, canonical_only=True)}
+
+
+def chat(services, params, body):
+    try:
+        query = (json.loads(body or b'{}').get('query') or '').strip()
+    except (ValueError, AttributeError):
+        raise HTTPError(400, "Body must be a JSON object")
+    if not query:
+        raise HTTPError(400, "'query' is required")
+    try:
+        chatbot = services.chatbot
+    except ValueError as e:  # GOOGLE_API_KEY not configured
+        raise HTTPError(503, str(e))
+    answer = chatbot.chat(query)
+    services.db.log_query(query, answer)
+    return {'query': query, 'answer': answer}
+
+
+ROUTES = {
+    ('GET', '/health'): health,
+    ('GET', '/schemes'): list_schemes,
+    ('GET', '/search'): search,
+    ('GET', '/autocomplete'): autocomplete,
+    ('GET', '/eligibility'): eligibility,
+    ('POST', '/chat'): chat
+}
+
+
+# Responses that depend only on the request and the data signature
+CACHEABLE = {list_schemes, get_scheme, search, autocomplete, eligibility}
+# Extra state some cached responses depend on: completions are ranked by query-log popularity
+SIGNATURE_EXTRAS = {autocomplete: lambda services: services.autocomplete.last_log_id}
+
+
+def route(method, path):
+    """(handler, extra args) for a request, or HTTPError"""
+    path = path.rstrip('/') or '/'
+    handler = ROUTES.get((method, path))
+    if handler:
+        return handler, ()
+    if path.startswith('/schemes/'):
+        if method != 'GET':
+            raise HTTPError(405, "Method not allowed")
+        try:
+            return get_scheme, (int(path[len('/schemes/'):]),)
+        except ValueError:
+            raise HTTPError(404, "Not found")
+    if any(p == path for _, p in ROUTES) or path == '/metrics':
+        raise HTTPError(405, "Method not allowed")
+    raise HTTPError(404, "Not found")
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        if not message.get('more_body'):
+            return body
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+def not_modified(request_headers, etag, last_modified):
+    """RFC 9110 conditional GET: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request_headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags
+    since = request_headers.get('if-modified-since')
+    if since:
+        try:
+            return last_modified <= parsedate_to_datetime(since)
+        except (TypeError, ValueError):  # Unparseable or without a timezone
+            return False
+    return False
+
+
+async def _send(send, status, payload, content_type='application/json; charset=utf-8', headers=()):
+    if not isinstance(payload, bytes):
+        payload = _encode(payload)
+    response_headers = list(headers)
+    if status != 304:
+        response_headers += [(b'content-type', content_type.encode()),
+                             (b'content-length', str(len(payload)).encode())]
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': response_headers
+    })
+    await send({'type': 'http.response.body', 'body': payload if status != 304 else b''})
+
+
+class SaralAPI:
+    """ASGI application"""
+
+    def __init__(self, db_name=None, index_dir=None):
+        self.db_name = db_name or os.getenv('SARAL_DB', DEFAULT_DB)
+        self.index_dir = index_dir or os.getenv('SARAL_INDEX_DIR', DEFAULT_INDEX_DIR)
+        self._services = None
+        self.responses = FragmentCache(RESPONSE_CACHE_ENTRIES, name='api')
+
+    @property
+    def services(self):
+        if self._services is None:
+            self._services = Services(self.db_name, self.index_dir)
+        return self._services
+
+    def respond(self, handler, args, params, body, request_headers):
+        """(status, headers, body); read endpoints are cached and revalidated"""
+        services = self.services
+        if handler not in CACHEABLE:
+            return 200, [], _encode(handler(services, params, body, *args))
+
+        signature = services.db.get_data_signature()
+        if handler in SIGNATURE_EXTRAS:
+            signature += (SIGNATURE_EXTRAS[handler](services),)
+        key = (handler.__name__, args, tuple(sorted(params.items())))
+        entry = self.responses.get(key)
+        if entry is None or entry['signature'] != signature:
+            payload = handler(services, params, body, *args)
+            encoded = _encode(payload)
+            etag = f'"{hashlib.sha1(encoded).hexdigest()[:24]}"'
+            # Unchanged output keeps its date, so If-Modified-Since survives unrelated data changes
+            if entry and entry['etag'] == etag:
+                last_modified = entry['last_modified']
+            else:
+                last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+            entry = {'signature': signature, 'body': encoded, 'etag': etag, 'last_modified': last_modified}
+            if not payload.get('translation_pending'):
+                self.responses.put(key, entry)
+
+        headers = [(b'etag', entry['etag'].encode()),
+                   (b'last-modified', format_datetime(entry['last_modified'], usegmt=True).encode()),
+                   (b'cache-control', b'no-cache')]  # Store, but revalidate before reuse
+        if not_modified(request_headers, entry['etag'], entry['last_modified']):
+            metrics.inc('api_not_modified_total', endpoint=handler.__name__)
+            return 304, headers, b''
+        return 200, headers, entry['body']
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        method, path = scope['method'], scope['path']
+        start = time.perf_counter()
+        status, headers, endpoint = 200, [], 'unknown'
+        try:
+            if method == 'GET' and path == '/metrics':
+                await _send(send, 200, metrics.render_prometheus().encode('utf-8'),
+                            'text/plain; version=0.0.4')
+                return
+            handler, args = route(method, path)
+            endpoint = handler.__name__
+            params = {k: v[0] for k, v in parse_qs(scope['query_string'].decode('latin-1')).items()}
+            body = await _read_body(receive) if method == 'POST' else b''
+            request_headers = {k.decode('latin-1'): v.decode('latin-1') for k, v in scope['headers']}
+            # Handlers block on SQLite and the LLM; keep the event loop free for other requests
+            status, headers, payload = await asyncio.to_thread(
+                self.respond, handler, args, params, body, request_headers
+            )
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            print(f"❌ {method} {path} failed: {e}")
+            status, payload = 500, {'error': 'Internal server error'}
+        await _send(send, status, payload, headers=headers)
+        metrics.observe('api_request_seconds', time.perf_counter() - start,
+                        endpoint=endpoint, status=str(status))
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    # Open the database and shared index before the first request arrives
+                    await asyncio.to_thread(lambda: self.services.search)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._services and self._services._translator:
+                    self._services._translator.usage.flush()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = SaralAPI()
+
+
+def publish_loop(db, index_dir, signature, stop, interval=REFRESH_INTERVAL):
+    """Supervisor thread: republish the shared index whenever the data changes"""
+    while not stop.wait(interval):
+        try:
+            signature = publish_search_index(db, index_dir, signature)
+        except Exception as e:
+            print(f"❌ Index publish failed: {e}")
+
+
+def bind_socket(host, port):
+    """Listening socket for the workers, created with an explicit IPPROTO_TCP.
+
+    asyncio only sets TCP_NODELAY on sockets whose proto is TCP; uvicorn's own
+    multi-worker socket has proto 0, so every response waited ~40 ms for a
+    delayed ACK (Nagle) between the header and body writes.
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the SARAL JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--index-dir', default=DEFAULT_INDEX_DIR)
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+        from uvicorn.supervisors import Multiprocess
+    except ImportError:
+        print("❌ The API server needs uvicorn: pip install uvicorn")
+        raise SystemExit(1)
+
+    # Workers are fresh interpreters; they find the data through the environment
+    os.environ['SARAL_DB'] = args.db
+    os.environ['SARAL_INDEX_DIR'] = args.index_dir
+
+    db = DatabaseManager(args.db)  # Create/upgrade the schema once, before any worker starts
+    start = time.perf_counter()
+    signature = publish_search_index(db, args.index_dir)
+    print(f"✅ Published search index to {args.index_dir} in {time.perf_counter() - start:.2f}s")
+
+    stop = threading.Event()
+    threading.Thread(target=publish_loop, args=(db, args.index_dir, signature, stop),
+                     name='saral-index-publisher', daemon=True).start()
+    config = uvicorn.Config('api.server:app', host=args.host, port=args.port, workers=args.workers,
+                            log_level='warning', access_log=False)
+    sock = bind_socket(args.host, args.port)
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    try:
+        if args.workers > 1:
+            Multiprocess(config, sockets=[sock]).run()
+        else:
+            uvicorn.Server(config).run(sockets=[sock])
+    finally:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
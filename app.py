@@ -1,8 +1,20 @@
 import streamlit as st
 import os
-from scraper.scrape_schemes import SchemesScraper
+import time
 from database.db_manager import DatabaseManager
 from llm.translator import SchemeTranslator
+from llm.request_coalescer import default_coalescer
+from llm.gemini_handler import default_breaker
+from database.job_queue import JobQueue
+from database.search_index import MultilingualSearchIndex
+from database.fuzzy_index import FuzzyIndex
+from database.autocomplete import AutocompleteIndex
+from utils.background_jobs import start_job_runner, JOB_LABELS, PERIODIC_JOBS
+from utils.eligibility import SOCIAL_CATEGORIES, OCCUPATIONS, STATES
+from utils.render_cache import FragmentCache, cached_fragment
+from utils import metrics
+
+SETTLE_SECONDS = 3  # A query left unchanged this long counts as settled even if it is extended later
 
 # Page config
 st.set_page_config(
@@ -32,16 +44,87 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_job_runner():
+    """One background worker pool per server process, shared by all sessions"""
+    return start_job_runner(DatabaseManager())
+
+@st.cache_resource
+def get_search_index():
+    """Multilingual search index shared by all sessions (rebuilt when data changes)"""
+    return MultilingualSearchIndex(DatabaseManager())
+
+@st.cache_resource
+def get_fuzzy_index():
+    """Typo-tolerant title index shared by all sessions (synced when data changes)"""
+    return FuzzyIndex()
+
+@st.cache_resource
+def get_autocomplete_index():
+    """Query completions shared by all sessions (refreshed from data and query_log)"""
+    return AutocompleteIndex(DatabaseManager())
+
+@st.cache_resource
+def get_fragment_cache():
+    """Rendered scheme cards shared by all sessions, keyed by content, language and view"""
+    return FragmentCache()
+
+def scheme_fragment(scheme, view):
+    return cached_fragment(get_fragment_cache(), st.session_state.translator, scheme,
+                           st.session_state.language, view, st.session_state.data_signature)
+
+def use_suggestion(suggestion):
+    st.session_state.search_query = suggestion
+    st.session_state.db.log_query(suggestion, 'selected')
+    st.session_state.pending_query = None
+
+def use_completion():
+    completion = st.session_state.completion
+    st.session_state.completion = None
+    if completion:
+        use_suggestion(completion)
+
+def flush_pending_query():
+    """Log the pending search query (zero-result ones too), once"""
+    pending = st.session_state.get('pending_query')
+    if pending and pending[0] != st.session_state.get('logged_query'):
+        st.session_state.db.log_query(pending[0], f"{pending[1]} results")
+        st.session_state.logged_query = pending[0]
+
+def log_settled_query(query, result_count):
+    """Log the query a user settled on; live input also commits half-typed words"""
+    pending = st.session_state.get('pending_query')
+    if pending and pending[0] == query:
+        return
+    if pending and (not query.startswith(pending[0]) or time.time() - pending[2] >= SETTLE_SECONDS):
+        flush_pending_query()
+    st.session_state.pending_query = (query, result_count, time.time()) if query else None
+
 # Initialize
 if 'db' not in st.session_state:
     st.session_state.db = DatabaseManager()
 
+if 'jobs' not in st.session_state:
+    get_job_runner()
+    st.session_state.jobs = JobQueue(st.session_state.db)
+    # Only announce jobs that finish during this session
+    st.session_state.seen_jobs = {
+        job['id'] for job in st.session_state.jobs.list_jobs(limit=50)
+        if job['status'] not in ('pending', 'running')
+    }
+
 if 'translator' not in st.session_state:
     st.session_state.translator = SchemeTranslator(st.session_state.db)
 
 if 'language' not in st.session_state:
     st.session_state.language = 'English'
 
+# Typing reruns only the search fragment; a full run means the user moved on to another control
+flush_pending_query()
+
+# Part of the card cache key: in-place translation and alias changes re-render cards
+st.session_state.data_signature = st.session_state.db.get_data_signature()
+
 # Sidebar
 with st.sidebar:
     st.markdown("""
@@ -71,21 +154,94 @@ with st.sidebar:
     st.markdown("---")
     
     if st.button("🔄 Load Schemes Data", use_container_width=True):
-        with st.spinner("Loading schemes..."):
-            try:
-                scraper = SchemesScraper()
-                schemes = scraper.scrape_all()
-                st.session_state.db.insert_schemes(schemes)
-                st.success(f"✅ Loaded {len(schemes)} schemes!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error: {e}")
+        job_id, created = st.session_state.jobs.submit('crawl')
+        st.toast("Loading schemes in the background..." if created else "Already loading schemes...")
+    
+    if st.session_state.language != 'English' and st.session_state.translator.llm_configured():
+        if st.button(f"🌐 Translate all to {st.session_state.language}", use_container_width=True):
+            st.session_state.jobs.submit('translate_all', {'language': st.session_state.language})
+            st.toast("Translating in the background...")
+    
+    def show_jobs():
+        """Progress of background jobs; polls only while something is running"""
+        for job in st.session_state.jobs.list_jobs(limit=5):
+            if job['kind'] in PERIODIC_JOBS:
+                continue  # Background maintenance: not something the user asked for
+            label = JOB_LABELS.get(job['kind'], job['kind'])
+            if job['status'] in ('pending', 'running'):
+                st.caption(f"{label} · {job['message'] or 'Waiting for a worker...'}")
+                st.progress(min(job['progress'] or 0, 1.0))
+                if st.button("✖️ Cancel", key=f"cancel_job_{job['id']}", use_container_width=True):
+                    st.session_state.jobs.cancel(job['id'])
+                    st.rerun(scope="fragment")
+            elif job['id'] not in st.session_state.seen_jobs:
+                st.session_state.seen_jobs.add(job['id'])
+                if job['status'] == 'done':
+                    st.toast(f"✅ {label}: done")
+                    st.rerun(scope="app")  # Refresh lists and stats with the new data
+                elif job['status'] == 'failed':
+                    st.error(f"{label} failed: {job['error']}")
+                else:
+                    st.info(f"{label}: cancelled")
+    
+    active_jobs = st.session_state.jobs.list_jobs(limit=1, active_only=True)
+    st.fragment(show_jobs, run_every=2 if active_jobs else None)()
     
     st.markdown("---")
     st.markdown("### 📊 Statistics")
     stats = st.session_state.db.get_stats()
     st.metric("Total Schemes", stats.get('total_schemes', 0))
     st.metric("Cached Translations", stats.get('total_translations', 0))
+    st.metric("Coalesced AI Requests", default_coalescer.get_stats()['coalesced'])
+    
+    if st.session_state.translator.llm_configured():
+        breaker_stats = default_breaker.get_stats()
+        breaker_labels = {
+            'closed': '🟢 Online',
+            'half_open': '🟡 Recovering',
+            'open': '🔴 Offline (showing cached/English)'
+        }
+        st.metric("AI Translation", breaker_labels[breaker_stats['state']])
+        st.caption(f"Recent errors: {breaker_stats['window_failures']}/{breaker_stats['window_calls']} · "
+                   f"Fast-failed: {breaker_stats['rejected']}")
+    else:
+        st.metric("AI Translation", "⚪ Not configured")
+    
+    if metrics.is_enabled():
+        with st.expander("🐞 Performance Metrics"):
+            rows = metrics.registry.snapshot()
+            timings = [
+                {
+                    "metric": r["metric"],
+                    "labels": ", ".join(f"{k}={v}" for k, v in r["labels"].items()),
+                    "calls": r["count"],
+                    "avg (ms)": round(r["avg"] * 1000, 2) if r["metric"].endswith("_seconds") else round(r["avg"], 1),
+                    "p95 ≤": r["p95"]
+                }
+                for r in rows if r["type"] == "histogram"
+            ]
+            counters = [
+                {
+                    "metric": r["metric"],
+                    "labels": ", ".join(f"{k}={v}" for k, v in r["labels"].items()),
+                    "value": r["value"]
+                }
+                for r in rows if r["type"] == "counter"
+            ]
+            if timings:
+                st.dataframe(timings, use_container_width=True, hide_index=True)
+            if counters:
+                st.dataframe(counters, use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇️ Prometheus export",
+                metrics.render_prometheus(),
+                file_name="saral_metrics.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+            if st.button("Reset metrics", use_container_width=True):
+                metrics.registry.reset()
+                st.rerun()
     
     st.markdown("---")
     st.caption("Smart India Hackathon 2025")
@@ -101,7 +257,50 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Tabs
-tab1, tab2, tab3 = st.tabs(["🏠 Browse Schemes", "🔍  Search", "ℹ️ About"])
+@st.fragment
+def search_panel():
+    """Search box with live completions; reruns on its own while the user types"""
+    query = st.text_input("🔎 Enter keywords in any language (e.g., farmer, రైతు, raithu, पेंशन)",
+                          key="search_query", live=True)
+    st.session_state.data_signature = st.session_state.db.get_data_signature()  # Fragment reruns skip the top
+    
+    if query:
+        autocomplete = get_autocomplete_index()
+        autocomplete.refresh_if_stale()
+        completions = autocomplete.complete(query, limit=6)
+        if completions:
+            st.pills("✨ Suggestions", completions, key="completion", on_change=use_completion)
+        
+        # Translated titles and romanized spellings first, then plain substring matches
+        search_index = get_search_index()
+        search_index.refresh_if_stale()
+        results = search_index.search(query, limit=50)
+        seen_ids = {s['id'] for s in results}
+        results += [s for s in st.session_state.db.search_schemes(query, canonical_only=True)
+                    if s['id'] not in seen_ids]
+        
+        fuzzy_index = get_fuzzy_index()
+        fuzzy_index.sync_if_stale(st.session_state.db)
+        if not results:
+            # Nothing matched as typed: fall back to typo-tolerant matching
+            results = st.session_state.db.get_schemes_by_ids(
+                [doc_id for doc_id, _ in fuzzy_index.lookup(query, limit=20)], canonical_only=True
+            )
+        
+        suggestion = fuzzy_index.suggest(query)
+        if suggestion:
+            st.button(f"💡 Did you mean: **{suggestion}**?", on_click=use_suggestion, args=(suggestion,))
+        log_settled_query(query, len(results))
+        st.success(f"📊 Found **{len(results)}** schemes matching '{query}'")
+        
+        if results:
+            for scheme in results:
+                st.markdown(scheme_fragment(scheme, 'card'), unsafe_allow_html=True)
+                st.markdown("---")
+        else:
+            st.info("No schemes found. Try different keywords.")
+
+tab1, tab2, tab3, tab4 = st.tabs(["🏠 Browse Schemes", "🔍  Search", "✅ Am I Eligible?", "ℹ️ About"])
 
 # TAB 1: Browse
 with tab1:
@@ -119,7 +318,7 @@ with tab1:
         ["All", "Telangana State", "Central Government"]
     )
     
-    all_schemes = st.session_state.db.get_all_schemes()
+    all_schemes = st.session_state.db.get_all_schemes(canonical_only=True)
     
     if not all_schemes:
         st.warning("⚠️ No schemes loaded. Click 'Load Schemes Data' button in sidebar.")
@@ -139,27 +338,16 @@ with tab1:
         st.success(f"📊 Showing **{len(schemes)}** schemes (Language: **{st.session_state.language}**)")
         
         for scheme in schemes:
-            display_scheme = st.session_state.translator.translate_scheme(scheme, st.session_state.language)
+            fragment = scheme_fragment(scheme, 'browse')
 
-            with st.expander(f"📄 {display_scheme['title']}", expanded=False):
+            with st.expander(fragment['title'], expanded=False):
                 col1, col2 = st.columns([3, 1])
                 
                 with col1:
-                    st.write("**📝 Description:**")
-                    st.write(display_scheme['description'])
-                    
-                    st.write("**✅ Eligibility:**")
-                    st.write(display_scheme['eligibility'])
-                    
-                    st.write("**💰 Benefits:**")
-                    st.write(display_scheme['benefits'])
+                    st.markdown(fragment['main'])
                 
                 with col2:
-                    st.write(f"**🏷️ Category:**")
-                    st.write(display_scheme['category'])
-                    
-                    if display_scheme.get('url') and display_scheme['url'] != '#':
-                        st.markdown(f"**🔗 [Visit Website]({display_scheme['url']})**")
+                    st.markdown(fragment['side'])
 
 # TAB 2: Search
 with tab2:
@@ -172,29 +360,49 @@ with tab2:
         </div>
     """, unsafe_allow_html=True)
     
-    query = st.text_input("🔎 Enter keywords (e.g., farmer, pension, health, education)")
+    search_panel()
+
+# TAB 3: Eligibility
+with tab3:
+    st.markdown("""
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
+            <h2 style="color: white; margin: 0; text-align: center;">
+                ✅ Find Schemes You May Be Eligible For
+            </h2>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    with st.form("eligibility_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            age = st.number_input("🎂 Age", min_value=0, max_value=120, value=30)
+            gender = st.selectbox("🧑 Gender", ["Any", "female", "male"])
+        with col2:
+            income = st.number_input("💰 Annual family income (Rs.)", min_value=0, value=100000, step=10000)
+            social_category = st.selectbox("👥 Social category", ["Any"] + SOCIAL_CATEGORIES)
+        with col3:
+            state = st.selectbox("📍 State", ["Any"] + STATES)
+            occupation = st.selectbox("💼 Occupation", ["Any"] + OCCUPATIONS,
+                                      format_func=lambda o: o.replace('_', ' ').title())
+        submitted = st.form_submit_button("🔎 Check Eligibility")
     
-    if query:
-        results = st.session_state.db.search_schemes(query)
-        st.success(f"📊 Found **{len(results)}** schemes matching '{query}'")
+    if submitted:
+        # Matched from pre-extracted criteria: no AI call, answers in milliseconds
+        profile = {'age': age, 'income': income}
+        for key, value in (('gender', gender), ('social_category', social_category),
+                           ('state', state), ('occupation', occupation)):
+            if value != "Any":
+                profile[key] = value
+        matches = st.session_state.db.match_eligibility(profile, limit=50, canonical_only=True)
+        st.success(f"📊 You may be eligible for **{len(matches)}** schemes")
+        st.caption("Based on the eligibility text of each scheme - please confirm on the official website.")
         
-        if results:
-            for scheme in results:
-                display_scheme = st.session_state.translator.translate_scheme(scheme, st.session_state.language)
-                st.markdown(f"""
-                    <div class="scheme-card">
-                        <h3>📄 {display_scheme['title']}</h3>
-                        <p><strong>🏷️ Category:</strong> {display_scheme['category']}</p>
-                        <p><strong>📝 Description:</strong> {display_scheme['description']}</p>
-                        <p><strong>💰 Benefits:</strong> {display_scheme['benefits']}</p>
-                    </div>
-                """, unsafe_allow_html=True)
-                st.markdown("---")
-        else:
-            st.info("No schemes found. Try different keywords.")
+        for scheme in matches:
+            st.markdown(scheme_fragment(scheme, 'eligibility'), unsafe_allow_html=True)
 
-# TAB 3: About
-with tab3:
+# TAB 4: About
+with tab4:
     st.markdown("""
         <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
@@ -219,6 +427,9 @@ with tab3:
         st.write("- Keyword-based search")
         st.write("- Filter by category")
         st.write("")
+        st.write("✅ **Eligibility Check**")
+        st.write("- Instant matching by age, income, category and occupation")
+        st.write("")
         st.write("✅ **User-Friendly Design**")
         st.write("- Clean interface")
         st.write("- Mobile responsive")
@@ -247,6 +458,12 @@ Cloud:     Streamlit Cloud
             st.metric("🌐 Cached Translations", stats.get('total_translations', 0))
         with col_b:
             st.metric("💬 Categories", len(stats.get('by_category', {})))
+            st.metric("🔎 Searches", stats.get('total_queries', 0))
+        
+        top_queries = st.session_state.db.get_top_queries(days=7, limit=5)
+        if top_queries:
+            st.markdown("**🔥 Popular searches this week:**")
+            st.write(", ".join(f"{query} ({count})" for query, count in top_queries))
         
         st.markdown("---")
         
@@ -0,0 +1,101 @@
+"""
+Cold-start benchmark: module import time and first render of app.py.
+
+Each sample runs in a fresh interpreter so nothing is cached in-process.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import database.db_manager, llm.translator, llm.request_coalescer, utils.metrics
+import sys
+print('IMPORT_MS', round((time.perf_counter() - start) * 1000, 3))
+heavy = ['google.generativeai', 'requests', 'bs4', 'dotenv']
+print('LOADED', ','.join(m for m in heavy if m in sys.modules))
+"""
+
+RENDER_SNIPPET = """
+import time
+from streamlit.testing.v1 import AppTest
+ready = time.perf_counter()  # Exclude the test harness's own import
+at = AppTest.from_file('app.py', default_timeout=120).run()
+done = time.perf_counter()
+assert not at.exception, at.exception
+print('RENDER_MS', round((done - ready) * 1000, 3))
+"""
+
+
+def run_snippet(snippet, cwd):
+    """Run snippet in a fresh interpreter; return its 'KEY value' output lines as a dict"""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONWARNINGS='ignore')
+    output = subprocess.run(
+        [sys.executable, '-c', snippet], cwd=cwd, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    values = {}
+    for line in output.splitlines():
+        key, _, value = line.partition(' ')
+        if key.isupper():
+            values[key] = value.strip()
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SARAL cold-start benchmark")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument('--skip-render', action='store_true', help="Only measure imports")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    print("=" * 50)
+    print("COLD START BENCHMARK")
+    print("=" * 50)
+
+    results = {}
+
+    import_ms = []
+    loaded = ''
+    for _ in range(args.runs):
+        values = run_snippet(IMPORT_SNIPPET, ROOT)
+        import_ms.append(float(values['IMPORT_MS']))
+        loaded = values.get('LOADED', '')
+    results['import_ms'] = statistics.median(import_ms)
+    results['heavy_modules_at_import'] = [m for m in loaded.split(',') if m]
+    print(f"   Core module import:   {results['import_ms']:.1f} ms (median of {args.runs})")
+    print(f"   Heavy modules loaded: {', '.join(results['heavy_modules_at_import']) or 'none'}")
+
+    if not args.skip_render:
+        render_ms = []
+        # Render against a scratch copy so the real database is untouched
+        with tempfile.TemporaryDirectory() as workdir:
+            shutil.copy(os.path.join(ROOT, 'app.py'), workdir)
+            os.makedirs(os.path.join(workdir, 'database'))
+            for _ in range(args.runs):
+                values = run_snippet(RENDER_SNIPPET, workdir)
+                render_ms.append(float(values['RENDER_MS']))
+        results['first_render_ms'] = statistics.median(render_ms)
+        print(f"   First render app.py:  {results['first_render_ms']:.1f} ms (median of {args.runs})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
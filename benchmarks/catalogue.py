@@ -0,0 +1,143 @@
+import random
+
+# Vocabulary drawn from the real scheme data so LIKE/keyword paths behave realistically
+PREFIXES = ['Pradhan Mantri', 'Mukhyamantri', 'Telangana', 'National', 'Rashtriya',
+            'State', 'Rural', 'Integrated', 'Kalyana', 'Rythu', 'Aasara', 'Mission']
+SUBJECTS = ['Kisan', 'Awas', 'Pension', 'Scholarship', 'Health', 'Bima', 'Mudra',
+            'Ujjwala', 'Bhagiratha', 'Lakshmi', 'Bandhu', 'Vidya', 'Arogya', 'Jyoti']
+SUFFIXES = ['Scheme', 'Yojana', 'Programme', 'Abhiyan', 'Nidhi', 'Kit']
+CATEGORIES = ['Telangana State', 'Central Government']
+GROUPS = ['farmers', 'elderly citizens', 'widows', 'students', 'pregnant women',
+          'street vendors', 'artisans', 'BPL families', 'disabled persons', 'small businesses']
+BENEFITS = ['Rs. {amount} per month pension amount directly to bank account',
+            'Rs. {amount} per acre per season',
+            'One-time payment of Rs. {amount}',
+            'Loans up to Rs. {amount} without collateral',
+            'Health cover of Rs. {amount} per family per year']
+# Syllables for pseudo scheme names, so large catalogues get a realistically large vocabulary
+SYLLABLES = ['ra', 'thu', 'ban', 'dhu', 'ka', 'lya', 'na', 'lak', 'shmi', 'aa', 'sa', 'bha',
+             'gi', 'ra', 'tha', 'vi', 'dya', 'jyo', 'ti', 'su', 'kan', 'ya', 'ma', 'ha',
+             'sree', 'nidhi', 'pra', 'ga', 'ti', 'shak', 'ti', 'ro', 'sh', 'ni']
+ELIGIBILITY = ['Age {age}+ for {group}',
+               'SC/ST/BC/Minority {group} with annual income less than Rs. {lakhs} lakhs',
+               'All {group} in Telangana',
+               '{group} aged 18-{age} years']
+
+
+def pseudo_name(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def generate_schemes(count, seed=42):
+    """Generate a synthetic catalogue shaped like scraped_schemes.json"""
+    rng = random.Random(seed)
+    schemes = []
+    for i in range(count):
+        group = rng.choice(GROUPS)
+        title = f"{rng.choice(PREFIXES)} {pseudo_name(rng)} {rng.choice(SUBJECTS)} {rng.choice(SUFFIXES)} {i}"
+        schemes.append({
+            'title': title,
+            'description': (f"Financial assistance to {group} under {title}. "
+                            f"Direct benefit transfer to bank account."),
+            'category': rng.choice(CATEGORIES),
+            'url': f"https://schemes.example.gov.in/{i}",
+            'eligibility': rng.choice(ELIGIBILITY).format(
+                age=rng.randint(18, 70), group=group, lakhs=rng.randint(1, 5)
+            ),
+            'benefits': rng.choice(BENEFITS).format(amount=f"{rng.randint(1, 100) * 1000:,}")
+        })
+    return schemes
+
+
+def generate_queries(count, seed=7):
+    """Search queries mixing hits (vocabulary words) and misses"""
+    rng = random.Random(seed)
+    vocabulary = SUBJECTS + SUFFIXES + ['farmer', 'pension', 'health', 'loan', 'widow']
+    return [rng.choice(vocabulary) if rng.random() < 0.9 else f"missing{i}" for i in range(count)]
+
+
+def misspell(word, rng):
+    """Apply one random typo (drop, double or swap a letter)"""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(['drop', 'double', 'swap'])
+    if edit == 'drop':
+        return word[:i] + word[i + 1:]
+    if edit == 'double':
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def generate_typo_queries(schemes, count, seed=11):
+    """Misspelled two-word queries taken from scheme titles"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(schemes)['title'].split()[:-1]
+        start = rng.randrange(len(words) - 1)
+        queries.append(' '.join(misspell(w.lower(), rng) for w in words[start:start + 2]))
+    return queries
+
+
+def generate_duplicates(schemes, count, seed=13):
+    """Copies of random schemes as another portal would list them: reworded title, extra boilerplate"""
+    rng = random.Random(seed)
+    duplicates = []
+    for i in range(count):
+        source = rng.choice(schemes)
+        words = source['title'].split()
+        if rng.random() < 0.5:
+            words[-2] = rng.choice(SUFFIXES)
+        duplicates.append({
+            **source,
+            'title': ' '.join(words),
+            'description': source['description'] + rng.choice([
+                '', ' Apply online or at the nearest Mee Seva centre.', ' Submit the application form with documents.'
+            ]),
+            'url': f"https://portal.example.com/schemes/{i}"
+        })
+    return duplicates
+
+
+STATES = ['Andhra Pradesh', 'Assam', 'Bihar', 'Gujarat', 'Karnataka', 'Kerala', 'Maharashtra',
+          'Odisha', 'Punjab', 'Rajasthan', 'Tamil Nadu', 'Telangana', 'Uttar Pradesh', 'West Bengal']
+
+
+def generate_pages(schemes, per_page=10, site='www.telangana.gov.in'):
+    """(url, html) listing pages shaped like a state portal: shared site chrome around scheme-item cards"""
+    header = ['<!DOCTYPE html>', '<html lang="en">', '<head>', '<meta charset="utf-8">',
+              '<title>Schemes | Government of Telangana</title>']
+    header += [f'<link rel="stylesheet" href="/themes/portal/css/{name}.css?v=20250117">'
+               for name in ('bootstrap.min', 'style', 'responsive', 'accessibility', 'print')]
+    header += [f'<script src="/themes/portal/js/{name}.js?v=20250117"></script>'
+               for name in ('jquery.min', 'bootstrap.bundle.min', 'menu', 'font-resize', 'analytics')]
+    header += ['</head>', '<body class="page-schemes">', '<a class="skip-link" href="#main">Skip to main content</a>',
+               '<nav class="state-menu"><ul>']
+    header += [f'<li><a href="/state/{state.lower().replace(" ", "-")}">{state}</a></li>' for state in STATES]
+    header += ['</ul></nav>', '<nav class="main-menu"><ul>']
+    header += [f'<li class="menu-item"><a href="/{item.lower()}">{item}</a></li>'
+               for item in ('Home', 'Departments', 'Schemes', 'Services', 'Notifications', 'Tenders',
+                            'RTI', 'Contact', 'Help', 'Sitemap')]
+    header += ['</ul></nav>', '<main id="main"><h1>Welfare Schemes</h1>']
+    footer = ['</main>', '<footer><div class="footer-links"><ul>']
+    footer += [f'<li><a href="/{item.lower().replace(" ", "-")}">{item}</a></li>'
+               for item in ('Website Policies', 'Terms and Conditions', 'Copyright Policy', 'Hyperlinking Policy',
+                            'Privacy Policy', 'Accessibility Statement', 'Feedback', 'Help')]
+    footer += ['</ul></div>', '<p>Content owned and maintained by the Information Technology, Electronics &amp; '
+               'Communications Department, Government of Telangana.</p>',
+               '<p>Best viewed in Chrome, Firefox and Edge at 1366x768 resolution.</p>',
+               '</footer>', '</body>', '</html>']
+
+    pages = []
+    for start in range(0, len(schemes), per_page):
+        cards = []
+        for scheme in schemes[start:start + per_page]:
+            cards += ['<div class="scheme-item">',
+                      f'<h3>{scheme["title"]}</h3>',
+                      f'<p>{scheme["description"]}</p>',
+                      f'<a href="{scheme["url"]}">Read more</a>',
+                      '</div>']
+        html = '\n'.join(header + cards + footer) + '\n'
+        pages.append((f"https://{site}/schemes?page={start // per_page}", html.encode('utf-8')))
+    return pages
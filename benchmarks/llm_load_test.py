@@ -0,0 +1,205 @@
+"""
+Load test for the LLM pipeline against the local simulator (llm/simulator.py).
+
+Concurrent synthetic users translate schemes (SchemeTranslator), simplify
+text (GeminiHandler) and ask the chatbot questions (RAGChatbot, streamed)
+against a fresh synthetic catalogue per user count. Reports throughput,
+p50/p95/p99 latency per operation, chat time to first chunk, model calls
+per operation and quota errors, so the effect of caching, coalescing,
+rate limiting and the circuit breaker can be measured without an API key.
+
+Popular schemes are requested far more often than the rest, as in real
+traffic, so the translation cache warms up during a run.
+
+Usage:
+    python -m benchmarks.llm_load_test
+    python -m benchmarks.llm_load_test --users 1 8 32 --duration 30 \\
+        --model "latency=lognormal:0.8:0.4,tps=60,rpm=60" --min-interval 0
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.catalogue import generate_schemes, generate_queries
+from benchmarks.run_benchmarks import percentile, LANGUAGES
+from database.db_manager import DatabaseManager
+from llm.circuit_breaker import CircuitBreaker
+from llm.gemini_handler import GeminiHandler
+from llm.rag_chatbot import RAGChatbot
+from llm.simulator import SimulatedModel
+from llm.translator import SchemeTranslator
+
+DEFAULT_MODEL = "latency=lognormal:0.6:0.5,tps=80,rpm=60,seed=1"
+OPERATIONS = ('translate', 'simplify', 'chat')
+
+
+def parse_mix(spec):
+    """'translate=5,simplify=2,chat=3' -> {operation: weight}"""
+    mix = {}
+    for item in spec.split(','):
+        operation, _, weight = item.partition('=')
+        if operation not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{operation}' (one of {', '.join(OPERATIONS)})")
+        mix[operation] = float(weight or 1)
+    return mix
+
+
+def popular_index(rng, count):
+    """Heavy-tailed scheme choice: a few schemes get most of the traffic"""
+    return min(count, int(rng.paretovariate(1.1))) - 1
+
+
+def summarize(samples):
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 1),
+        'p95_ms': round(percentile(samples, 95) * 1000, 1),
+        'p99_ms': round(percentile(samples, 99) * 1000, 1)
+    }
+
+
+def run_level(users, args, schemes, queries, workdir):
+    """Drive `users` concurrent users for args.duration seconds against a fresh database"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(workdir, f'llm_load_{users}.db'))
+        db.insert_schemes(schemes)
+        stored = db.get_all_schemes(canonical_only=True)
+
+        model = SimulatedModel.from_spec(args.model)
+        breaker = CircuitBreaker()
+        handler = GeminiHandler(model=model, breaker=breaker)
+        handler.min_request_interval = args.min_interval
+        translator = SchemeTranslator(db, gemini=handler)
+        chatbot = RAGChatbot(stored, model=model, usage_tracker=translator.usage)
+
+    operations, weights = zip(*args.mix.items())
+    latencies = {operation: [] for operation in operations}
+    first_chunk = []
+    degraded = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def user(number):
+        rng = random.Random(args.seed * 1000 + number)
+        local = {operation: [] for operation in operations}
+        local_first, local_degraded = [], 0
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            scheme = stored[popular_index(rng, len(stored))]
+            start = time.perf_counter()
+            if operation == 'translate':
+                result = translator.translate_scheme(scheme, rng.choice(LANGUAGES))
+                failed = result is scheme  # Fell back to English
+            elif operation == 'simplify':
+                failed = handler.simplify_text(scheme['description']) == scheme['description']
+            else:
+                chunks = []
+                for chunk in chatbot.chat_stream(rng.choice(queries)):
+                    if not chunks:
+                        local_first.append(time.perf_counter() - start)
+                    chunks.append(chunk)
+                failed = ''.join(chunks).startswith('Sorry')
+            local[operation].append(time.perf_counter() - start)
+            local_degraded += failed
+            if args.think:
+                time.sleep(rng.expovariate(1 / args.think))
+        with lock:
+            for operation, samples in local.items():
+                latencies[operation].extend(samples)
+            first_chunk.extend(local_first)
+            degraded[0] += local_degraded
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        translator.usage.flush()
+
+    completed = sum(len(samples) for samples in latencies.values())
+    stats = model.get_stats()
+    return {
+        'users': users,
+        'operations': completed,
+        'degraded': degraded[0],
+        'ops_per_sec': round(completed / elapsed, 2),
+        'latency': summarize([sample for samples in latencies.values() for sample in samples]),
+        'by_operation': {operation: summarize(samples) for operation, samples in latencies.items()},
+        'chat_first_chunk': summarize(first_chunk),
+        'model_calls': stats['calls'],
+        'calls_per_operation': round(stats['calls'] / completed, 3) if completed else None,
+        'quota_errors': stats['quota_errors'],
+        'breaker_opened': breaker.get_stats()['times_opened'],
+        'tokens': stats['prompt_tokens'] + stats['completion_tokens']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SARAL LLM pipeline load test (simulated model)")
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 4, 16],
+                        help="Concurrent user counts to compare (default: 1 4 16)")
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds of load per user count")
+    parser.add_argument('--size', type=int, default=2000, help="Synthetic catalogue size")
+    parser.add_argument('--model', default=DEFAULT_MODEL,
+                        help=f"Simulator spec (default: {DEFAULT_MODEL}; see llm/simulator.py)")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('translate=5,simplify=2,chat=3'),
+                        help="Operation weights (default: translate=5,simplify=2,chat=3)")
+    parser.add_argument('--min-interval', type=float, default=1.0,
+                        help="GeminiHandler spacing between model calls in seconds (production: 1)")
+    parser.add_argument('--think', type=float, default=0.0, help="Mean think time between a user's requests")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    SimulatedModel.from_spec(args.model)  # Fail on a bad spec before building anything
+
+    print("=" * 50)
+    print("SARAL LLM LOAD TEST")
+    print("=" * 50)
+    print(f"   Model: {args.model}")
+    print(f"   {args.size:,} schemes, {args.duration:.0f}s per level, "
+          f"min interval {args.min_interval}s, mix {args.mix}")
+
+    schemes = generate_schemes(args.size)
+    queries = generate_queries(256)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for users in args.users:
+            result = run_level(users, args, schemes, queries, workdir)
+            results.append(result)
+            latency = result['latency']
+            print(f"\n👥 {users} user(s): {result['ops_per_sec']:.2f} ops/s, "
+                  f"{result['operations']} operations ({result['degraded']} degraded)")
+            if latency['count']:
+                print(f"   latency p50 {latency['p50_ms']} ms   p95 {latency['p95_ms']} ms   "
+                      f"p99 {latency['p99_ms']} ms")
+            for operation, summary in result['by_operation'].items():
+                if summary['count']:
+                    print(f"   {operation:<10} {summary['count']:>6}   p50 {summary['p50_ms']:>9} ms   "
+                          f"p95 {summary['p95_ms']:>9} ms   p99 {summary['p99_ms']:>9} ms")
+            if result['chat_first_chunk']['count']:
+                print(f"   chat first chunk p50 {result['chat_first_chunk']['p50_ms']} ms   "
+                      f"p95 {result['chat_first_chunk']['p95_ms']} ms")
+            print(f"   🤖 {result['model_calls']} model calls ({result['calls_per_operation']} per operation), "
+                  f"{result['quota_errors']} quota errors, breaker opened {result['breaker_opened']}x, "
+                  f"{result['tokens']:,} tokens")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'model': args.model, 'size': args.size, 'results': results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Load test for the headless API (api/server.py).
+
+Starts the server on a synthetic catalogue once per worker count, drives it
+with keep-alive HTTP clients in separate processes (so the client is not
+the bottleneck) and reports requests/sec, latency and the combined memory
+(PSS, Linux only) of the server processes.
+
+Usage:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --workers 1 2 4 8 --size 100000 --duration 20
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+from benchmarks.catalogue import generate_schemes, generate_queries, generate_typo_queries
+from benchmarks.run_benchmarks import percentile
+from database.db_manager import DatabaseManager
+from utils.eligibility import OCCUPATIONS, SOCIAL_CATEGORIES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_paths(schemes, count, seed=3):
+    """Request mix: search, autocomplete, eligibility, browse and detail pages"""
+    rng = random.Random(seed)
+    queries = generate_queries(count, seed) + generate_typo_queries(schemes, count // 10, seed)
+    paths = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            paths.append(f"/search?q={quote(rng.choice(queries))}&limit=20")
+        elif kind < 0.6:
+            query = rng.choice(queries)
+            paths.append(f"/autocomplete?q={quote(query[:rng.randint(1, len(query))])}")
+        elif kind < 0.75:
+            paths.append(f"/eligibility?age={rng.randint(18, 80)}&income={rng.randint(1, 10) * 50000}"
+                         f"&social_category={rng.choice(SOCIAL_CATEGORIES)}"
+                         f"&occupation={rng.choice(OCCUPATIONS)}&limit=20")
+        elif kind < 0.9:
+            paths.append(f"/schemes?limit=20&offset={rng.randrange(len(schemes))}")
+        else:
+            paths.append(f"/schemes/{rng.randint(1, len(schemes))}")
+    return paths
+
+
+def client_process(port, paths, connections, duration, seed):
+    """Run `connections` keep-alive clients for `duration` seconds; returns (latencies, errors)"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def run(offset):
+        rng = random.Random(seed * 1000 + offset)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local = []
+        failed = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request('GET', rng.choice(paths))
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    failed += 1
+                else:
+                    local.append(time.perf_counter() - start)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def process_tree(pid):
+    """pid and all of its descendants (Linux /proc)"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def total_pss_kb(pid):
+    """Proportional set size of a process tree: shared pages counted once in total"""
+    total = 0
+    for member in process_tree(pid):
+        try:
+            with open(f'/proc/{member}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total or None
+
+
+def wait_ready(port, server, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def run_level(workers, args, db_path, index_dir, paths):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'api.server', '--workers', str(workers), '--port', str(args.port),
+         '--db', db_path, '--index-dir', index_dir],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(args.port, server)
+        # Warm every worker's lazily built per-process state before measuring
+        client_process(args.port, paths, args.connections, 2.0, seed=0)
+
+        with multiprocessing.Pool(args.clients) as pool:
+            started = time.perf_counter()
+            results = pool.starmap(client_process, [
+                (args.port, paths, args.connections, args.duration, seed) for seed in range(1, args.clients + 1)
+            ])
+            elapsed = time.perf_counter() - started
+        memory = total_pss_kb(server.pid)
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    latencies = [sample for samples, _ in results for sample in samples]
+    return {
+        'workers': workers,
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in results),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'pss_mb': round(memory / 1024, 1) if memory else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SARAL API load test")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help="Server worker counts to compare (default: 1 2 4)")
+    parser.add_argument('--size', type=int, default=10_000, help="Synthetic catalogue size")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument('--clients', type=int, default=4, help="Client processes")
+    parser.add_argument('--connections', type=int, default=4, help="Keep-alive connections per client")
+    parser.add_argument('--port', type=int, default=8790)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    print("=" * 50)
+    print("SARAL API LOAD TEST")
+    print("=" * 50)
+    print(f"   {os.cpu_count()} CPU(s), {args.size:,} schemes, "
+          f"{args.clients}x{args.connections} connections, {args.duration:.0f}s per level")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, 'load.db')
+        schemes = generate_schemes(args.size)
+        DatabaseManager(db_path).insert_schemes(schemes)
+        paths = build_paths(schemes, 2000)
+
+        for workers in args.workers:
+            result = run_level(workers, args, db_path, os.path.join(workdir, 'shared'), paths)
+            results.append(result)
+            speedup = result['rps'] / results[0]['rps'] if results[0]['rps'] else 0
+            print(f"   {workers:>2} worker(s): {result['rps']:>8.1f} req/s ({speedup:.2f}x)   "
+                  f"p50 {result['p50_ms']} ms   p95 {result['p95_ms']} ms   "
+                  f"errors {result['errors']}   memory {result['pss_mb']} MB PSS")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'size': args.size, 'cpus': os.cpu_count(), 'results': results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
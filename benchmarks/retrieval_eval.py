@@ -0,0 +1,204 @@
+"""
+Retrieval quality and cost for chatbot context (llm/retrieval.py).
+
+Runs the labeled questions in data/retrieval_queries.json against the
+scraped schemes and reports, per retrieval method, recall@k, MRR and
+latency. 'keyword' is the chatbot's former retrieval: the first schemes
+containing any question word, in catalogue order.
+
+Each question belongs to a split. The reranker weights are chosen on the
+'tune' split (--tune grid-searches them); results are reported on the
+held-out 'test' split unless --split says otherwise.
+
+--distractors mixes synthetic schemes into the (shuffled) catalogue to
+measure latency at scale. They borrow real scheme names and phrasing, so
+they often answer generic questions without being labeled: recall then
+understates quality and is only comparable between methods.
+
+--rerank-depths compares reranking depths; their 'agreement' column needs no
+labels, so it is meaningful with distractors: the share of the top
+CONTEXT_SIZE that reranking every first-stage candidate would pick.
+
+The context table shows what each extra scheme of context buys in recall and
+costs in prompt tokens, for choosing RAGChatbot's context_size.
+
+Usage:
+    python -m benchmarks.retrieval_eval
+    python -m benchmarks.retrieval_eval --split tune --tune
+    python -m benchmarks.retrieval_eval --split all --distractors 10000 --rerank-depths 5 10 20 50
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import time
+
+from benchmarks.catalogue import generate_schemes
+from benchmarks.run_benchmarks import percentile
+from llm.rag_chatbot import CONTEXT_SIZE, format_context
+from llm.retrieval import HybridRetriever, RERANK_DEPTH, RERANK_WEIGHTS
+from llm.usage_tracker import estimate_tokens
+
+METHODS = ['keyword', 'lexical', 'vector', 'hybrid', 'rerank']
+
+# Values tried per reranker weight by --tune
+WEIGHT_GRID = {
+    'fusion': [0.0, 0.25, 0.5, 1.0],
+    'overlap': [0.5, 1.0, 2.0],
+    'title': [0.5, 1.0, 2.0],
+    'category': [0.0, 0.3, 0.6],
+    'eligibility': [0.0, 0.5, 1.0]
+}
+
+
+def keyword_rank(schemes, question, limit):
+    """The former RAGChatbot.search_schemes: any-word substring hits in list order"""
+    words = question.lower().split()
+    hits = []
+    for doc, scheme in enumerate(schemes):
+        text = f"{scheme['title']} {scheme['description']} {scheme['eligibility']} {scheme['benefits']}".lower()
+        if any(word in text for word in words):
+            hits.append(doc)
+            if len(hits) == limit:
+                break
+    return hits
+
+
+def evaluate(rank, labeled, ks):
+    """recall@k for each k, MRR within max(ks) and latency of rank(question, limit)"""
+    depth = max(ks)
+    recalls = {k: [] for k in ks}
+    reciprocal_ranks, latencies = [], []
+    for question, relevant in labeled:
+        start = time.perf_counter()
+        ranked = rank(question, depth)
+        latencies.append(time.perf_counter() - start)
+        for k in ks:
+            recalls[k].append(len(relevant.intersection(ranked[:k])) / len(relevant))
+        first = next((i for i, doc in enumerate(ranked, 1) if doc in relevant), None)
+        reciprocal_ranks.append(1 / first if first else 0.0)
+    return {
+        'recall': {k: round(statistics.mean(values), 3) for k, values in recalls.items()},
+        'mrr': round(statistics.mean(reciprocal_ranks), 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2)
+    }
+
+
+def tune_weights(retriever, labeled, ks):
+    """Grid-search the reranker weights for MRR, then recall@min(ks).
+    Ties go to the weights closest to the current ones: the smallest change that scores best."""
+    def objective(weights):
+        retriever.weights = weights
+        result = evaluate(lambda question, limit: retriever.rank(question, 'rerank', limit), labeled, ks)
+        return result['mrr'], result['recall'][min(ks)]
+
+    def distance(weights):
+        return sum(abs(weights[name] - RERANK_WEIGHTS[name]) for name in RERANK_WEIGHTS)
+
+    candidates = [dict(zip(WEIGHT_GRID, values)) for values in itertools.product(*WEIGHT_GRID.values())]
+    if RERANK_WEIGHTS not in candidates:
+        candidates.append(dict(RERANK_WEIGHTS))
+    scored = [(objective(weights), weights) for weights in candidates]
+    retriever.weights = dict(RERANK_WEIGHTS)
+    best_score = max(score for score, _ in scored)
+    tied = [weights for score, weights in scored if score == best_score]
+    return min(tied, key=distance), best_score, len(tied) - 1
+
+
+def print_row(label, result, ks):
+    recalls = '  '.join(f"R@{k} {result['recall'][k]:.3f}" for k in ks)
+    agreement = f"   agreement {result['agreement']:.3f}" if 'agreement' in result else ''
+    print(f"   {label:<14} {recalls}   MRR {result['mrr']:.3f}   "
+          f"p50 {result['p50_ms']:>7.2f} ms   p95 {result['p95_ms']:>7.2f} ms{agreement}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate chatbot retrieval on the labeled query set")
+    parser.add_argument('--queries', default='data/retrieval_queries.json')
+    parser.add_argument('--schemes', default='data/scraped_schemes.json')
+    parser.add_argument('--distractors', type=int, default=0, help="Synthetic schemes mixed in")
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 3, 5, 10], help="Cutoffs for recall@k")
+    parser.add_argument('--rerank-depths', type=int, nargs='+', default=[RERANK_DEPTH],
+                        help="Candidates per retriever to rerank; several values compare them")
+    parser.add_argument('--split', choices=['test', 'tune', 'all'], default='test',
+                        help="Questions to evaluate on (weights are tuned on 'tune')")
+    parser.add_argument('--tune', action='store_true', help="Grid-search the reranker weights")
+    parser.add_argument('--seed', type=int, default=5)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    ks = sorted(args.k)
+
+    with open(args.schemes, 'r', encoding='utf-8') as f:
+        schemes = json.load(f)
+    with open(args.queries, 'r', encoding='utf-8') as f:
+        queries = json.load(f)
+    schemes = schemes + generate_schemes(args.distractors)
+    random.Random(args.seed).shuffle(schemes)
+    positions = {scheme['title']: doc for doc, scheme in enumerate(schemes)}
+    labeled = [(q['query'], {positions[title] for title in q['relevant']}) for q in queries
+               if args.split in ('all', q['split'])]
+
+    print("=" * 50)
+    print("CHAT RETRIEVAL EVALUATION")
+    print("=" * 50)
+    start = time.perf_counter()
+    retriever = HybridRetriever(schemes)
+    print(f"   {len(labeled)} labeled questions ({args.split} split), {len(schemes):,} schemes, "
+          f"index built in {time.perf_counter() - start:.2f}s\n")
+
+    if args.tune:
+        if args.split == 'test':
+            parser.error("--tune on the held-out test split; use --split tune")
+        weights, (mrr, recall), ties = tune_weights(retriever, labeled, ks)
+        print(f"🎛️ Best weights {weights}: MRR {mrr:.3f}, R@{min(ks)} {recall:.3f} "
+              f"({ties} other combinations tie)\n")
+        retriever.weights = weights
+
+    results = {}
+    for method in METHODS:
+        if method == 'keyword':
+            rank = lambda question, limit: keyword_rank(schemes, question, limit)
+        else:
+            rank = lambda question, limit, method=method: retriever.rank(question, method, limit)
+        results[method] = evaluate(rank, labeled, ks)
+        print_row(method, results[method], ks)
+
+    if len(args.rerank_depths) > 1:
+        # Labels cannot judge a distractor that answers the question too; agreement with
+        # reranking every first-stage candidate measures what a shallower depth gives up
+        retriever.rerank_depth = retriever.depth
+        reference = {question: retriever.rank(question, 'rerank', CONTEXT_SIZE) for question, _ in labeled}
+        print(f"\n🎚️ Rerank depth (agreement: share of the top {CONTEXT_SIZE} that reranking all "
+              f"{retriever.depth} candidates per retriever picks)")
+        results['rerank_depths'] = {}
+        for depth in args.rerank_depths:
+            retriever.rerank_depth = depth
+            result = evaluate(lambda question, limit: retriever.rank(question, 'rerank', limit), labeled, ks)
+            result['agreement'] = round(statistics.mean(
+                len(set(retriever.rank(question, 'rerank', CONTEXT_SIZE)) & set(ranked)) / len(ranked)
+                for question, ranked in reference.items() if ranked
+            ), 3)
+            results['rerank_depths'][depth] = result
+            print_row(f"depth {depth}", result, ks)
+        retriever.rerank_depth = RERANK_DEPTH
+
+    print("\n📏 Context size vs prompt cost (rerank)")
+    results['context'] = {}
+    for k in ks:
+        tokens = [estimate_tokens(format_context(retriever.retrieve(question, k))) for question, _ in labeled]
+        results['context'][k] = {'recall': results['rerank']['recall'][k], 'tokens': round(statistics.mean(tokens))}
+        print(f"   {k:>2} scheme(s): recall {results['rerank']['recall'][k]:.3f}   "
+              f"~{results['context'][k]['tokens']} context tokens")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'schemes': len(schemes), 'queries': len(labeled), 'split': args.split,
+                       'weights': retriever.weights, 'results': results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
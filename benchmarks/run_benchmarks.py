@@ -0,0 +1,304 @@
+"""
+Benchmark suite for the DB, search, retrieval and translation hot paths.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 100 10000 --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.catalogue import (generate_schemes, generate_queries, generate_typo_queries, generate_duplicates,
+                                  generate_pages)
+from database.db_manager import DatabaseManager
+from database.autocomplete import AutocompleteIndex
+from database.dedup import dedupe_catalogue
+from database.fuzzy_index import FuzzyIndex
+from database.snapshot import export_snapshot, import_snapshot
+from utils.eligibility import SOCIAL_CATEGORIES, OCCUPATIONS
+from utils.render_cache import FragmentCache, cached_fragment, render_fragment
+from database.search_index import MultilingualSearchIndex
+from scraper.page_store import PageStore, reparse
+
+DEFAULT_SIZES = [100, 10_000, 100_000]
+LANGUAGES = ['Hindi', 'Telugu', 'Tamil', 'Kannada']
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(operation, size, func, iterations, max_seconds):
+    """Time func(i) for up to `iterations` runs, then record peak memory of one extra run"""
+    samples = []
+    budget_end = time.perf_counter() + max_seconds
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(0)  # Warm-up
+        for i in range(iterations):
+            start = time.perf_counter()
+            func(i)
+            samples.append(time.perf_counter() - start)
+            if time.perf_counter() > budget_end:
+                break
+
+        tracemalloc.start()
+        func(len(samples))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    total = sum(samples)
+    return {
+        'operation': operation,
+        'size': size,
+        'iterations': len(samples),
+        'p50_ms': round(statistics.median(samples) * 1000, 4),
+        'p95_ms': round(percentile(samples, 95) * 1000, 4),
+        'mean_ms': round(total / len(samples) * 1000, 4),
+        'throughput_ops': round(len(samples) / total, 2) if total else None,
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def make_translator(db):
+    """SchemeTranslator wired to a zero-latency fake model"""
+    from llm.circuit_breaker import CircuitBreaker
+    from llm.fake_model import FakeModel
+    from llm.gemini_handler import GeminiHandler
+    from llm.translator import SchemeTranslator
+
+    gemini = GeminiHandler(model=FakeModel(), breaker=CircuitBreaker())
+    gemini.min_request_interval = 0
+    return SchemeTranslator(db, gemini=gemini)
+
+
+def run_size(size, iterations, max_seconds, workdir):
+    """Run every benchmark against a catalogue of `size` schemes"""
+    from llm.fake_model import FakeModel
+    from llm.rag_chatbot import RAGChatbot
+
+    print(f"\n📦 Catalogue size: {size:,}")
+    rng = random.Random(size)
+    schemes = generate_schemes(size)
+    queries = generate_queries(256)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(workdir, f'bench_{size}.db'))
+
+    # Heavy full-table operations get fewer runs on big catalogues
+    heavy_iterations = iterations if size < 100_000 else min(iterations, 5)
+    results = []
+
+    def run(operation, func, runs=iterations):
+        result = measure(operation, size, func, runs, max_seconds)
+        print(f"   {operation:<28} p50 {result['p50_ms']:>10.3f} ms   "
+              f"p95 {result['p95_ms']:>10.3f} ms   "
+              f"{result['throughput_ops'] or 0:>10.1f} ops/s   "
+              f"peak {result['peak_memory_kb']:>10.1f} KB")
+        results.append(result)
+
+    run('insert_schemes', lambda i: db.insert_schemes(schemes), heavy_iterations)
+    ids = [s['id'] for s in db.get_all_schemes()]
+
+    run('get_all_schemes', lambda i: db.get_all_schemes(), heavy_iterations)
+    run('search_schemes', lambda i: db.search_schemes(queries[i % len(queries)]), heavy_iterations)
+    run('filter_by_category', lambda i: db.filter_by_category('Telangana State'), heavy_iterations)
+    run('get_scheme_by_id', lambda i: db.get_scheme_by_id(rng.choice(ids)))
+
+    profiles = [{
+        'age': rng.randint(18, 80),
+        'income': rng.randint(50, 500) * 1000,
+        'social_category': rng.choice(SOCIAL_CATEGORIES),
+        'gender': rng.choice(['female', 'male']),
+        'state': rng.choice(['Telangana', 'Karnataka']),
+        'occupation': rng.choice(OCCUPATIONS)
+    } for _ in range(64)]
+    run('match_eligibility', lambda i: db.match_eligibility(profiles[i % len(profiles)], limit=20))
+
+    translation = {
+        'title': 'शीर्षक', 'description': 'विवरण',
+        'eligibility': 'पात्रता', 'benefits': 'लाभ'
+    }
+    run('save_translation', lambda i: db.save_translation(rng.choice(ids), rng.choice(LANGUAGES), translation))
+    run('get_translation', lambda i: db.get_translation(rng.choice(ids), rng.choice(LANGUAGES)))
+
+    search_index = MultilingualSearchIndex(db)
+    run('search_index_build', lambda i: search_index.build(), heavy_iterations)
+    keystrokes = [q[:n] for q in queries for n in range(2, len(q) + 1)]
+    run('search_index_keystroke', lambda i: search_index.search_ids(keystrokes[i % len(keystrokes)]),
+        iterations * 10)
+
+    autocomplete = AutocompleteIndex(db)
+    run('autocomplete_build', lambda i: autocomplete.build(), heavy_iterations)
+    for query in generate_queries(500, seed=size):
+        db.log_query(query, '')
+    autocomplete.refresh()
+    run('get_stats', lambda i: db.get_stats())
+    run('compact_query_log', lambda i: db.compact_query_log(), heavy_iterations)
+    run('autocomplete_keystroke', lambda i: autocomplete.complete(keystrokes[i % len(keystrokes)]),
+        iterations * 10)
+
+    fuzzy_index = FuzzyIndex()
+    run('fuzzy_index_build', lambda i: FuzzyIndex().sync(db), heavy_iterations)
+    fuzzy_index.sync(db)
+    typo_queries = generate_typo_queries(schemes, 256)
+    run('fuzzy_lookup', lambda i: fuzzy_index.lookup(typo_queries[i % len(typo_queries)]))
+    run('fuzzy_suggest', lambda i: fuzzy_index.suggest(typo_queries[i % len(typo_queries)]))
+
+    snapshot_path = os.path.join(workdir, f'bench_{size}.snapshot')
+    run('snapshot_export', lambda i: export_snapshot(db.db_name, snapshot_path), heavy_iterations)
+    replica_path = os.path.join(workdir, f'replica_{size}.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        DatabaseManager(replica_path)
+    run('snapshot_import', lambda i: import_snapshot(snapshot_path, replica_path), heavy_iterations)
+
+    model = FakeModel()
+    run('rag_build_context', lambda i: RAGChatbot(schemes, model=model), heavy_iterations)
+    chatbot = RAGChatbot(schemes, model=model)
+    run('rag_search_schemes', lambda i: chatbot.search_schemes(queries[i % len(queries)]), heavy_iterations)
+
+    translator = make_translator(db)
+    all_schemes = db.get_all_schemes()
+    cold_language = 'Marathi'  # Not used by save_translation above, so every call misses
+    run('translate_scheme_cold',
+        lambda i: translator.translate_scheme(all_schemes[i % len(all_schemes)], cold_language))
+    run('translate_scheme_cached',
+        lambda i: translator.translate_scheme(all_schemes[0], cold_language))
+    memory = translator.memory.get_stats()
+    print(f"   translation memory: {memory['reused']}/{memory['segments']} segments reused "
+          f"({memory['reuse_ratio']:.0%}), ~{memory['tokens_saved']:,} tokens saved, "
+          f"{translator.gemini.model.calls} model calls")
+
+    # One page of search results re-rendered per Streamlit rerun
+    page = all_schemes[:20]
+    with contextlib.redirect_stdout(io.StringIO()):  # translate_scheme() reports progress
+        for scheme in page:
+            translator.translate_scheme(scheme, cold_language)
+    run('render_cards_uncached', lambda i: [
+        render_fragment(translator.translate_scheme(scheme, cold_language), 'card') for scheme in page
+    ])
+    fragments = FragmentCache()
+    run('render_cards_cached', lambda i: [
+        cached_fragment(fragments, translator, scheme, cold_language, 'card') for scheme in page
+    ])
+
+    # Raw page archive: up to 200 listing pages of one site
+    pages = generate_pages(schemes[:2000])
+    store = PageStore(os.path.join(workdir, f'pages_{size}.db'))
+    run('page_store_put', lambda i: store.put(*pages[i % len(pages)]), len(pages))
+    digests = [store.put(url, body) for url, body in pages]
+    run('page_store_get', lambda i: store.get(digests[i % len(digests)]))
+    run('page_store_reparse', lambda i: reparse(store, workers=1), heavy_iterations)
+    storage = store.get_stats()
+    _, parsed = reparse(store, workers=1)
+    print(f"   page store: {storage['raw_bytes'] / 1024:,.0f} KB raw -> {storage['stored_bytes'] / 1024:,.0f} KB "
+          f"stored ({storage['ratio']:.1f}x, {store.codec}); re-parse {parsed['pages_per_second']} pages/s, "
+          f"{parsed['mb_per_second']} MB/s")
+
+    # Last: reloads the catalogue with 5% near-duplicates from a second "portal"
+    duplicates = generate_duplicates(schemes, max(1, size // 20))
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.insert_schemes(schemes + duplicates)
+    run('dedupe_catalogue', lambda i: dedupe_catalogue(db), 1 if size >= 100_000 else heavy_iterations)
+    injected = set(sorted(s['id'] for s in db.get_all_schemes())[-len(duplicates):])
+    aliases = db.get_scheme_aliases()
+    linked = sum(1 for alias_id, canonical_id in aliases.items() if alias_id in injected or canonical_id in injected)
+    print(f"   dedup: {linked:,}/{len(duplicates):,} injected duplicates linked, "
+          f"{len(aliases) - linked:,} other links")
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline_path, threshold):
+    """Print p50/p95 deltas against a previous JSON run; return number of regressions"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    previous = {(r['size'], r['operation']): r for r in baseline['results']}
+    regressions = 0
+
+    print(f"\n📈 Comparison against {baseline_path} ({baseline['meta'].get('git_revision')})")
+    for result in current['results']:
+        old = previous.get((result['size'], result['operation']))
+        if not old:
+            continue
+        change = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] if old['p50_ms'] else 0
+        flag = ''
+        if change > threshold:
+            flag = '  ⚠️ regression'
+            regressions += 1
+        print(f"   {result['size']:>7,} {result['operation']:<28} "
+              f"p50 {old['p50_ms']:.3f} -> {result['p50_ms']:.3f} ms ({change:+.1%}){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SARAL hot-path benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Catalogue sizes to generate (default: 100 10000 100000)")
+    parser.add_argument('--iterations', type=int, default=30, help="Runs per operation")
+    parser.add_argument('--max-seconds', type=float, default=10.0, help="Time budget per operation")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    parser.add_argument('--compare', help="Previous JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="p50 slowdown counted as a regression (default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    print("=" * 50)
+    print("SARAL BENCHMARK SUITE")
+    print("=" * 50)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations
+        },
+        'results': []
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            report['results'].extend(run_size(size, args.iterations, args.max_seconds, workdir))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    regressions = 0
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+
+    print("=" * 50)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+In-memory query autocomplete.
+
+Completions come from scheme titles (and their cached translations),
+categories, frequent words and popular past queries from query_log. Phrases
+are kept in a sorted array, so a prefix maps to one contiguous range via
+bisect; a max-segment-tree over the scores then yields the top-N of any
+range in O(N log n), however many phrases share the prefix.
+
+Scheme-derived phrases are rebuilt when the data signature changes; query
+popularity is folded in incrementally from rows logged since the last
+refresh.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from database.db_manager import DatabaseManager
+from utils.transliteration import tokenize
+
+TITLE_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+TERM_WEIGHT = 1.0  # Scaled by log(document frequency)
+QUERY_WEIGHT = 2.0  # Scaled by log(1 + times searched)
+MIN_TERM_DOCS = 2  # Words must appear in this many schemes to be suggested
+MIN_QUERY_COUNT = 2  # Past queries must repeat before they are suggested
+MAX_QUERIES = 5000
+REFRESH_INTERVAL = 30  # Seconds between query_log polls while typing
+
+SPACES = re.compile(r'\s+')
+
+
+def normalize(text):
+    return SPACES.sub(' ', (text or '').casefold()).strip()
+
+
+class RangeTopK:
+    """Top-k scores within any index range of a fixed array (max segment tree)"""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.size = 1
+        while self.size < max(1, len(scores)):
+            self.size *= 2
+        # Leaves hold indexes into scores; -1 marks padding
+        self.tree = [-1] * (2 * self.size)
+        self.tree[self.size:self.size + len(scores)] = range(len(scores))
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = self._better(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def _better(self, a, b):
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        return a if self.scores[a] >= self.scores[b] else b
+
+    def argmax(self, lo, hi):
+        """Index of the highest score in [lo, hi), or -1 if the range is empty"""
+        best = -1
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, self.tree[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def top(self, lo, hi, k):
+        """Indexes of the k highest scores in [lo, hi), best first"""
+        results = []
+        best = self.argmax(lo, hi)
+        heap = [(-self.scores[best], best, lo, hi)] if best >= 0 else []
+        while heap and len(results) < k:
+            _, index, start, end = heapq.heappop(heap)
+            results.append(index)
+            for sub_lo, sub_hi in ((start, index), (index + 1, end)):
+                sub_best = self.argmax(sub_lo, sub_hi)
+                if sub_best >= 0:
+                    heapq.heappush(heap, (-self.scores[sub_best], sub_best, sub_lo, sub_hi))
+        return results
+
+
+class PhraseTable:
+    """Sorted normalized phrases with display text and scores"""
+
+    def __init__(self, phrases):
+        # phrases: {normalized: (display, score)}
+        self.keys = sorted(phrases)
+        self.display = [phrases[key][0] for key in self.keys]
+        self.scores = [phrases[key][1] for key in self.keys]
+        self.ranking = RangeTopK(self.scores)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def top(self, prefix, k):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\U0010ffff', lo)
+        return [(self.keys[i], self.display[i], self.scores[i]) for i in self.ranking.top(lo, hi, k)]
+
+
+class AutocompleteIndex:
+    def __init__(self, db_manager: DatabaseManager = None):
+        self.db = db_manager or DatabaseManager()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # One session polls query_log at a time
+        self.base = PhraseTable({})
+        self.base_scores = {}
+        self.queries = PhraseTable({})
+        self.query_counts = Counter()
+        self.query_display = {}
+        self.last_log_id = 0
+        self.signature = None
+        self.refreshed_at = None
+
+    def build(self):
+        """Rebuild scheme-derived phrases (titles, translations, categories, frequent words)"""
+        signature = self.db.get_data_signature()
+        phrases = {}
+
+        def add(text, score):
+            key = normalize(text)
+            if key and score > phrases.get(key, (None, 0))[1]:
+                phrases[key] = (text.strip(), score)
+
+        doc_freq = Counter()
+        display_word = {}
+        for scheme in self.db.get_all_schemes():
+            add(scheme['title'], TITLE_WEIGHT)
+            add(scheme['category'], CATEGORY_WEIGHT)
+            words = set()
+            for field in ('title', 'eligibility', 'benefits'):
+                for word in tokenize(scheme.get(field)):
+                    if len(word) >= 3 and not word.isdigit():
+                        words.add(word.casefold())
+                        display_word.setdefault(word.casefold(), word)
+            doc_freq.update(words)
+
+        for translation in self.db.get_all_translations():
+            add(translation.get('translated_title') or '', TITLE_WEIGHT)
+
+        for word, count in doc_freq.items():
+            if count >= MIN_TERM_DOCS:
+                add(display_word[word], TERM_WEIGHT * math.log(count))
+
+        table = PhraseTable(phrases)
+        with self._lock:
+            self.base = table
+            self.base_scores = {key: score for key, (_, score) in phrases.items()}
+            self.signature = signature
+        self._rebuild_queries()
+        return len(table)
+
+    def _rebuild_queries(self):
+        popular = [(key, count) for key, count in self.query_counts.most_common(MAX_QUERIES)
+                   if count >= MIN_QUERY_COUNT]
+        # A searched phrase keeps its base score and gains popularity on top
+        table = PhraseTable({
+            key: (self.query_display[key],
+                  self.base_scores.get(key, 0) + QUERY_WEIGHT * math.log1p(count))
+            for key, count in popular
+        })
+        with self._lock:
+            self.queries = table
+
+    def refresh_if_stale(self, max_age=REFRESH_INTERVAL):
+        """refresh() at most every max_age seconds (cheap to call per keystroke)"""
+        if self.refreshed_at is None or time.monotonic() - self.refreshed_at >= max_age:
+            return self.refresh()
+        return False
+
+    def refresh(self):
+        """Rebuild on data changes; fold in queries logged since the last refresh"""
+        # Another session already refreshing: its result is good enough for this keystroke
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self.refreshed_at = time.monotonic()
+            if self.db.get_data_signature() != self.signature:
+                self.build()
+
+            last_id, counts = self.db.get_query_counts(after_id=self.last_log_id)
+            if not counts:
+                return False
+            for query, count in counts:
+                key = normalize(query)
+                if key:
+                    self.query_counts[key] += count
+                    self.query_display.setdefault(key, query.strip())
+            self.last_log_id = last_id
+            self._rebuild_queries()
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def complete(self, prefix, limit=8):
+        """Up to `limit` completions for prefix, most popular first"""
+        key = normalize(prefix)
+        if not key:
+            return []
+
+        with self._lock:
+            base, queries = self.base, self.queries
+        # Popular queries carry their full score; base candidates they shadow are skipped
+        candidates = {k: (score, text) for k, text, score in queries.top(key, limit)}
+        for k, text, score in base.top(key, limit * 2):
+            if k not in candidates and len(candidates) < limit * 2:
+                candidates[k] = (score, text)
+
+        ranked = sorted(candidates.items(), key=lambda item: (-item[1][0], item[0]))
+        return [text for k, (score, text) in ranked if k != key][:limit]
+
+
+# Test autocomplete
+if __name__ == "__main__":
+    import json
+    import os
+    import tempfile
+
+    print("=" * 50)
+    print("AUTOCOMPLETE TEST")
+    print("=" * 50)
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'autocomplete.db'))
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        db.insert_schemes(json.load(f))
+    for query in ['pension for widows'] * 3 + ['pm kisan'] * 2 + ['pension']:
+        db.log_query(query, '')
+
+    index = AutocompleteIndex(db)
+    print(f"   Indexed {index.build()} phrases")
+    index.refresh()
+    for prefix in ['p', 'pen', 'ka', 'tel', 'far', 'zzz']:
+        print(f"   {prefix:<6} -> {index.complete(prefix, limit=5)}")
+    print("=" * 50)
@@ -1,6 +1,40 @@
 import sqlite3
 import json
+import os
+import threading
 from datetime import datetime
+from utils.metrics import timed
+from utils.eligibility import extract_eligibility, SOCIAL_CATEGORIES, OCCUPATIONS
+
+# Bump whenever init_database() gains a table, column or index
+SCHEMA_VERSION = 11
+# First version whose scheme_eligibility rows match utils/eligibility.py; older rows are re-extracted
+ELIGIBILITY_RULES_VERSION = 11
+
+ELIGIBILITY_COLUMNS = ('age_min', 'age_max', 'income_max', 'gender', 'state',
+                       'social_mask', 'occupation_mask')
+ELIGIBILITY_INSERT = f'''
+    INSERT OR REPLACE INTO scheme_eligibility (scheme_id, {', '.join(ELIGIBILITY_COLUMNS)})
+    VALUES (?, {', '.join('?' * len(ELIGIBILITY_COLUMNS))})
+'''
+
+# Query log retention (see compact_query_log)
+RAW_LOG_RETENTION_DAYS = 30  # Raw query_log rows older than this are pruned once rolled up
+HOURLY_ROLLUP_RETENTION_DAYS = 14  # Hourly buckets are dropped after this; daily ones are kept
+TOP_QUERIES_PER_DAY = 100  # Distinct queries kept per daily bucket once its raw rows are gone
+ROLLUP_WATERMARK = 'query_log_rolled_up_id'
+# query_log timestamp -> rollup bucket, per granularity
+ROLLUP_BUCKETS = {
+    'hour': "strftime('%Y-%m-%d %H:00:00', timestamp)",
+    'day': "date(timestamp)"
+}
+
+# Near-duplicate aliases (see database/dedup.py) are hidden from canonical-only listings
+CANONICAL_ONLY = 'id NOT IN (SELECT scheme_id FROM scheme_aliases)'
+
+# Databases already initialized in this process (absolute paths)
+_initialized_dbs = set()
+_init_lock = threading.Lock()
 
 class DatabaseManager:
     def __init__(self, db_name='database/schemes.db'):
@@ -8,8 +42,33 @@ class DatabaseManager:
         self.init_database()
     
     def init_database(self):
-        """Initialize database with tables"""
-        conn = sqlite3.connect(self.db_name)
+        """Initialize database with tables (once per process, skipped if schema is current)"""
+        db_key = os.path.abspath(self.db_name)
+        if db_key in _initialized_dbs:
+            return
+        
+        with _init_lock:
+            if db_key in _initialized_dbs:
+                return
+            
+            conn = sqlite3.connect(self.db_name)
+            try:
+                version = conn.execute('PRAGMA user_version').fetchone()[0]
+                if version < SCHEMA_VERSION:
+                    if 3 <= version < ELIGIBILITY_RULES_VERSION:
+                        # Extracted with older rules (comma-split clauses, first income amount);
+                        # _create_schema backfills it with the current rules
+                        conn.execute('DELETE FROM scheme_eligibility')
+                    self._create_schema(conn)
+                    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+                    conn.commit()
+                    print("✅ Database initialized successfully")
+            finally:
+                conn.close()
+            _initialized_dbs.add(db_key)
+    
+    def _create_schema(self, conn):
+        """Run the schema DDL (idempotent)"""
         cursor = conn.cursor()
         
         # Create schemes table
@@ -26,6 +85,12 @@ class DatabaseManager:
             )
         ''')
         
+        # Browse order (category, title) without sorting the table per page
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_schemes_category_title
+            ON schemes (category, title)
+        ''')
+        
         # Create translations cache table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS translations (
@@ -51,10 +116,243 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
-        print("✅ Database initialized successfully")
+        # Create LLM token usage log (for cost accounting)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                feature TEXT,
+                language TEXT,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                latency_ms REAL,
+                estimated INTEGER DEFAULT 0,
+                cached INTEGER DEFAULT 0,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                calls INTEGER DEFAULT 1
+            )
+        ''')
+        # Cache hits are stored aggregated, several calls per row (see UsageTracker)
+        cursor.execute('PRAGMA table_info(llm_usage)')
+        if 'calls' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE llm_usage ADD COLUMN calls INTEGER DEFAULT 1')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_llm_usage_feature
+            ON llm_usage (feature, language)
+        ''')
+        
+        # Create background job queue (see database/job_queue.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                params TEXT,
+                dedup_key TEXT,
+                status TEXT DEFAULT 'pending',
+                progress REAL DEFAULT 0,
+                message TEXT,
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        ''')
+        # At most one pending/running job per identical request
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_dedup
+            ON jobs (dedup_key) WHERE status IN ('pending', 'running')
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_status
+            ON jobs (status, created_at)
+        ''')
+        
+        # Structured eligibility extracted from schemes.eligibility (see utils/eligibility.py).
+        # Unrestricted fields hold '' / 0 / the full age range so matching needs no NULL checks
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheme_eligibility (
+                scheme_id INTEGER PRIMARY KEY,
+                age_min INTEGER DEFAULT 0,
+                age_max INTEGER DEFAULT 150,
+                income_max INTEGER,
+                gender TEXT DEFAULT '',
+                state TEXT DEFAULT '',
+                social_mask INTEGER DEFAULT 0,
+                occupation_mask INTEGER DEFAULT 0,
+                FOREIGN KEY (scheme_id) REFERENCES schemes (id)
+            )
+        ''')
+        # Covering index: state/gender are probed with IN (?, ''), the rest filtered in the index
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_eligibility_match
+            ON scheme_eligibility (state, gender, age_min, age_max, income_max,
+                                   social_mask, occupation_mask, scheme_id)
+        ''')
+        
+        # Sentence/clause translation memory (see llm/translation_memory.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS translation_memory (
+                language TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                source_tokens INTEGER DEFAULT 0,
+                target_tokens INTEGER DEFAULT 0,
+                hits INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (language, source)
+            )
+        ''')
+        
+        # Counters so get_stats() never scans a table. Row-at-a-time tables keep theirs
+        # with triggers; scheme counts are set by the bulk write path instead, because
+        # any trigger on schemes turns insert_schemes()'s DELETE into a row-by-row delete
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_counts (
+                category TEXT PRIMARY KEY,
+                schemes INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_translations_count_insert AFTER INSERT ON translations BEGIN
+                UPDATE stats_counters SET value = value + 1 WHERE name = 'translations';
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_translations_count_delete AFTER DELETE ON translations BEGIN
+                UPDATE stats_counters SET value = value - 1 WHERE name = 'translations';
+            END
+        ''')
+        # All-time total: pruning raw rows does not decrement it
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_query_log_count_insert AFTER INSERT ON query_log BEGIN
+                UPDATE stats_counters SET value = value + 1 WHERE name = 'queries';
+            END
+        ''')
+        # Changes MAX(id) does not show (see get_data_signature)
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_translations_version_update AFTER UPDATE ON translations BEGIN
+                UPDATE stats_counters SET value = value + 1 WHERE name = 'data_version';
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_translations_version_delete AFTER DELETE ON translations BEGIN
+                UPDATE stats_counters SET value = value + 1 WHERE name = 'data_version';
+            END
+        ''')
+        # The all-time query total, rollup watermark and data version survive re-running this
+        cursor.execute('''
+            INSERT OR IGNORE INTO stats_counters (name, value) VALUES
+                ('queries', (SELECT COUNT(*) FROM query_log)),
+                (?, 0),
+                ('data_version', 0)
+        ''', (ROLLUP_WATERMARK,))
+        self._recount_stats(cursor)
+        
+        # Query volume and popular queries per hour/day; raw rows are pruned into these
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_rollups (
+                granularity TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                queries INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, bucket)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_rollup_terms (
+                granularity TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                query TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, bucket, query)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_query_log_timestamp
+            ON query_log (timestamp)
+        ''')
+        
+        # Near-duplicate schemes folded into their cluster's canonical record (database/dedup.py).
+        # AUTOINCREMENT, so MAX(id) moves whenever the clusters are rewritten
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheme_aliases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scheme_id INTEGER NOT NULL UNIQUE,
+                canonical_id INTEGER NOT NULL,
+                similarity REAL,
+                FOREIGN KEY (scheme_id) REFERENCES schemes (id),
+                FOREIGN KEY (canonical_id) REFERENCES schemes (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scheme_aliases_canonical
+            ON scheme_aliases (canonical_id)
+        ''')
+        # Clearing the clusters leaves MAX(id) NULL, which an empty table already had
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_scheme_aliases_version_delete AFTER DELETE ON scheme_aliases BEGIN
+                UPDATE stats_counters SET value = value + 1 WHERE name = 'data_version';
+            END
+        ''')
+        
+        # Backfill schemes stored before the table existed
+        cursor.execute('''
+            SELECT id, category, eligibility FROM schemes
+            WHERE id NOT IN (SELECT scheme_id FROM scheme_eligibility)
+        ''')
+        self._save_eligibility(cursor, {
+            scheme_id: {'category': category, 'eligibility': eligibility}
+            for scheme_id, category, eligibility in cursor.fetchall()
+        })
+    
+    @staticmethod
+    def _recount_stats(cursor):
+        """Recount the scheme and translation counters from their tables"""
+        cursor.execute('''
+            INSERT OR REPLACE INTO stats_counters (name, value) VALUES
+                ('schemes', (SELECT COUNT(*) FROM schemes)),
+                ('translations', (SELECT COUNT(*) FROM translations))
+        ''')
+        cursor.execute('DELETE FROM category_counts')
+        cursor.execute('''
+            INSERT INTO category_counts (category, schemes)
+            SELECT IFNULL(category, ''), COUNT(*) FROM schemes GROUP BY 1
+        ''')
     
+    def recount_stats(self):
+        """Resync the counters after writing the tables directly (e.g. a snapshot import)"""
+        conn = sqlite3.connect(self.db_name)
+        try:
+            self._recount_stats(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _count_scheme(cursor, category, delta):
+        cursor.execute("UPDATE stats_counters SET value = value + ? WHERE name = 'schemes'", (delta,))
+        cursor.execute('''
+            INSERT INTO category_counts (category, schemes) VALUES (?, ?)
+            ON CONFLICT (category) DO UPDATE SET schemes = schemes + excluded.schemes
+        ''', (category or '', delta))
+    
+    @staticmethod
+    def _save_eligibility(cursor, schemes_by_id):
+        """Extract and store structured eligibility for {scheme_id: scheme}"""
+        rows = []
+        for scheme_id, scheme in schemes_by_id.items():
+            criteria = extract_eligibility(scheme.get('eligibility'), scheme.get('category'))
+            rows.append((scheme_id, *(criteria[column] for column in ELIGIBILITY_COLUMNS)))
+        cursor.executemany(ELIGIBILITY_INSERT, rows)
+    
+    @timed('db_query_seconds')
     def insert_schemes(self, schemes_list):
         """Insert scraped schemes into database"""
         conn = sqlite3.connect(self.db_name)
@@ -62,8 +360,11 @@ class DatabaseManager:
         
         # Clear existing data (for prototype)
         cursor.execute('DELETE FROM schemes')
+        cursor.execute('DELETE FROM scheme_eligibility')
+        cursor.execute('DELETE FROM scheme_aliases')  # Ids change; run dedup again after loading
         
         inserted = 0
+        inserted_by_id = {}
         for scheme in schemes_list:
             cursor.execute('''
                 INSERT INTO schemes (title, description, category, url, eligibility, benefits)
@@ -76,26 +377,102 @@ class DatabaseManager:
                 scheme.get('eligibility', 'N/A'),
                 scheme.get('benefits', 'N/A')
             ))
+            inserted_by_id[cursor.lastrowid] = scheme
             inserted += 1
         
+        self._save_eligibility(cursor, inserted_by_id)
+        self._recount_stats(cursor)
+        
         conn.commit()
         conn.close()
         print(f"✅ Inserted {inserted} schemes into database")
         return inserted
     
-    def get_all_schemes(self):
-        """Retrieve all schemes"""
+    @timed('db_query_seconds')
+    def upsert_scheme(self, scheme):
+        """Insert a scheme, or update the existing one with the same title; returns its id"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        values = (
+            scheme.get('description', 'N/A'),
+            scheme.get('category', 'N/A'),
+            scheme.get('url', '#'),
+            scheme.get('eligibility', 'N/A'),
+            scheme.get('benefits', 'N/A')
+        )
+        cursor.execute('''
+            SELECT id, category, description, eligibility, benefits FROM schemes WHERE title = ?
+        ''', (scheme.get('title', 'N/A'),))
+        existing = cursor.fetchone()
+        
+        if existing:
+            scheme_id, old_category, *old_translated = existing
+            if old_translated != [values[0], values[3], values[4]]:
+                # Cached translations carry the old text (amounts, limits); drop them so they are redone
+                cursor.execute('DELETE FROM translations WHERE scheme_id = ?', (scheme_id,))
+            cursor.execute('''
+                UPDATE schemes
+                SET description = ?, category = ?, url = ?, eligibility = ?, benefits = ?
+                WHERE id = ?
+            ''', (*values, scheme_id))
+            if old_category != values[1]:
+                self._count_scheme(cursor, old_category, -1)
+                self._count_scheme(cursor, values[1], 1)
+        else:
+            cursor.execute('''
+                INSERT INTO schemes (title, description, category, url, eligibility, benefits)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (scheme.get('title', 'N/A'), *values))
+            scheme_id = cursor.lastrowid
+            self._count_scheme(cursor, values[1], 1)
+        self._save_eligibility(cursor, {scheme_id: scheme})
+        # An UPDATE keeps MAX(id), so in-memory indexes need the version bump to notice it
+        cursor.execute("UPDATE stats_counters SET value = value + 1 WHERE name = 'data_version'")
+        
+        conn.commit()
+        conn.close()
+        return scheme_id
+    
+    @timed('db_query_seconds')
+    def prune_schemes(self, keep_ids):
+        """Delete every scheme not in keep_ids, with its eligibility, aliases and translations"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('CREATE TEMP TABLE keep_ids (id INTEGER PRIMARY KEY)')
+        cursor.executemany('INSERT OR IGNORE INTO keep_ids (id) VALUES (?)', [(i,) for i in keep_ids])
+        cursor.execute('SELECT id FROM schemes WHERE id NOT IN (SELECT id FROM keep_ids)')
+        stale = [(scheme_id,) for (scheme_id,) in cursor.fetchall()]
+        if stale:
+            cursor.executemany('DELETE FROM translations WHERE scheme_id = ?', stale)
+            cursor.executemany('DELETE FROM scheme_aliases WHERE scheme_id = ? OR canonical_id = ?',
+                               [(i, i) for (i,) in stale])
+            cursor.executemany('DELETE FROM scheme_eligibility WHERE scheme_id = ?', stale)
+            cursor.executemany('DELETE FROM schemes WHERE id = ?', stale)
+            self._recount_stats(cursor)
+            cursor.execute("UPDATE stats_counters SET value = value + 1 WHERE name = 'data_version'")
+        
+        conn.commit()
+        conn.close()
+        return len(stale)
+    
+    @timed('db_query_seconds')
+    def get_all_schemes(self, canonical_only=False):
+        """Retrieve all schemes (one per duplicate cluster if canonical_only)"""
         conn = sqlite3.connect(self.db_name)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM schemes ORDER BY category, title')
+        where = f'WHERE {CANONICAL_ONLY}' if canonical_only else ''
+        cursor.execute(f'SELECT * FROM schemes {where} ORDER BY category, title')
         rows = cursor.fetchall()
         
         schemes = [dict(row) for row in rows]
         conn.close()
         return schemes
     
+    @timed('db_query_seconds')
     def get_scheme_by_id(self, scheme_id):
         """Get single scheme"""
         conn = sqlite3.connect(self.db_name)
@@ -109,20 +486,47 @@ class DatabaseManager:
         conn.close()
         return scheme
     
-    def search_schemes(self, query):
+    @timed('db_query_seconds')
+    def get_schemes_by_ids(self, scheme_ids, canonical_only=False):
+        """Get several schemes, preserving the order of scheme_ids
+        (with canonical_only, aliases are replaced by their canonical scheme, each listed once)"""
+        if not scheme_ids:
+            return []
+        if canonical_only:
+            aliases = self.get_scheme_aliases()
+            scheme_ids = dict.fromkeys(aliases.get(i, i) for i in scheme_ids)
+        
+        conn = sqlite3.connect(self.db_name)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Chunked to stay under SQLite's bound-parameter limit
+        scheme_ids = list(scheme_ids)
+        by_id = {}
+        for start in range(0, len(scheme_ids), 500):
+            chunk = scheme_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'SELECT * FROM schemes WHERE id IN ({placeholders})', chunk)
+            by_id.update((row['id'], dict(row)) for row in cursor.fetchall())
+        conn.close()
+        return [by_id[i] for i in scheme_ids if i in by_id]
+    
+    @timed('db_query_seconds')
+    def search_schemes(self, query, canonical_only=False):
         """Search schemes by keyword"""
         conn = sqlite3.connect(self.db_name)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         search_term = f'%{query}%'
-        cursor.execute('''
+        canonical = f'AND {CANONICAL_ONLY}' if canonical_only else ''
+        cursor.execute(f'''
             SELECT * FROM schemes 
-            WHERE title LIKE ? 
+            WHERE (title LIKE ? 
             OR description LIKE ? 
             OR category LIKE ?
             OR eligibility LIKE ?
-            OR benefits LIKE ?
+            OR benefits LIKE ?) {canonical}
             ORDER BY 
                 CASE 
                     WHEN title LIKE ? THEN 1
@@ -136,6 +540,7 @@ class DatabaseManager:
         conn.close()
         return schemes
     
+    @timed('db_query_seconds')
     def filter_by_category(self, category):
         """Filter schemes by category"""
         conn = sqlite3.connect(self.db_name)
@@ -149,6 +554,82 @@ class DatabaseManager:
         conn.close()
         return schemes
     
+    @timed('db_query_seconds')
+    def get_schemes_page(self, limit=20, offset=0, category=None, canonical_only=False):
+        """(schemes, total) for one page in browse order, optionally within a category"""
+        conn = sqlite3.connect(self.db_name)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        conditions, params = (['category = ?'], [category]) if category else ([], [])
+        if canonical_only:
+            conditions.append(CANONICAL_ONLY)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        cursor.execute(f'SELECT COUNT(*) FROM schemes {where}', params)
+        total = cursor.fetchone()[0]
+        cursor.execute(f'''
+            SELECT * FROM schemes {where}
+            ORDER BY category, title
+            LIMIT ? OFFSET ?
+        ''', params + [limit, offset])
+        schemes = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        return schemes, total
+    
+    @timed('db_query_seconds')
+    def match_eligibility(self, profile, limit=None, canonical_only=False):
+        """Schemes a citizen may be eligible for, from extracted criteria alone (no LLM call).
+
+        profile keys (all optional): age, income, social_category, gender, state,
+        occupation. Missing keys are not used to filter.
+        """
+        conditions, params = [], []
+        if canonical_only:
+            conditions.append('scheme_id NOT IN (SELECT scheme_id FROM scheme_aliases)')  # CANONICAL_ONLY
+        # Restrictions the profile actually satisfied; more of them = more specific match
+        specificity = []
+        
+        for column in ('state', 'gender'):
+            if profile.get(column):
+                conditions.append(f"{column} IN (?, '')")
+                params.append(profile[column])
+                specificity.append(f"({column} != '')")
+        if profile.get('age') is not None:
+            conditions.append('age_min <= ? AND age_max >= ?')
+            params += [profile['age'], profile['age']]
+            specificity.append('(age_min > 0 OR age_max < 150)')
+        if profile.get('income') is not None:
+            conditions.append('(income_max IS NULL OR income_max >= ?)')
+            params.append(profile['income'])
+            specificity.append('(income_max IS NOT NULL)')
+        for column, key, names in (('social_mask', 'social_category', SOCIAL_CATEGORIES),
+                                   ('occupation_mask', 'occupation', OCCUPATIONS)):
+            if profile.get(key) in names:
+                conditions.append(f'({column} = 0 OR {column} & ? != 0)')
+                params.append(1 << names.index(profile[key]))
+                specificity.append(f'({column} != 0)')
+        
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        # Rank from the covering index alone, then load only the rows returned
+        cursor.execute(f'''
+            SELECT scheme_id, {', '.join(ELIGIBILITY_COLUMNS)}
+            FROM scheme_eligibility
+            WHERE {' AND '.join(conditions) or '1'}
+            ORDER BY {' + '.join(specificity) or '0'} DESC, scheme_id
+            {'LIMIT ?' if limit else ''}
+        ''', params + ([limit] if limit else []))
+        criteria = {row[0]: dict(zip(ELIGIBILITY_COLUMNS, row[1:])) for row in cursor.fetchall()}
+        conn.close()
+        
+        schemes = self.get_schemes_by_ids(list(criteria))
+        for scheme in schemes:
+            scheme['criteria'] = criteria[scheme['id']]
+        return schemes
+    
+    @timed('db_query_seconds')
     def save_translation(self, scheme_id, language, translations):
         """Cache translations to avoid repeated API calls"""
         conn = sqlite3.connect(self.db_name)
@@ -198,22 +679,162 @@ class DatabaseManager:
         conn.commit()
         conn.close()
     
+    @timed('db_query_seconds')
     def get_translation(self, scheme_id, language):
         """Retrieve cached translation"""
         conn = sqlite3.connect(self.db_name)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        # An alias shares its canonical scheme's translation
         cursor.execute('''
             SELECT * FROM translations 
-            WHERE scheme_id = ? AND language = ?
-        ''', (scheme_id, language))
+            WHERE scheme_id = IFNULL((SELECT canonical_id FROM scheme_aliases WHERE scheme_id = ?), ?)
+            AND language = ?
+        ''', (scheme_id, scheme_id, language))
         
         row = cursor.fetchone()
         translation = dict(row) if row else None
         conn.close()
         return translation
     
+    @timed('db_query_seconds')
+    def get_all_translations(self):
+        """Retrieve every cached translation (for search indexing)"""
+        conn = sqlite3.connect(self.db_name)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM translations')
+        translations = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return translations
+
+    @timed('db_query_seconds')
+    def save_scheme_aliases(self, aliases):
+        """Replace the duplicate clusters with {alias_id: (canonical_id, similarity)}"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('DELETE FROM scheme_aliases')
+        cursor.executemany('''
+            INSERT INTO scheme_aliases (scheme_id, canonical_id, similarity)
+            VALUES (?, ?, ?)
+        ''', [(alias_id, canonical_id, similarity)
+              for alias_id, (canonical_id, similarity) in aliases.items()])
+
+        conn.commit()
+        conn.close()
+        return len(aliases)
+
+    @timed('db_query_seconds')
+    def get_scheme_aliases(self):
+        """{alias_id: canonical_id} for every scheme folded into another"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT scheme_id, canonical_id FROM scheme_aliases')
+        aliases = dict(cursor.fetchall())
+        conn.close()
+        return aliases
+
+    @timed('db_query_seconds')
+    def get_canonical_id(self, scheme_id):
+        """Id of the record scheme_id was folded into (scheme_id itself if it is canonical)"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT canonical_id FROM scheme_aliases WHERE scheme_id = ?', (scheme_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else scheme_id
+
+    @timed('db_query_seconds')
+    def get_segment_translations(self, language, sources):
+        """{source: target} for the segments already in translation memory (counts a hit each)"""
+        if not sources:
+            return {}
+        
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        found = {}
+        sources = list(sources)
+        for start in range(0, len(sources), 500):
+            chunk = sources[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT source, target FROM translation_memory
+                WHERE language = ? AND source IN ({placeholders})
+            ''', (language, *chunk))
+            found.update(cursor.fetchall())
+        
+        if found:
+            cursor.executemany('''
+                UPDATE translation_memory SET hits = hits + 1
+                WHERE language = ? AND source = ?
+            ''', [(language, source) for source in found])
+            conn.commit()
+        conn.close()
+        return found
+    
+    @timed('db_query_seconds')
+    def save_segment_translations(self, language, rows):
+        """Store [(source, target, source_tokens, target_tokens)]; existing segments are kept"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT OR IGNORE INTO translation_memory
+            (language, source, target, source_tokens, target_tokens)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(language, *row) for row in rows])
+        
+        conn.commit()
+        conn.close()
+    
+    @timed('db_query_seconds')
+    def get_translation_memory_stats(self):
+        """Stored segments, reuse hits and tokens avoided, per language"""
+        conn = sqlite3.connect(self.db_name)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT language,
+                   COUNT(*) AS segments,
+                   SUM(hits) AS hits,
+                   SUM(hits * (source_tokens + target_tokens)) AS tokens_saved
+            FROM translation_memory
+            GROUP BY language
+            ORDER BY tokens_saved DESC
+        ''')
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+    
+    @timed('db_query_seconds')
+    def get_data_signature(self):
+        """Cheap change marker for in-memory indexes and caches:
+        (max scheme id, max translation id, max alias id, data version)"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        # insert_schemes() reloads with fresh AUTOINCREMENT ids, so MAX(id) moves on every load
+        cursor.execute('SELECT MAX(id) FROM schemes')
+        schemes_marker = cursor.fetchone()[0]
+        cursor.execute('SELECT MAX(id) FROM translations')
+        translations_marker = cursor.fetchone()[0]
+        cursor.execute('SELECT MAX(id) FROM scheme_aliases')
+        aliases_marker = cursor.fetchone()[0]
+        # In-place changes: triggers bump it for translation updates/deletes and cleared aliases
+        cursor.execute("SELECT value FROM stats_counters WHERE name = 'data_version'")
+        version = cursor.fetchone()[0]
+        
+        conn.close()
+        return (schemes_marker, translations_marker, aliases_marker, version)
+    
+    @timed('db_query_seconds')
     def log_query(self, query, response):
         """Log user queries for analytics"""
         conn = sqlite3.connect(self.db_name)
@@ -227,31 +848,261 @@ class DatabaseManager:
         conn.commit()
         conn.close()
     
-    def get_stats(self):
-        """Get database statistics"""
+    @timed('db_query_seconds')
+    def get_query_counts(self, after_id=0):
+        """(last log id, [(query, count)]) for queries logged after after_id.
+
+        From the start (after_id=0) this includes the daily rollups, so
+        popularity survives the pruning of raw rows.
+        """
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT MAX(id) FROM query_log')
+        last_id = cursor.fetchone()[0] or 0
+        rolled = []
+        if after_id == 0:
+            # Rows up to the watermark are counted in the rollups, whether or not they were pruned
+            after_id = self._rollup_watermark(cursor)
+            cursor.execute('''
+                SELECT query, SUM(count) FROM query_rollup_terms
+                WHERE granularity = 'day'
+                GROUP BY query
+            ''')
+            rolled = cursor.fetchall()
+        cursor.execute('''
+            SELECT query, COUNT(*) FROM query_log
+            WHERE id > ? AND id <= ?
+            GROUP BY query
+        ''', (after_id, last_id))
+        counts = rolled + cursor.fetchall()
+        
+        conn.close()
+        return max(last_id, after_id), counts
+    
+    @staticmethod
+    def _rollup_watermark(cursor):
+        cursor.execute('SELECT value FROM stats_counters WHERE name = ?', (ROLLUP_WATERMARK,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    
+    @timed('db_query_seconds')
+    def rollup_query_log(self):
+        """Fold query_log rows logged since the last rollup into the hourly/daily buckets; returns rows folded"""
+        conn = sqlite3.connect(self.db_name, isolation_level=None, timeout=30)
+        cursor = conn.cursor()
+        try:
+            # One roller at a time: the watermark is read and advanced under the write lock
+            cursor.execute('BEGIN IMMEDIATE')
+            watermark = self._rollup_watermark(cursor)
+            cursor.execute('SELECT MAX(id) FROM query_log')
+            last_id = cursor.fetchone()[0] or 0
+            if last_id <= watermark:
+                cursor.execute('COMMIT')
+                return 0
+            
+            for granularity, bucket in ROLLUP_BUCKETS.items():
+                cursor.execute(f'''
+                    INSERT INTO query_rollups (granularity, bucket, queries)
+                    SELECT ?, {bucket}, COUNT(*) FROM query_log
+                    WHERE id > ? AND id <= ?
+                    GROUP BY 2
+                    ON CONFLICT (granularity, bucket) DO UPDATE SET queries = queries + excluded.queries
+                ''', (granularity, watermark, last_id))
+                cursor.execute(f'''
+                    INSERT INTO query_rollup_terms (granularity, bucket, query, count)
+                    SELECT ?, {bucket}, lower(trim(query)), COUNT(*) FROM query_log
+                    WHERE id > ? AND id <= ? AND trim(query) != ''
+                    GROUP BY 2, 3
+                    ON CONFLICT (granularity, bucket, query) DO UPDATE SET count = count + excluded.count
+                ''', (granularity, watermark, last_id))
+            
+            cursor.execute('UPDATE stats_counters SET value = ? WHERE name = ?', (last_id, ROLLUP_WATERMARK))
+            cursor.execute('COMMIT')
+            return last_id - watermark
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+    
+    @timed('db_query_seconds')
+    def compact_query_log(self, retain_days=RAW_LOG_RETENTION_DAYS,
+                          hourly_days=HOURLY_ROLLUP_RETENTION_DAYS, top_queries=TOP_QUERIES_PER_DAY):
+        """Roll up, then prune raw rows and old buckets so the log stays bounded"""
+        rolled_up = self.rollup_query_log()
+        
+        conn = sqlite3.connect(self.db_name, isolation_level=None, timeout=30)
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            raw_cutoff = f'-{int(retain_days)} days'
+            # Only rows already folded into the rollups may go
+            cursor.execute('''
+                DELETE FROM query_log
+                WHERE timestamp < datetime('now', ?) AND id <= ?
+            ''', (raw_cutoff, self._rollup_watermark(cursor)))
+            pruned = cursor.rowcount
+            
+            hourly_cutoff = f'-{int(hourly_days)} days'
+            cursor.execute('''
+                DELETE FROM query_rollups
+                WHERE granularity = 'hour' AND bucket < datetime('now', ?)
+            ''', (hourly_cutoff,))
+            cursor.execute('''
+                DELETE FROM query_rollup_terms
+                WHERE granularity = 'hour' AND bucket < datetime('now', ?)
+            ''', (hourly_cutoff,))
+            buckets_dropped = cursor.rowcount
+            
+            # Old days keep their volume but only their most popular queries
+            cursor.execute('''
+                DELETE FROM query_rollup_terms WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY bucket ORDER BY count DESC, query
+                        ) AS rank
+                        FROM query_rollup_terms
+                        WHERE granularity = 'day' AND bucket < date('now', ?)
+                    ) WHERE rank > ?
+                )
+            ''', (raw_cutoff, top_queries))
+            terms_trimmed = cursor.rowcount
+            cursor.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        
+        return {
+            'rolled_up': rolled_up,
+            'pruned': pruned,
+            'hourly_terms_dropped': buckets_dropped,
+            'daily_terms_trimmed': terms_trimmed
+        }
+    
+    @timed('db_query_seconds')
+    def get_query_volume(self, granularity='day', limit=30):
+        """[(bucket, queries)] for the most recent buckets, oldest first"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        # Read-only: rows not yet rolled up (compact_query_log job) are counted from the raw log.
+        # One statement, so the rollups and the watermark come from the same snapshot
+        cursor.execute(f'''
+            SELECT bucket, SUM(queries) FROM (
+                SELECT bucket, queries FROM query_rollups WHERE granularity = ?
+                UNION ALL
+                SELECT {ROLLUP_BUCKETS[granularity]}, 1 FROM query_log
+                WHERE id > (SELECT value FROM stats_counters WHERE name = ?)
+            )
+            GROUP BY bucket
+            ORDER BY bucket DESC
+            LIMIT ?
+        ''', (granularity, ROLLUP_WATERMARK, limit))
+        rows = cursor.fetchall()[::-1]
+        
+        conn.close()
+        return rows
+    
+    @timed('db_query_seconds')
+    def get_top_queries(self, days=7, limit=10):
+        """[(query, count)] most searched over the last `days` days (daily rollups plus the raw tail)"""
         conn = sqlite3.connect(self.db_name)
         cursor = conn.cursor()
         
-        stats = {}
+        since = f'-{int(days) - 1} days'
+        cursor.execute('''
+            SELECT query, SUM(count) AS total FROM (
+                SELECT query, count FROM query_rollup_terms
+                WHERE granularity = 'day' AND bucket >= date('now', ?)
+                UNION ALL
+                SELECT lower(trim(query)), 1 FROM query_log
+                WHERE id > (SELECT value FROM stats_counters WHERE name = ?)
+                AND trim(query) != '' AND date(timestamp) >= date('now', ?)
+            )
+            GROUP BY query
+            ORDER BY total DESC, query
+            LIMIT ?
+        ''', (since, ROLLUP_WATERMARK, since, limit))
+        rows = cursor.fetchall()
         
-        # Total schemes
-        cursor.execute('SELECT COUNT(*) FROM schemes')
-        stats['total_schemes'] = cursor.fetchone()[0]
+        conn.close()
+        return rows
+    
+    @timed('db_query_seconds')
+    def save_usage_batch(self, rows):
+        """Persist a batch of LLM usage records in one transaction"""
+        if not rows:
+            return 0
         
-        # Schemes by category
-        cursor.execute('SELECT category, COUNT(*) FROM schemes GROUP BY category')
-        stats['by_category'] = dict(cursor.fetchall())
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
         
-        # Total translations
-        cursor.execute('SELECT COUNT(*) FROM translations')
-        stats['total_translations'] = cursor.fetchone()[0]
+        cursor.executemany('''
+            INSERT INTO llm_usage
+            (feature, language, prompt_tokens, completion_tokens, latency_ms, estimated, cached, calls)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            row['feature'],
+            row.get('language') or '',
+            row['prompt_tokens'],
+            row['completion_tokens'],
+            row.get('latency_ms', 0),
+            int(row.get('estimated', False)),
+            int(row.get('cached', False)),
+            row.get('calls', 1)
+        ) for row in rows])
         
-        # Total queries
-        cursor.execute('SELECT COUNT(*) FROM query_log')
-        stats['total_queries'] = cursor.fetchone()[0]
+        conn.commit()
+        conn.close()
+        return len(rows)
+    
+    @timed('db_query_seconds')
+    def get_usage_summary(self, since=None):
+        """Token usage grouped by feature, language and cache status"""
+        conn = sqlite3.connect(self.db_name)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT feature, language, cached,
+                   SUM(calls) AS calls,
+                   SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(completion_tokens) AS completion_tokens,
+                   SUM(latency_ms) / SUM(calls) AS avg_latency_ms,
+                   SUM(estimated * calls) AS estimated_calls
+            FROM llm_usage
+            WHERE timestamp >= ?
+            GROUP BY feature, language, cached
+            ORDER BY prompt_tokens + completion_tokens DESC
+        ''', (since or '0000-00-00',))
         
+        rows = [dict(row) for row in cursor.fetchall()]
         conn.close()
-        return stats
+        return rows
+    
+    @timed('db_query_seconds')
+    def get_stats(self):
+        """Get database statistics (trigger-maintained counters: no table scans)"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT name, value FROM stats_counters')
+        counters = dict(cursor.fetchall())
+        cursor.execute('SELECT category, schemes FROM category_counts WHERE schemes > 0')
+        by_category = dict(cursor.fetchall())
+        
+        conn.close()
+        return {
+            'total_schemes': counters.get('schemes', 0),
+            'by_category': by_category,
+            'total_translations': counters.get('translations', 0),
+            'total_queries': counters.get('queries', 0)
+        }
 
 # Test database
 if __name__ == "__main__":
@@ -286,6 +1137,31 @@ if __name__ == "__main__":
         if results:
             print(f"   First result: {results[0]['title']}")
         
+        # Test query-log rollups
+        for query in ['pension', 'Pension ', 'rythu bandhu']:
+            db.log_query(query, 'English')
+        before = db.get_top_queries(days=7, limit=3), db.get_query_volume('hour')
+        print(f"\n🧹 Compacting query log: {db.compact_query_log()}")
+        print(f"   Top queries this week: {db.get_top_queries(days=7, limit=3)}")
+        # Reads never roll up, but count the raw tail, so compaction does not change them
+        assert before == (db.get_top_queries(days=7, limit=3), db.get_query_volume('hour'))
+        
+        # Test that a re-crawled scheme drops translations of its old text
+        scheme = dict(schemes[0])
+        scheme_id = db.upsert_scheme(scheme)
+        db.save_translation(scheme_id, 'Hindi', {'title': 'T', 'benefits': 'पुराना'})
+        db.upsert_scheme(scheme)
+        assert db.get_translation(scheme_id, 'Hindi'), "unchanged text keeps its translation"
+        db.upsert_scheme({**scheme, 'benefits': scheme.get('benefits', '') + ' (revised)'})
+        assert db.get_translation(scheme_id, 'Hindi') is None, "changed text must be re-translated"
+        print(f"\n🔁 Upsert dropped the stale translation of '{scheme['title']}'")
+        
+        # Test eligibility matching
+        profile = {'age': 68, 'state': 'Telangana', 'occupation': 'farmer'}
+        print(f"\n✅ Testing eligibility for {profile}:")
+        matches = db.match_eligibility(profile)
+        print(f"   {len(matches)} candidate schemes: {', '.join(s['title'] for s in matches[:3])}...")
+        
         print("\n✅ Database test completed successfully!")
         
     except FileNotFoundError:
@@ -0,0 +1,216 @@
+"""
+Near-duplicate scheme detection across sources.
+
+Portals describe the same scheme with slightly different names and text,
+and every copy used to be stored, indexed and translated on its own. Each
+scheme is reduced to a set of word shingles over its normalized text
+(phonetic keys, so "raithu"/"rythu" agree), summarized as a MinHash
+signature and bucketed by LSH banding: only schemes sharing a band are
+compared, so clustering stays far below all-pairs. Signatures use one
+permutation hashing (one hash per shingle, split into bins) with rotation
+densification, instead of NUM_PERM separate hash functions.
+
+Candidates are verified with the exact Jaccard similarity of their shingle
+sets and merged (single link) when it clears the threshold. Each cluster keeps one canonical record; the others
+become aliases (scheme_aliases) that share its translations and are folded
+into it by the search index and canonical-only listings.
+
+Shingles found in a large share of the catalogue (portal boilerplate such
+as "direct benefit transfer") are dropped before hashing; left in, they make
+unrelated schemes look alike and pile them into the same LSH buckets.
+"""
+import time
+from collections import Counter
+
+from database.db_manager import DatabaseManager
+from utils.transliteration import phonetic_key, phonetic_keys
+
+NUM_PERM = 64  # Signature length
+BANDS = 16  # LSH bands of NUM_PERM // BANDS rows: pairs near (1/16)^(1/4) = 0.5 start colliding
+SIMILARITY_THRESHOLD = 0.5  # Jaccard similarity needed to link two schemes
+SHINGLE_SIZE = 2  # Words per shingle
+COMMON_SHINGLE_RATIO = 0.001  # Shingles in more than this share of schemes are boilerplate...
+COMMON_SHINGLE_MIN_DOCS = 20  # ...once they also appear in more than this many
+MAX_BUCKET_SIZE = 500  # Larger LSH buckets hold boilerplate-only text; they are not compared
+TEXT_FIELDS = ('title', 'description', 'eligibility', 'benefits')
+OFFICIAL_DOMAINS = ('.gov.in', '.nic.in')
+
+# Words every scheme shares; they would make unrelated schemes look alike
+STOPWORDS = {
+    'a', 'an', 'and', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'of', 'on', 'or',
+    'the', 'to', 'under', 'with', 'scheme', 'yojana', 'government', 'govt'
+}
+
+STOP_KEYS = {phonetic_key(word) for word in STOPWORDS}
+EMPTY_BIN = 1 << 64
+HASH_MASK = (1 << 64) - 1
+
+
+def shingles(scheme):
+    """Set of word n-grams (tuples) over the scheme's normalized text; n-grams never span fields"""
+    result = set()
+    for field in TEXT_FIELDS:
+        words = [key for key in phonetic_keys(str(scheme.get(field) or '')) if key not in STOP_KEYS]
+        if len(words) < SHINGLE_SIZE:
+            result.update((word,) for word in words)
+        else:
+            result.update(zip(*(words[i:] for i in range(SHINGLE_SIZE))))
+    return result
+
+
+def shingle_hashes(scheme):
+    """64-bit hashes of the scheme's shingles (str hashes: stable within one process only)"""
+    return {hash(shingle) & HASH_MASK for shingle in shingles(scheme)}
+
+
+def minhash(hashes, num_perm=NUM_PERM):
+    """MinHash signature (tuple of num_perm ints) of a non-empty set of shingle hashes"""
+    bins = [EMPTY_BIN] * num_perm
+    for value in hashes:
+        slot, value = value % num_perm, value // num_perm
+        if value < bins[slot]:
+            bins[slot] = value
+    # Empty bins borrow the next filled bin to the right (circularly), offset by the
+    # distance so two sets only agree on a borrowed bin when they borrowed from the same place
+    signature = [0] * num_perm
+    borrowed, distance = EMPTY_BIN, 0
+    for slot in range(2 * num_perm - 1, -1, -1):
+        value = bins[slot % num_perm]
+        if value != EMPTY_BIN:
+            borrowed, distance = value, 0
+        else:
+            distance += 1
+        if slot < num_perm:
+            signature[slot] = borrowed + (distance << 58)
+    return tuple(signature)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def choose_canonical(schemes):
+    """The record a cluster keeps: official source first, then the fullest text, then the oldest"""
+    def rank(scheme):
+        url = str(scheme.get('url') or '').split('//')[-1].split('/')[0]
+        official = url.endswith(OFFICIAL_DOMAINS)
+        length = sum(len(str(scheme.get(field) or '')) for field in TEXT_FIELDS)
+        return (not official, -length, scheme['id'])
+    return min(schemes, key=rank)
+
+
+def compute_shingle_sets(schemes):
+    """{scheme_id: shingle hashes} without catalogue boilerplate (schemes left empty are omitted)"""
+    hashed = {scheme['id']: shingle_hashes(scheme) for scheme in schemes}
+    frequency = Counter(value for hashes in hashed.values() for value in hashes)
+    limit = max(COMMON_SHINGLE_MIN_DOCS, COMMON_SHINGLE_RATIO * len(hashed))
+    common = {value for value, docs in frequency.items() if docs > limit}
+    return {scheme_id: hashes - common for scheme_id, hashes in hashed.items() if hashes - common}
+
+
+def find_duplicate_clusters(shingle_sets, threshold=SIMILARITY_THRESHOLD, bands=BANDS):
+    """
+    Group near-duplicates given {scheme_id: shingle hashes}.
+    Returns (clusters, stats): clusters is a list of id lists with two or more
+    members, stats counts LSH candidate pairs, verified links and skipped buckets.
+    """
+    rows = NUM_PERM // bands
+    signatures = {scheme_id: minhash(hashes) for scheme_id, hashes in shingle_sets.items()}
+    parent = {scheme_id: scheme_id for scheme_id in signatures}
+
+    def find(scheme_id):
+        while parent[scheme_id] != scheme_id:
+            parent[scheme_id] = parent[parent[scheme_id]]
+            scheme_id = parent[scheme_id]
+        return scheme_id
+
+    candidates = links = skipped = 0
+    for band in range(bands):
+        buckets = {}
+        for scheme_id, signature in signatures.items():
+            buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(scheme_id)
+        for members in buckets.values():
+            if len(members) > MAX_BUCKET_SIZE:
+                skipped += 1
+                continue
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    root_a, root_b = find(a), find(b)
+                    if root_a == root_b:
+                        continue
+                    # The signature only nominates candidates; small sets make its estimate noisy
+                    candidates += 1
+                    if jaccard(shingle_sets[a], shingle_sets[b]) >= threshold:
+                        parent[root_b] = root_a
+                        links += 1
+
+    clusters = {}
+    for scheme_id in signatures:
+        clusters.setdefault(find(scheme_id), []).append(scheme_id)
+    clusters = [sorted(members) for members in clusters.values() if len(members) > 1]
+    return clusters, {'candidates': candidates, 'links': links, 'skipped_buckets': skipped}
+
+
+def dedupe_catalogue(db: DatabaseManager, threshold=SIMILARITY_THRESHOLD):
+    """Cluster the stored schemes and record every non-canonical one as an alias; returns stats"""
+    start = time.perf_counter()
+    schemes = {scheme['id']: scheme for scheme in db.get_all_schemes()}
+    shingle_sets = compute_shingle_sets(schemes.values())
+    clusters, stats = find_duplicate_clusters(shingle_sets, threshold)
+
+    aliases = {}
+    for members in clusters:
+        canonical_id = choose_canonical([schemes[scheme_id] for scheme_id in members])['id']
+        for scheme_id in members:
+            if scheme_id != canonical_id:
+                # Similarity to the canonical record, not to the member it was linked through
+                score = jaccard(shingle_sets[scheme_id], shingle_sets[canonical_id])
+                aliases[scheme_id] = (canonical_id, round(score, 3))
+    db.save_scheme_aliases(aliases)
+
+    return {
+        'schemes': len(schemes),
+        'clusters': len(clusters),
+        'aliases': len(aliases),
+        'candidates': stats['candidates'],
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+# Test duplicate detection
+if __name__ == "__main__":
+    import json
+    import os
+    import tempfile
+
+    print("=" * 50)
+    print("NEAR-DUPLICATE DETECTION TEST")
+    print("=" * 50)
+
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        schemes = json.load(f)
+    # The same schemes as a second portal might list them
+    schemes += [
+        {**schemes[0], 'title': 'Telangana Raithu Bandhu Scheme',
+         'url': 'https://popularschemes.com/telangana-rythu-bandhu',
+         'description': schemes[0]['description'] + ' Apply at the Mandal Agriculture Office.'},
+        {**schemes[6], 'title': 'PM Kisan Samman Nidhi Yojana',
+         'url': 'https://popularschemes.com/pm-kisan'}
+    ]
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'dedup.db'))
+    db.insert_schemes(schemes)
+    print(f"   {dedupe_catalogue(db)}")
+    by_id = {scheme['id']: scheme for scheme in db.get_all_schemes()}
+    for alias_id, canonical_id in db.get_scheme_aliases().items():
+        print(f"   🔗 {by_id[alias_id]['title']} -> {by_id[canonical_id]['title']}")
+    print(f"   Canonical schemes: {len(db.get_all_schemes(canonical_only=True))} of {len(by_id)}")
+
+    # Every canonical-only read path lists a cluster once
+    aliases = db.get_scheme_aliases()
+    matched = [s['id'] for s in db.match_eligibility({'occupation': 'farmer'}, canonical_only=True)]
+    assert matched and not set(matched) & set(aliases)
+    looked_up = db.get_schemes_by_ids(list(aliases) + list(aliases.values()), canonical_only=True)
+    assert [s['id'] for s in looked_up] == list(dict.fromkeys(aliases.values()))
+    print("   ✅ Eligibility matches and id lookups list each cluster once")
+    print("=" * 50)
@@ -0,0 +1,284 @@
+"""
+Typo-tolerant lookup over scheme titles and key terms.
+
+Words are reduced to phonetic keys (utils/transliteration.py) and stored in
+a bigram index, which narrows "every key within edit distance k" to a few
+candidates before an exact bit-parallel distance check. Lookups rank schemes by how closely each
+query word matched; suggest() rebuilds the query from the closest known
+spellings for a "did you mean" prompt.
+"""
+import threading
+from collections import Counter, defaultdict
+
+from utils.transliteration import is_indic, phonetic_key, tokenize
+
+# Field weights: titles dominate; a few descriptive words help "farmer"-style queries
+FIELD_WEIGHTS = {'title': 3.0, 'category': 1.0, 'eligibility': 1.0}
+MIN_WORD_LENGTH = 3
+
+
+def pattern_masks(pattern):
+    """Per-character bitmasks of pattern's positions, reused across many comparisons"""
+    masks = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def bit_parallel_distance(pattern, masks, text):
+    """Edit distance via Myers' bit-vector algorithm: one pass over text, no DP table"""
+    m = len(pattern)
+    if not m:
+        return len(text)
+    full, last = (1 << m) - 1, 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for ch in text:
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def levenshtein(a, b):
+    return bit_parallel_distance(a, pattern_masks(a), b)
+
+
+def default_max_distance(word):
+    """Allowed typos grow with word length"""
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+def bigrams(term):
+    padded = f'^{term}$'
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class QGramIndex:
+    """Vocabulary indexed by padded bigrams.
+
+    One edit destroys at most two bigrams, so a term within distance k of
+    the query shares at least len(bigrams(query)) - 2k of them; only those
+    candidates pay for an exact distance check.
+    """
+
+    def __init__(self):
+        self.terms = []
+        self.term_ids = {}
+        self.grams = defaultdict(list)  # bigram -> term ids
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return term in self.term_ids
+
+    def add(self, term):
+        if term in self.term_ids:
+            return False
+        term_id = len(self.terms)
+        self.terms.append(term)
+        self.term_ids[term] = term_id
+        for gram in bigrams(term):
+            self.grams[gram].append(term_id)
+        return True
+
+    def _candidates(self, term, max_distance):
+        query_grams = bigrams(term)
+        needed = len(query_grams) - 2 * max_distance
+        if needed <= 0:
+            return range(len(self.terms))
+        counts = Counter()
+        for gram in query_grams:
+            counts.update(self.grams.get(gram, ()))
+        return [term_id for term_id, shared in counts.items() if shared >= needed]
+
+    def search(self, term, max_distance):
+        """All (distance, term) pairs within max_distance"""
+        masks = pattern_masks(term)
+        results = []
+        for term_id in self._candidates(term, max_distance):
+            candidate = self.terms[term_id]
+            if abs(len(candidate) - len(term)) > max_distance:
+                continue
+            distance = bit_parallel_distance(term, masks, candidate)
+            if distance <= max_distance:
+                results.append((distance, candidate))
+        results.sort()
+        return results
+
+
+class FuzzyIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.vocabulary = QGramIndex()
+        self.postings = defaultdict(dict)  # key -> {doc_id: weight}
+        self.doc_keys = {}  # doc_id -> set of keys (for removal)
+        self.doc_versions = {}  # doc_id -> indexed field values (to spot updates)
+        self.surface = defaultdict(Counter)  # key -> spellings seen in titles
+        self.signature = None  # DatabaseManager.get_data_signature() at the last sync
+
+    @classmethod
+    def from_schemes(cls, schemes):
+        """Build from scheme dicts; uses scheme['id'] or the list position"""
+        index = cls()
+        for position, scheme in enumerate(schemes):
+            index.add_scheme(scheme, scheme.get('id', position))
+        return index
+
+    def add_scheme(self, scheme, doc_id=None):
+        """Index (or re-index) one scheme"""
+        doc_id = scheme.get('id') if doc_id is None else doc_id
+        with self._lock:
+            self._remove(doc_id)
+            keys = set()
+            for field, weight in FIELD_WEIGHTS.items():
+                for word in tokenize(scheme.get(field)):
+                    if len(word) < MIN_WORD_LENGTH or word.isdigit():
+                        continue
+                    key = phonetic_key(word)
+                    if not key:
+                        continue
+                    if self.postings[key].get(doc_id, 0) < weight:
+                        self.postings[key][doc_id] = weight
+                    if field == 'title':
+                        self.surface[key][word.lower()] += 1
+                    self.vocabulary.add(key)
+                    keys.add(key)
+            self.doc_keys[doc_id] = keys
+            self.doc_versions[doc_id] = self._version(scheme)
+
+    @staticmethod
+    def _version(scheme):
+        return tuple(scheme.get(field) for field in FIELD_WEIGHTS)
+
+    def _remove(self, doc_id):
+        self.doc_versions.pop(doc_id, None)
+        for key in self.doc_keys.pop(doc_id, ()):
+            docs = self.postings.get(key)
+            if docs:
+                docs.pop(doc_id, None)
+
+    def remove_scheme(self, doc_id):
+        """Drop a scheme; its keys stay in the vocabulary but no longer match anything"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def __len__(self):
+        return len(self.doc_keys)
+
+    def _word_matches(self, word, max_distance):
+        key = phonetic_key(word)
+        if not key:
+            return key, []
+        if max_distance is None:
+            max_distance = default_max_distance(key)
+        return key, [(d, k) for d, k in self.vocabulary.search(key, max_distance) if self.postings.get(k)]
+
+    def lookup(self, query, max_distance=None, limit=10):
+        """(doc_id, score) for schemes matching every query word within the allowed distance"""
+        words = [w for w in tokenize(query) if len(w) >= MIN_WORD_LENGTH and not w.isdigit()]
+        if not words:
+            return []
+
+        scores = None
+        with self._lock:
+            for word in words:
+                _, matches = self._word_matches(word, max_distance)
+                word_scores = {}
+                for distance, key in matches:
+                    for doc_id, weight in self.postings[key].items():
+                        score = weight / (1 + distance)
+                        if score > word_scores.get(doc_id, 0):
+                            word_scores[doc_id] = score
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {d: scores[d] + s for d, s in word_scores.items() if d in scores}
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+        return ranked[:limit]
+
+    def suggest(self, query, max_distance=None):
+        """Query rewritten with the closest known title spellings, or None if nothing changes"""
+        corrected = []
+        changed = False
+        with self._lock:
+            for word in tokenize(query):
+                # Native-script words are spelled correctly by definition
+                if is_indic(word):
+                    corrected.append(word)
+                    continue
+                _, matches = self._word_matches(word, max_distance)
+                spellings = self.surface.get(matches[0][1]) if matches else None
+                # Same phonetic key can still be a misspelling ("bandu" vs "bandhu")
+                if not spellings or word.lower() in spellings:
+                    corrected.append(word)
+                    continue
+                corrected.append(spellings.most_common(1)[0][0])
+                changed = True
+        return ' '.join(corrected) if changed else None
+
+    def sync(self, db):
+        """Incrementally bring the index up to date with the schemes table"""
+        current = {scheme['id']: scheme for scheme in db.get_all_schemes()}
+        for doc_id in [d for d in self.doc_keys if d not in current]:
+            self.remove_scheme(doc_id)
+        for doc_id, scheme in current.items():
+            if self.doc_versions.get(doc_id) != self._version(scheme):
+                self.add_scheme(scheme)
+        self.signature = db.get_data_signature()
+        return len(self)
+
+    def sync_if_stale(self, db):
+        if self.signature != db.get_data_signature():
+            self.sync(db)
+
+
+# Test the fuzzy index
+if __name__ == "__main__":
+    import json
+
+    print("=" * 50)
+    print("FUZZY SEARCH TEST")
+    print("=" * 50)
+
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        schemes = json.load(f)
+
+    index = FuzzyIndex.from_schemes(schemes)
+    print(f"   {len(index)} schemes, {len(index.vocabulary)} distinct keys")
+    for query in ['rythu bandu', 'ayushmann', 'kalyan laxmi', 'ujwala', 'mudhra yojna', 'xyz']:
+        hits = [schemes[doc_id]['title'] for doc_id, _ in index.lookup(query, limit=2)]
+        print(f"   {query:<14} -> {hits}  (did you mean: {index.suggest(query)})")
+
+    # An in-place upsert keeps every MAX(id); the data version still triggers a sync
+    import os
+    import tempfile
+    from database.db_manager import DatabaseManager
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'fuzzy.db'))
+    db.insert_schemes(schemes)
+    index = FuzzyIndex()
+    index.sync(db)
+    kisan = dict(schemes[6], eligibility='Tenant cultivators and sharecroppers')
+    scheme_id = db.upsert_scheme(kisan)
+    index.sync_if_stale(db)
+    assert [doc_id for doc_id, _ in index.lookup('sharecropers', limit=1)] == [scheme_id]
+    print(f"   ✅ Upserted {kisan['title']} re-indexed")
+    print("=" * 50)
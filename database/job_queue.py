@@ -0,0 +1,333 @@
+"""
+SQLite-backed background job queue.
+
+Jobs are rows in the `jobs` table, so every Streamlit session (and every
+process) sees the same queue. Identical pending/running jobs are
+deduplicated by a unique partial index, claiming is atomic, and handlers
+report progress and honour cancellation through a JobContext.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from database.db_manager import DatabaseManager
+
+ACTIVE_STATUSES = ('pending', 'running')
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled"""
+
+
+def make_dedup_key(kind, params):
+    payload = json.dumps([kind, params or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class JobQueue:
+    def __init__(self, db_manager: DatabaseManager = None):
+        self.db = db_manager or DatabaseManager()
+        self.db_name = self.db.db_name
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params']) if job['params'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def submit(self, kind, params=None):
+        """
+        Queue a job. Returns (job_id, created); if an identical job is already
+        pending or running, its id is returned with created=False.
+        """
+        dedup_key = make_dedup_key(kind, params)
+        conn = self._connect()
+        try:
+            for _ in range(3):
+                try:
+                    cursor = conn.execute('''
+                        INSERT INTO jobs (kind, params, dedup_key)
+                        VALUES (?, ?, ?)
+                    ''', (kind, json.dumps(params or {}, ensure_ascii=False), dedup_key))
+                    conn.commit()
+                    return cursor.lastrowid, True
+                except sqlite3.IntegrityError:
+                    row = conn.execute('''
+                        SELECT id FROM jobs
+                        WHERE dedup_key = ? AND status IN ('pending', 'running')
+                    ''', (dedup_key,)).fetchone()
+                    if row:
+                        return row['id'], False
+                    # The duplicate finished between our insert and select; try again
+            raise RuntimeError(f"Could not queue job {kind}")
+        finally:
+            conn.close()
+
+    def claim(self, kinds=None):
+        """Atomically move the oldest pending job to running and return it"""
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            query = "SELECT * FROM jobs WHERE status = 'pending'"
+            args = []
+            if kinds:
+                query += f" AND kind IN ({','.join('?' * len(kinds))})"
+                args.extend(kinds)
+            row = conn.execute(query + ' ORDER BY id LIMIT 1', args).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+
+            conn.execute('''
+                UPDATE jobs
+                SET status = 'running', started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (row['id'],))
+            conn.execute('COMMIT')
+            job = self._to_dict(row)
+            job['status'] = 'running'
+            return job
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _update(self, job_id, sql, args):
+        conn = self._connect()
+        try:
+            conn.execute(sql, (*args, job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def update_progress(self, job_id, progress, message=None):
+        """Record progress (0..1); also acts as the worker heartbeat"""
+        self._update(job_id, '''
+            UPDATE jobs SET progress = ?, message = COALESCE(?, message), updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (progress, message))
+
+    def complete(self, job_id, result=None):
+        self._update(job_id, '''
+            UPDATE jobs
+            SET status = 'done', progress = 1, result = ?,
+                updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (json.dumps(result, ensure_ascii=False),))
+
+    def fail(self, job_id, error):
+        self._update(job_id, '''
+            UPDATE jobs
+            SET status = 'failed', error = ?, updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (str(error)[:500],))
+
+    def mark_cancelled(self, job_id):
+        self._update(job_id, '''
+            UPDATE jobs
+            SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', ())
+
+    def cancel(self, job_id):
+        """Cancel a pending job now, or ask a running job to stop at its next progress report"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                UPDATE jobs
+                SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'pending'
+            ''', (job_id,))
+            conn.execute('''
+                UPDATE jobs SET cancel_requested = 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'running'
+            ''', (job_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def is_cancel_requested(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            return bool(row and row['cancel_requested'])
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            return self._to_dict(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def list_jobs(self, limit=10, kind=None, active_only=False):
+        query = 'SELECT * FROM jobs WHERE 1 = 1'
+        args = []
+        if kind:
+            query += ' AND kind = ?'
+            args.append(kind)
+        if active_only:
+            query += " AND status IN ('pending', 'running')"
+        conn = self._connect()
+        try:
+            rows = conn.execute(query + ' ORDER BY id DESC LIMIT ?', (*args, limit)).fetchall()
+            return [self._to_dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def requeue_stale(self, stale_after=300):
+        """Put running jobs with no heartbeat for stale_after seconds back to pending"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute('''
+                UPDATE jobs SET status = 'pending', updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'running' AND updated_at < datetime('now', ?)
+            ''', (f'-{int(stale_after)} seconds',))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+
+class JobContext:
+    """Handed to job handlers: params, progress reporting and cancellation"""
+
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.job_id = job['id']
+        self.kind = job['kind']
+        self.params = job['params']
+
+    def report(self, progress, message=None):
+        """Update progress; raises JobCancelled if cancellation was requested"""
+        self.queue.update_progress(self.job_id, progress, message)
+        if self.cancelled():
+            raise JobCancelled(f"Job {self.job_id} cancelled")
+
+    def cancelled(self):
+        return self.queue.is_cancel_requested(self.job_id)
+
+
+class JobRunner:
+    """
+    Worker thread pool draining the queue. Handlers are functions taking a
+    JobContext and returning a JSON-serializable result. Several processes
+    may each run a JobRunner against the same database; claims are atomic.
+    """
+
+    def __init__(self, queue, handlers, workers=2, poll_interval=0.5, periodic=None):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.periodic = periodic or {}  # kind -> seconds between submissions (first one at start)
+        self._next_submit = {}
+        self._periodic_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return self
+        self.queue.requeue_stale()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f'saral-job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _submit_due(self):
+        """Queue the periodic jobs whose interval has passed (deduplicated across processes)"""
+        now = time.monotonic()
+        with self._periodic_lock:
+            due = [kind for kind, interval in self.periodic.items() if now >= self._next_submit.get(kind, 0)]
+            for kind in due:
+                self._next_submit[kind] = now + self.periodic[kind]
+        for kind in due:
+            self.queue.submit(kind)
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                self._submit_due()
+                job = self.queue.claim(list(self.handlers))
+            except sqlite3.OperationalError as e:
+                print(f"Job claim error: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        ctx = JobContext(self.queue, job)
+        try:
+            result = self.handlers[job['kind']](ctx)
+        except JobCancelled:
+            self.queue.mark_cancelled(job['id'])
+        except Exception as e:
+            print(f"❌ Job {job['id']} ({job['kind']}) failed: {e}")
+            self.queue.fail(job['id'], e)
+        else:
+            self.queue.complete(job['id'], result)
+
+
+# Test the queue
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("=" * 50)
+    print("JOB QUEUE TEST")
+    print("=" * 50)
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'jobs.db'))
+    queue = JobQueue(db)
+
+    def slow_job(ctx):
+        for step in range(5):
+            time.sleep(0.1)
+            ctx.report((step + 1) / 5, f"Step {step + 1}/5")
+        return {'steps': 5}
+
+    runner = JobRunner(queue, {'slow': slow_job, 'cancel_me': slow_job}).start()
+
+    first, created_first = queue.submit('slow', {'n': 1})
+    second, created_second = queue.submit('slow', {'n': 1})
+    print(f"   Duplicate submit deduplicated: {first == second and created_first and not created_second}")
+
+    victim, _ = queue.submit('cancel_me')
+    time.sleep(0.15)
+    queue.cancel(victim)
+
+    time.sleep(1)
+    print(f"   Job {first}: {queue.get(first)['status']} {queue.get(first)['result']}")
+    print(f"   Job {victim}: {queue.get(victim)['status']}")
+    runner.stop()
+
+    ticker = JobRunner(queue, {'tick': lambda ctx: {}}, workers=1, poll_interval=0.05,
+                       periodic={'tick': 0.3}).start()
+    time.sleep(1)
+    ticker.stop()
+    print(f"   Periodic job queued {len(queue.list_jobs(kind='tick'))} times in 1s")
+    print("=" * 50)
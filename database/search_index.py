@@ -0,0 +1,163 @@
+"""
+In-memory multilingual search index.
+
+Covers the English source columns and every cached translation. Each word
+is reduced to a phonetic key (utils/transliteration.py), so a query typed
+in Telugu script, in romanized form or in English lands on the same
+postings. The last query word is matched as a prefix for search-as-you-type.
+Near-duplicate aliases (database/dedup.py) are indexed under their canonical
+scheme, so each cluster is one result that matches any of its names.
+"""
+import math
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from database.db_manager import DatabaseManager
+from utils.transliteration import phonetic_keys
+
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'category': 1.0,
+    'description': 1.0,
+    'eligibility': 1.5,
+    'benefits': 1.0
+}
+
+TRANSLATED_FIELDS = {
+    'translated_title': 'title',
+    'translated_description': 'description',
+    'translated_eligibility': 'eligibility',
+    'translated_benefits': 'benefits'
+}
+
+MAX_PREFIX_EXPANSION = 256  # Keys considered for one prefix
+PREFIX_PENALTY = 0.7  # Prefix hits rank below exact hits
+
+
+class MultilingualSearchIndex:
+    def __init__(self, db_manager: DatabaseManager = None):
+        self.db = db_manager or DatabaseManager()
+        self._lock = threading.Lock()
+        self.postings = {}  # phonetic key -> {scheme_id: weight}
+        self.keys = []  # Sorted phonetic keys for prefix lookup
+        self.signature = None
+
+    @staticmethod
+    def _index_text(postings, scheme_id, field, text):
+        weight = FIELD_WEIGHTS[field]
+        for key in phonetic_keys(text):
+            docs = postings[key]
+            if docs.get(scheme_id, 0) < weight:
+                docs[scheme_id] = weight
+
+    def build(self):
+        """(Re)build from schemes and cached translations"""
+        signature = self.db.get_data_signature()
+        aliases = self.db.get_scheme_aliases()
+        postings = defaultdict(dict)
+
+        for scheme in self.db.get_all_schemes():
+            scheme_id = aliases.get(scheme['id'], scheme['id'])
+            for field in FIELD_WEIGHTS:
+                self._index_text(postings, scheme_id, field, scheme.get(field))
+
+        for translation in self.db.get_all_translations():
+            scheme_id = aliases.get(translation['scheme_id'], translation['scheme_id'])
+            for column, field in TRANSLATED_FIELDS.items():
+                self._index_text(postings, scheme_id, field, translation.get(column))
+
+        postings = dict(postings)
+        keys = sorted(postings)
+        with self._lock:
+            self.postings, self.keys, self.signature = postings, keys, signature
+        return len(keys)
+
+    def refresh_if_stale(self):
+        """Rebuild when schemes or translations changed since the last build"""
+        if self.db.get_data_signature() != self.signature:
+            self.build()
+            return True
+        return False
+
+    @staticmethod
+    def _matching_keys(postings, keys, key, prefix):
+        if not prefix:
+            return [key] if key in postings else []
+        start = bisect_left(keys, key)
+        end = bisect_left(keys, key + '\x7f', start)
+        return keys[start:min(end, start + MAX_PREFIX_EXPANSION)]
+
+    def search_ids(self, query, limit=20):
+        """Ranked scheme ids matching every word of query"""
+        query_keys = phonetic_keys(query)
+        if not query_keys:
+            return []
+
+        # One consistent generation: a rebuild may swap both while this search runs
+        with self._lock:
+            postings, keys = self.postings, self.keys
+        total = max(1, len(postings))
+        scores = None
+        for i, key in enumerate(query_keys):
+            # Last word is still being typed; longer words also match inflections
+            prefix = i == len(query_keys) - 1 or len(key) >= 4
+            word_scores = {}
+            for term in self._matching_keys(postings, keys, key, prefix):
+                docs = postings[term]
+                idf = math.log(1 + total / len(docs))
+                factor = 1.0 if term == key else PREFIX_PENALTY
+                for scheme_id, weight in docs.items():
+                    score = weight * idf * factor
+                    if score > word_scores.get(scheme_id, 0):
+                        word_scores[scheme_id] = score
+
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {sid: scores[sid] + s for sid, s in word_scores.items() if sid in scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [scheme_id for scheme_id, _ in ranked[:limit]]
+
+    def search(self, query, limit=20):
+        """Ranked scheme dicts for query in any supported language or romanization"""
+        return self.db.get_schemes_by_ids(self.search_ids(query, limit))
+
+
+# Test the index
+if __name__ == "__main__":
+    import json
+    import os
+    import tempfile
+
+    print("=" * 50)
+    print("MULTILINGUAL SEARCH TEST")
+    print("=" * 50)
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'search.db'))
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        db.insert_schemes(json.load(f))
+
+    rythu = db.search_schemes('Rythu Bandhu')[0]
+    db.save_translation(rythu['id'], 'Telugu', {
+        'title': 'రైతు బంధు పథకం',
+        'description': 'రైతులకు పెట్టుబడి సహాయం',
+        'eligibility': 'తెలంగాణలో భూమి ఉన్న రైతులు',
+        'benefits': 'ఎకరాకు రూ. 5,000'
+    })
+
+    index = MultilingualSearchIndex(db)
+    print(f"   Indexed {index.build()} keys")
+    for query in ['రైతు', 'raithu', 'rythu band', 'పెన్షన్', 'kisan', 'pension']:
+        titles = [s['title'] for s in index.search(query, limit=3)]
+        print(f"   {query:<12} -> {titles}")
+
+    # Re-translating in place keeps MAX(id); the data version still marks the index stale
+    db.save_translation(rythu['id'], 'Telugu', {'title': 'అన్నదాత రైతు బంధు'})
+    assert not index.search_ids('అన్నదాత')
+    assert index.refresh_if_stale() and index.search_ids('అన్నదాత') == [rythu['id']]
+    print("   ✅ In-place translation update re-indexed")
+    print("=" * 50)
@@ -0,0 +1,203 @@
+"""
+Read-only, memory-mapped copy of the multilingual search index.
+
+One process (the API supervisor) builds MultilingualSearchIndex and writes
+it to a flat file; every worker process maps that file read-only, so N
+workers share one copy in the OS page cache instead of building N private
+dicts. Layout (native byte order, 4-byte aligned):
+
+    b'SARALIDX' | u32 header length | header JSON | padding
+    key offsets u32[keys + 1] | posting starts u32[keys + 1]
+    scheme ids u32[postings] | weights f32[postings] | UTF-8 key blob
+
+Keys are sorted, so lookups bisect the offsets without decoding the blob.
+Files are replaced atomically; readers notice the new inode and remap.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from database.db_manager import DatabaseManager
+from database.search_index import MultilingualSearchIndex
+
+MAGIC = b'SARALIDX'
+FORMAT_VERSION = 1
+SEARCH_INDEX_FILE = 'search_index.bin'
+
+
+class SharedIndexError(Exception):
+    pass
+
+
+def write_search_index(index, path):
+    """Write a built MultilingualSearchIndex to path (atomically); returns bytes written"""
+    keys = index.keys
+    key_offsets, starts = array('I', [0]), array('I', [0])
+    ids, weights = array('I'), array('f')
+    blob = bytearray()
+    for key in keys:
+        blob += key.encode('utf-8')
+        key_offsets.append(len(blob))
+        for scheme_id, weight in index.postings[key].items():
+            ids.append(scheme_id)
+            weights.append(weight)
+        starts.append(len(ids))
+
+    header = json.dumps({
+        'format_version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'signature': list(index.signature or ()),
+        'keys': len(keys),
+        'postings': len(ids)
+    }).encode('utf-8')
+    header += b' ' * (-(len(MAGIC) + 4 + len(header)) % 4)
+
+    partial_path = path + '.partial'
+    with open(partial_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('>I', len(header)))
+        f.write(header)
+        for section in (key_offsets, starts, ids, weights):
+            section.tofile(f)
+        f.write(blob)
+    os.replace(partial_path, path)  # Readers keep their old mapping until they remap
+    return os.path.getsize(path)
+
+
+def publish_search_index(db, index_dir, signature=None):
+    """Rebuild and republish when the data changed; returns the published signature"""
+    current = db.get_data_signature()
+    if signature is not None and tuple(signature) == tuple(current):
+        return signature
+    os.makedirs(index_dir, exist_ok=True)
+    index = MultilingualSearchIndex(db)
+    index.build()
+    write_search_index(index, os.path.join(index_dir, SEARCH_INDEX_FILE))
+    return index.signature
+
+
+class _KeyView:
+    """Sorted keys of a mapped file as a read-only sequence of str (bisect-able)"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+
+class _PostingsView:
+    """key -> {scheme_id: weight}, decoded on access from the mapped arrays"""
+
+    def __init__(self, keys, starts, ids, weights):
+        self.keys = keys
+        self.starts = starts
+        self.ids = ids
+        self.weights = weights
+
+    def _position(self, key):
+        lo, hi = 0, len(self.keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.keys[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self.keys) and self.keys[lo] == key else -1
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return self._position(key) >= 0
+
+    def __getitem__(self, key):
+        i = self._position(key)
+        if i < 0:
+            raise KeyError(key)
+        start, end = self.starts[i], self.starts[i + 1]
+        return dict(zip(self.ids[start:end].tolist(), self.weights[start:end].tolist()))
+
+
+class SharedSearchIndex(MultilingualSearchIndex):
+    """MultilingualSearchIndex served from a file written by publish_search_index()"""
+
+    def __init__(self, path, db_manager: DatabaseManager = None):
+        super().__init__(db_manager)
+        self.path = path
+        self.file_id = None
+        self.load()
+
+    def load(self):
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise SharedIndexError(f"{self.path} is not a SARAL index file")
+        (length,) = struct.unpack('>I', mapped[len(MAGIC):len(MAGIC) + 4])
+        offset = len(MAGIC) + 4 + length
+        header = json.loads(mapped[len(MAGIC) + 4:offset])
+        if header['format_version'] > FORMAT_VERSION or header['byteorder'] != sys.byteorder:
+            raise SharedIndexError(f"{self.path} was written by an incompatible version or platform")
+
+        view = memoryview(mapped)
+        sections = []
+        for count, code in ((header['keys'] + 1, 'I'), (header['keys'] + 1, 'I'),
+                            (header['postings'], 'I'), (header['postings'], 'f')):
+            sections.append(view[offset:offset + 4 * count].cast(code))
+            offset += 4 * count
+        key_offsets, starts, ids, weights = sections
+
+        keys = _KeyView(key_offsets, view[offset:])
+        postings = _PostingsView(keys, starts, ids, weights)
+        with self._lock:
+            # The previous mapping is released once in-flight searches drop it
+            self.keys, self.postings = keys, postings
+            self.signature = tuple(header['signature'])
+            self.file_id = (stat.st_ino, stat.st_mtime_ns)
+        return header['keys']
+
+    def build(self):
+        raise SharedIndexError("Shared indexes are read-only; use publish_search_index()")
+
+    def refresh_if_stale(self):
+        """Remap when the publisher replaced the file"""
+        stat = os.stat(self.path)
+        if (stat.st_ino, stat.st_mtime_ns) != self.file_id:
+            self.load()
+            return True
+        return False
+
+
+# Test the shared index
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 50)
+    print("SHARED INDEX TEST")
+    print("=" * 50)
+
+    workdir = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(workdir, 'shared.db'))
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        db.insert_schemes(json.load(f))
+
+    publish_search_index(db, workdir)
+    local = MultilingualSearchIndex(db)
+    local.build()
+    shared = SharedSearchIndex(os.path.join(workdir, SEARCH_INDEX_FILE), db)
+    print(f"   Mapped {len(shared.keys)} keys ({os.path.getsize(shared.path):,} bytes)")
+    for query in ['raithu', 'pension', 'kisan', 'ఆరోగ్య']:
+        same = shared.search_ids(query) == local.search_ids(query)
+        titles = [s['title'] for s in shared.search(query, limit=2)]
+        print(f"   {query:<10} -> {titles} {'✅' if same else '❌ differs from in-memory index'}")
+    print("=" * 50)
@@ -0,0 +1,266 @@
+"""
+Portable snapshots of the catalogue and its caches.
+
+A snapshot is a SQLite database holding only the SNAPSHOT_TABLES, taken
+with the online backup API (consistent while the app keeps writing),
+compressed as one stream behind a small header:
+
+    b'SARALSNP' | u32 manifest length | manifest JSON | compressed database
+
+The manifest records the format and schema versions, codec, row counts and
+the SHA-256 of the uncompressed database. Import decompresses straight to a
+temporary file while hashing (never holding the payload in memory), then
+copies the tables into the target in one transaction. Eligibility criteria
+from snapshots taken before the current extraction rules are re-extracted
+rather than copied.
+
+Usage:
+    python -m database.snapshot export snapshot.saral
+    python -m database.snapshot import snapshot.saral --db database/schemes.db
+    python -m database.snapshot info snapshot.saral
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import zlib
+from datetime import datetime
+
+from database.db_manager import DatabaseManager, ELIGIBILITY_RULES_VERSION, SCHEMA_VERSION
+
+MAGIC = b'SARALSNP'
+FORMAT_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+# Shared, node-independent data. Logs, usage and jobs stay with their node
+SNAPSHOT_TABLES = ['schemes', 'translations', 'scheme_eligibility', 'translation_memory', 'scheme_aliases']
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def available_codecs():
+    codecs = ['gzip', 'lzma']
+    try:
+        import zstandard  # noqa: F401 - optional, much faster than the stdlib codecs
+        codecs.insert(0, 'zstd')
+    except ImportError:
+        pass
+    return codecs
+
+
+def _compressed_writer(codec, fileobj):
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level=10).stream_writer(fileobj, closefd=False)
+    if codec == 'lzma':
+        # Preset 2: ~15% larger than the default preset 6 but about 8x faster to write
+        return lzma.open(fileobj, 'wb', preset=2)
+    if codec == 'gzip':
+        # Level 6: near-maximum ratio on text at a fraction of level 9's time
+        return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=6, mtime=0)
+    raise SnapshotError(f"Unknown codec '{codec}' (available: {', '.join(available_codecs())})")
+
+
+def _compressed_reader(codec, fileobj):
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise SnapshotError("Snapshot is zstd-compressed; pip install zstandard to import it")
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    if codec == 'lzma':
+        return lzma.open(fileobj, 'rb')
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    raise SnapshotError(f"Unknown codec '{codec}'")
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(fileobj):
+    """Read and validate the header; leaves fileobj at the start of the payload"""
+    if fileobj.read(len(MAGIC)) != MAGIC:
+        raise SnapshotError("Not a SARAL snapshot")
+    (length,) = struct.unpack('>I', fileobj.read(4))
+    manifest = json.loads(fileobj.read(length).decode('utf-8'))
+    if manifest.get('format_version', 0) > FORMAT_VERSION:
+        raise SnapshotError(f"Snapshot format {manifest['format_version']} is newer than supported ({FORMAT_VERSION})")
+    return manifest
+
+
+def export_snapshot(db_name, output_path, codec=None):
+    """Write a snapshot of db_name to output_path; returns the manifest"""
+    codec = codec or available_codecs()[0]
+    DatabaseManager(db_name)  # Make sure the schema is current before copying
+
+    with tempfile.TemporaryDirectory() as workdir:
+        payload_path = os.path.join(workdir, 'snapshot.db')
+
+        source = sqlite3.connect(db_name)
+        payload = sqlite3.connect(payload_path)
+        try:
+            source.backup(payload)
+        finally:
+            source.close()
+
+        try:
+            tables = [row[0] for row in payload.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )]
+            for table in tables:
+                if table not in SNAPSHOT_TABLES:
+                    payload.execute(f'DROP TABLE {table}')
+            payload.commit()
+            row_counts = {
+                table: payload.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in SNAPSHOT_TABLES if table in tables
+            }
+            payload.execute('VACUUM')  # Drop the free pages left by the dropped tables
+        finally:
+            payload.close()
+
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'schema_version': SCHEMA_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'codec': codec,
+            'tables': row_counts,
+            'payload_bytes': os.path.getsize(payload_path),
+            'sha256': _sha256_file(payload_path)
+        }
+        header = json.dumps(manifest).encode('utf-8')
+
+        partial_path = output_path + '.partial'
+        with open(partial_path, 'wb') as out:
+            out.write(MAGIC)
+            out.write(struct.pack('>I', len(header)))
+            out.write(header)
+            writer = _compressed_writer(codec, out)
+            with open(payload_path, 'rb') as src:
+                shutil.copyfileobj(src, writer, CHUNK_SIZE)
+            writer.close()
+        os.replace(partial_path, output_path)  # Never leave a truncated snapshot behind
+
+    manifest['snapshot_bytes'] = os.path.getsize(output_path)
+    return manifest
+
+
+def import_snapshot(input_path, db_name):
+    """Replace the snapshot tables of db_name with the snapshot's contents; returns the manifest"""
+    target = DatabaseManager(db_name)  # Creates or upgrades the target schema
+
+    with tempfile.TemporaryDirectory() as workdir:
+        payload_path = os.path.join(workdir, 'snapshot.db')
+
+        with open(input_path, 'rb') as f:
+            manifest = read_manifest(f)
+            if manifest['schema_version'] > SCHEMA_VERSION:
+                raise SnapshotError(
+                    f"Snapshot schema v{manifest['schema_version']} is newer than this code (v{SCHEMA_VERSION})"
+                )
+            # Decompress and hash in one streaming pass
+            digest = hashlib.sha256()
+            reader = _compressed_reader(manifest['codec'], f)
+            try:
+                with open(payload_path, 'wb') as out:
+                    for chunk in iter(lambda: reader.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        out.write(chunk)
+            except (EOFError, OSError, lzma.LZMAError, zlib.error) as e:
+                raise SnapshotError(f"Snapshot is corrupt or truncated: {e}")
+
+        if digest.hexdigest() != manifest['sha256']:
+            raise SnapshotError("Checksum mismatch: snapshot is corrupt or truncated")
+
+        conn = sqlite3.connect(target.db_name, isolation_level=None)
+        try:
+            conn.execute('ATTACH DATABASE ? AS snap', (payload_path,))
+            conn.execute('BEGIN IMMEDIATE')
+            # Criteria extracted by older rules are redone, as the schema upgrade does
+            stale_eligibility = manifest['schema_version'] < ELIGIBILITY_RULES_VERSION
+            for table in manifest['tables']:
+                if table not in SNAPSHOT_TABLES or (table == 'scheme_eligibility' and stale_eligibility):
+                    continue
+                # Copy the columns both sides know, so older snapshots still load
+                target_columns = [row[1] for row in conn.execute(f'PRAGMA main.table_info({table})')]
+                snap_columns = {row[1] for row in conn.execute(f'PRAGMA snap.table_info({table})')}
+                columns = ', '.join(c for c in target_columns if c in snap_columns)
+                conn.execute(f'DELETE FROM main.{table}')
+                conn.execute(f'INSERT INTO main.{table} ({columns}) SELECT {columns} FROM snap.{table}')
+            if 'scheme_aliases' not in manifest['tables']:
+                # Older snapshot: the existing links point at scheme ids that were just replaced
+                conn.execute('DELETE FROM main.scheme_aliases')
+            if stale_eligibility or 'scheme_eligibility' not in manifest['tables']:
+                conn.execute('DELETE FROM main.scheme_eligibility')
+                cursor = conn.cursor()
+                cursor.execute('SELECT id, category, eligibility FROM main.schemes')
+                target._save_eligibility(cursor, {
+                    scheme_id: {'category': category, 'eligibility': eligibility}
+                    for scheme_id, category, eligibility in cursor.fetchall()
+                })
+            # Rows replaced under the same ids leave MAX(id) alone; tell in-memory indexes
+            conn.execute("UPDATE main.stats_counters SET value = value + 1 WHERE name = 'data_version'")
+            conn.execute('COMMIT')
+            conn.execute('DETACH DATABASE snap')
+            target.recount_stats()  # Scheme counters are kept by the write path, not triggers
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import a SARAL data snapshot")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = sub.add_parser('export', help="Write a snapshot of the database")
+    export_parser.add_argument('output')
+    export_parser.add_argument('--db', default='database/schemes.db')
+    export_parser.add_argument('--codec', choices=['zstd', 'lzma', 'gzip'],
+                               help=f"Compression (default: {available_codecs()[0]})")
+
+    import_parser = sub.add_parser('import', help="Load a snapshot into the database")
+    import_parser.add_argument('input')
+    import_parser.add_argument('--db', default='database/schemes.db')
+
+    info_parser = sub.add_parser('info', help="Show a snapshot's manifest")
+    info_parser.add_argument('input')
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'export':
+            manifest = export_snapshot(args.db, args.output, args.codec)
+            print(f"✅ Exported {manifest['tables']} to {args.output} "
+                  f"({manifest['snapshot_bytes'] / 1024:.1f} KB, {manifest['codec']})")
+        elif args.command == 'import':
+            manifest = import_snapshot(args.input, args.db)
+            print(f"✅ Imported {manifest['tables']} from {args.input} "
+                  f"(snapshot of {manifest['created_at']})")
+        else:
+            with open(args.input, 'rb') as f:
+                print(json.dumps(read_manifest(f), indent=2))
+    except (SnapshotError, OSError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker for the LLM backend.
+
+    closed    -> calls go through; outcomes are tracked in a rolling window
+    open      -> calls fail fast until reset_timeout has passed
+    half_open -> a single probe call is let through; success closes the
+                 circuit, failure opens it again
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=0.5, min_calls=4, window_size=20, reset_timeout=30):
+        self.failure_threshold = failure_threshold  # Error rate that trips the breaker
+        self.min_calls = min_calls  # Calls needed in the window before tripping
+        self.reset_timeout = reset_timeout  # Seconds to stay open before probing
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {
+            'rejected': 0,
+            'times_opened': 0
+        }
+
+    def _refresh(self):
+        """Move open -> half_open once the timeout has elapsed (lock held)"""
+        if self._state == self.OPEN and time.time() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.time()
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self.stats['times_opened'] += 1
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def is_open(self):
+        """True while calls would be rejected (does not consume the probe)"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.HALF_OPEN:
+                return self._probe_in_flight
+            return self._state == self.OPEN
+
+    def allow_request(self):
+        """Check whether a call may proceed; counts rejections"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trip()
+                return
+
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_threshold):
+                self._trip()
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker"""
+        if not self.allow_request():
+            raise CircuitOpenError("LLM backend unavailable (circuit open)")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def get_stats(self):
+        """Snapshot of breaker state for the UI"""
+        with self._lock:
+            self._refresh()
+            failures = self._outcomes.count(False)
+            return {
+                'state': self._state,
+                'window_calls': len(self._outcomes),
+                'window_failures': failures,
+                'rejected': self.stats['rejected'],
+                'times_opened': self.stats['times_opened']
+            }
+
+
+# Test the breaker against a failing fake model
+if __name__ == "__main__":
+    from llm.fake_model import FakeModel
+    from llm.gemini_handler import GeminiHandler
+
+    print("=" * 50)
+    print("CIRCUIT BREAKER TEST")
+    print("=" * 50)
+
+    model = FakeModel(fail_rate=1.0)
+    breaker = CircuitBreaker(min_calls=4, reset_timeout=0.5)
+    handler = GeminiHandler(model=model, breaker=breaker)
+    handler.min_request_interval = 0
+
+    start = time.time()
+    for i in range(20):
+        handler.translate_text(f"Scheme text {i}", "Hindi")
+    elapsed = time.time() - start
+    print(f"   20 calls, model hit {model.calls} times, state: {breaker.state}")
+    print(f"   Elapsed: {elapsed:.3f}s, rejected fast: {breaker.get_stats()['rejected']}")
+
+    print("\n   Backend recovers...")
+    model.fail_rate = 0.0
+    time.sleep(0.6)
+    print(f"   State after timeout: {breaker.state}")
+    print(f"   Probe result: {handler.translate_text('Scheme text probe', 'Hindi')}")
+    print(f"   State after probe: {breaker.state}")
+    print("=" * 50)
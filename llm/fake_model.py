@@ -0,0 +1,60 @@
+import random
+import re
+import threading
+import time
+
+NUMBERED_LINE = re.compile(r'^(\d+)\. (.+)$', re.MULTILINE)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Drop-in stand-in for genai.GenerativeModel with fault injection.
+
+    Answers with an echo of the prompt's "Text:" section (or of each numbered
+    line, for batch prompts) so callers can run without a GOOGLE_API_KEY.
+    fail_rate and fail_next inject errors.
+    """
+
+    def __init__(self, fail_rate=0.0, latency=0.0, seed=0, error=None):
+        self.fail_rate = fail_rate
+        self.latency = latency  # Seconds per call
+        self.fail_next = 0  # Force the next N calls to fail
+        self.error = error or RuntimeError("429 Resource has been exhausted (fake)")
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _should_fail(self):
+        with self._lock:
+            self.calls += 1
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                fail = True
+            else:
+                fail = self._random.random() < self.fail_rate
+            if fail:
+                self.failures += 1
+            return fail
+
+    def generate_content(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        if self._should_fail():
+            raise self.error
+        return FakeResponse(self._reply(prompt))
+
+    def _reply(self, prompt):
+        numbered = NUMBERED_LINE.findall(prompt)
+        if numbered:
+            return '\n'.join(f"{n}. [fake] {line.strip()}" for n, line in numbered)
+
+        text = prompt
+        if 'Text:' in prompt:
+            text = prompt.split('Text:', 1)[1].split('\n\n', 1)[0]
+        return f"[fake] {text.strip()}"
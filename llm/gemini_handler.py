@@ -1,36 +1,145 @@
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+import threading
 import time
+from llm.request_coalescer import default_coalescer, make_key
+from llm.circuit_breaker import CircuitBreaker, CircuitOpenError
+from llm.translation_memory import build_batch_prompt, parse_batch_reply
+from utils import metrics
 
-load_dotenv()
+# Shared by every session so one outage trips the breaker for all of them
+default_breaker = CircuitBreaker()
+
+_env_loaded = False
+
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def get_api_key():
+    """Read GOOGLE_API_KEY, loading .env on first use"""
+    _load_env()
+    return os.getenv('GOOGLE_API_KEY')
+
+def create_gemini_model(api_key):
+    """Build the Gemini client (google.generativeai is imported only here)"""
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-pro')
+
+def _gemini_backend():
+    api_key = get_api_key()
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY not found in .env file")
+    return create_gemini_model(api_key)
+
+def _simulator_backend():
+    from llm.simulator import SimulatedModel
+    return SimulatedModel.from_spec(os.getenv('SARAL_SIMULATOR', ''))
+
+# Model backends by name: factories returning an object with
+# generate_content(prompt) -> response with .text (see llm/simulator.py)
+MODEL_BACKENDS = {
+    'gemini': _gemini_backend,
+    'simulator': _simulator_backend
+}
+
+def get_backend():
+    """Configured backend name (SARAL_LLM_BACKEND, default 'gemini')"""
+    _load_env()
+    return os.getenv('SARAL_LLM_BACKEND', '').strip().lower() or 'gemini'
+
+def llm_available():
+    """Whether create_model() can succeed, without building the client"""
+    return get_backend() != 'gemini' or bool(get_api_key())
+
+def create_model(backend=None):
+    """Model client for the given or configured backend; ValueError if it can't be used"""
+    backend = backend or get_backend()
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{backend}' (one of {', '.join(MODEL_BACKENDS)})")
+    return MODEL_BACKENDS[backend]()
 
 class GeminiHandler:
-    def __init__(self):
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in .env file")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, model=None, breaker=None, usage_tracker=None, memory=None):
+        self.model = model if model is not None else create_model()
         self.last_request_time = 0
         self.min_request_interval = 1  # Seconds between requests
+        self._rate_lock = threading.Lock()
+        self.coalescer = default_coalescer
+        self.breaker = breaker or default_breaker
+        self.usage = usage_tracker  # Optional UsageTracker for token accounting
+        self.memory = memory  # Optional TranslationMemory for segment reuse
     
     def _rate_limit(self):
-        """Simple rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        """Space requests min_request_interval apart, across threads too"""
+        # Each caller reserves the next free slot under the lock, then sleeps outside it
+        with self._rate_lock:
+            current_time = time.time()
+            slot = max(current_time, self.last_request_time + self.min_request_interval)
+            self.last_request_time = slot
+        wait = slot - current_time
+        if wait > 0:
+            metrics.observe('llm_rate_limit_wait_seconds', wait)
+            time.sleep(wait)
+    
+    def _generate(self, prompt, feature, language=None):
+        """Call the model through the circuit breaker (fails fast while open)"""
+        if not self.breaker.allow_request():
+            metrics.inc('llm_circuit_rejected_total')
+            raise CircuitOpenError("LLM backend unavailable (circuit open)")
+        
+        self._rate_limit()
+        
+        start = time.perf_counter()
+        try:
+            response = self.model.generate_content(prompt)
+            text = response.text.strip()
+        except Exception:
+            self.breaker.record_failure()
+            metrics.inc('llm_errors_total')
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe('llm_request_seconds', elapsed, feature=feature)
+        
+        self.breaker.record_success()
+        if self.usage:
+            self.usage.record_call(feature, language, prompt, text, response, latency_ms=elapsed * 1000)
+        metrics.inc('llm_requests_total')
+        metrics.inc('llm_prompt_chars_total', len(prompt))
+        metrics.inc('llm_response_chars_total', len(text))
+        metrics.observe('llm_prompt_chars', len(prompt), buckets=metrics.SIZE_BUCKETS)
+        return text
     
     def translate_text(self, text, target_language):
         """Translate text using Gemini"""
         if not text or text == 'N/A':
             return text
         
-        self._rate_limit()
-        
+        try:
+            return self._translate_coalesced(text, target_language)
+        except CircuitOpenError:
+            return text
+        except Exception as e:
+            print(f"Translation error: {e}")
+            return text
+    
+    def _translate_coalesced(self, text, target_language):
+        key = make_key('translate', text, target_language)
+        return self.coalescer.run(key, self._translate_text, text, target_language)
+    
+    def _translate_text(self, text, target_language):
+        if self.memory:
+            try:
+                return self.memory.translate_texts([text], target_language, self._translate_batch)[0]
+            except ValueError as e:
+                print(f"Batch translation reply unusable ({e}); translating whole text")
+        return self._translate_whole(text, target_language)
+    
+    def _translate_whole(self, text, target_language):
         prompt = f"""Translate the following text to {target_language}. 
 Only provide the translation, no additional text or explanations.
 
@@ -38,20 +147,28 @@ Text: {text}
 
 Translation:"""
         
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return text
+        return self._generate(prompt, 'translate', target_language)
+    
+    def _translate_batch(self, segments, target_language):
+        """Translate a list of segments in one call; ValueError if the reply can't be split back"""
+        reply = self._generate(build_batch_prompt(segments, target_language), 'translate', target_language)
+        return parse_batch_reply(reply, len(segments))
     
     def simplify_text(self, text):
         """Simplify complex government language"""
         if not text or text == 'N/A':
             return text
         
-        self._rate_limit()
-        
+        key = make_key('simplify', text)
+        try:
+            return self.coalescer.run(key, self._simplify_text, text)
+        except CircuitOpenError:
+            return text
+        except Exception as e:
+            print(f"Simplification error: {e}")
+            return text
+    
+    def _simplify_text(self, text):
         prompt = f"""Simplify the following government scheme text for rural and less educated people. 
 Use very simple words, short sentences, and easy to understand language.
 Make it sound friendly and helpful.
@@ -61,37 +178,45 @@ Text: {text}
 
 Simplified version:"""
         
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            print(f"Simplification error: {e}")
-            return text
+        return self._generate(prompt, 'simplify')
     
     def translate_scheme(self, scheme, language):
-        """Translate entire scheme - with progress feedback"""
+        """
+        Translate entire scheme - with progress feedback.
+        Raises on failure so a partial/English fallback is never cached.
+        """
         if language == 'English':
             return scheme
         
+        if self.breaker.is_open():
+            raise CircuitOpenError("LLM backend unavailable (circuit open)")
+        
         print(f"   Translating to {language}...", end='', flush=True)
         
-        translated = {}
+        fields = [f for f in ('title', 'description', 'eligibility', 'benefits')
+                  if scheme[f] and scheme[f] != 'N/A']
+        translated = {f: scheme[f] for f in ('title', 'description', 'eligibility', 'benefits')}
         
         try:
-            translated['title'] = self.translate_text(scheme['title'], language)
-            translated['description'] = self.translate_text(scheme['description'], language)
-            translated['eligibility'] = self.translate_text(scheme['eligibility'], language)
-            translated['benefits'] = self.translate_text(scheme['benefits'], language)
+            if self.memory:
+                try:
+                    # Every field's unseen segments go out in one prompt
+                    texts = self.memory.translate_texts([scheme[f] for f in fields], language,
+                                                        self._translate_batch)
+                except ValueError as e:
+                    print(f" (batch reply unusable: {e}; translating field by field)", end='')
+                    texts = [self._translate_whole(scheme[f], language) for f in fields]
+            else:
+                texts = [self._translate_coalesced(scheme[f], language) for f in fields]
+            translated.update(zip(fields, texts))
             print(" ✅")
             return translated
         except Exception as e:
             print(f" ❌ ({e})")
-            return scheme
+            raise
     
     def generate_simple_explanation(self, scheme):
         """Generate very simple explanation for illiterate users"""
-        self._rate_limit()
-        
         prompt = f"""Explain this government scheme in very simple language that a 10-year-old can understand.
 Use everyday words. Make it 2-3 short sentences only.
 
@@ -103,15 +228,12 @@ What you get: {scheme['benefits']}
 Simple explanation:"""
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate(prompt, 'explain')
         except Exception as e:
             return f"This scheme helps people by providing {scheme['benefits']}"
     
     def answer_question(self, question, context):
         """Answer questions about schemes"""
-        self._rate_limit()
-        
         prompt = f"""You are a helpful government schemes assistant for India.
 Answer the user's question based on the context provided.
 Use simple language that anyone can understand.
@@ -125,8 +247,9 @@ Question: {question}
 Answer:"""
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate(prompt, 'answer')
+        except CircuitOpenError:
+            return "Sorry, the AI assistant is temporarily unavailable. Please try again in a minute."
         except Exception as e:
             return f"Sorry, I encountered an error: {str(e)}"
 
@@ -162,6 +285,7 @@ if __name__ == "__main__":
     except ValueError as e:
         print(f"❌ Error: {e}")
         print("\n💡 Create .env file with: GOOGLE_API_KEY=your_key_here")
+        print("   (or set SARAL_LLM_BACKEND=simulator to run against the local simulator)")
     except Exception as e:
         print(f"❌ Error: {e}")
     
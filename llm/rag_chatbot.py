@@ -1,58 +1,52 @@
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
 import json
+import time
+from llm.gemini_handler import create_model
+from llm.retrieval import HybridRetriever
+
+CONTEXT_SIZE = 3  # Schemes put in the prompt; see benchmarks/retrieval_eval.py for recall vs prompt tokens
+
+
+def format_context(schemes):
+    """Prompt context for the retrieved schemes"""
+    context = "Relevant schemes:\n"
+    for s in schemes:
+        context += f"\n{s['title']}: {s['description']}\nBenefits: {s['benefits']}\n"
+    return context
 
-load_dotenv()
 
 class RAGChatbot:
-    def __init__(self, schemes_data):
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, schemes_data, model=None, usage_tracker=None, context_size=CONTEXT_SIZE):
+        self.model = model if model is not None else create_model()  # ValueError if no backend is configured
+        self.usage = usage_tracker  # Optional UsageTracker for token accounting
         self.schemes_data = schemes_data
+        self.context_size = context_size
+        self._retriever = None  # Built on the first query
         self.create_context()
     
     def create_context(self):
         """Create searchable context from schemes"""
-        self.context = ""
-        for scheme in self.schemes_data:
-            self.context += f"""
+        # join() instead of += on an attribute, which copies the whole string per scheme
+        self.context = "".join(f"""
 Scheme: {scheme['title']}
 Category: {scheme['category']}
 Description: {scheme['description']}
 Eligibility: {scheme['eligibility']}
 Benefits: {scheme['benefits']}
 ---
-"""
+""" for scheme in self.schemes_data)
     
     def search_schemes(self, query):
-        """Simple keyword search"""
-        query_lower = query.lower()
-        relevant = []
-        
-        for scheme in self.schemes_data:
-            text = f"{scheme['title']} {scheme['description']} {scheme['eligibility']} {scheme['benefits']}".lower()
-            if any(word in text for word in query_lower.split()):
-                relevant.append(scheme)
-        
-        return relevant[:3]
+        """Most relevant schemes by hybrid lexical + vector retrieval and local reranking"""
+        if self._retriever is None:
+            self._retriever = HybridRetriever(self.schemes_data)
+        return self._retriever.retrieve(query, self.context_size)
     
-    def chat(self, user_query):
-        """Chat with context"""
+    def build_prompt(self, user_query):
+        """The model prompt for a question, with the most relevant schemes as context"""
         relevant = self.search_schemes(user_query)
+        context = format_context(relevant) if relevant else self.context[:2000]
         
-        if relevant:
-            context = "Relevant schemes:\n"
-            for s in relevant:
-                context += f"\n{s['title']}: {s['description']}\nBenefits: {s['benefits']}\n"
-        else:
-            context = self.context[:2000]
-        
-        prompt = f"""You are a helpful assistant for government schemes in India.
+        return f"""You are a helpful assistant for government schemes in India.
 Answer based on the scheme information provided.
 Use simple language.
 
@@ -62,9 +56,35 @@ Schemes:
 Question: {user_query}
 
 Answer:"""
+    
+    def chat(self, user_query):
+        """Chat with context"""
+        prompt = self.build_prompt(user_query)
         
         try:
+            start = time.perf_counter()
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            answer = response.text.strip()
+            if self.usage:
+                self.usage.record_call('chat', None, prompt, answer, response,
+                                       latency_ms=(time.perf_counter() - start) * 1000)
+            return answer
+        except Exception as e:
+            return f"Sorry, error: {str(e)}"
+    
+    def chat_stream(self, user_query):
+        """Like chat(), but yields the answer in chunks as the model produces them"""
+        prompt = self.build_prompt(user_query)
+        
+        try:
+            start = time.perf_counter()
+            response = self.model.generate_content(prompt, stream=True)
+            parts = []
+            for chunk in response:
+                parts.append(chunk.text)
+                yield chunk.text
+            if self.usage:
+                self.usage.record_call('chat', None, prompt, ''.join(parts).strip(), response,
+                                       latency_ms=(time.perf_counter() - start) * 1000)
         except Exception as e:
-            return f"Sorry, error: {str(e)}"
\ No newline at end of file
+            yield f"Sorry, error: {str(e)}"
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+
+
+def make_key(operation, text, language=None):
+    """Build a coalescing key from (operation, text hash, language)"""
+    text_hash = hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+    return (operation, text_hash, language or '')
+
+
+class RequestCoalescer:
+    """
+    Single-flight deduplication for identical model calls.
+
+    The first caller for a key runs the call; every other caller that arrives
+    while it is in flight waits for (and shares) the same result. Works across
+    threads (Streamlit sessions) and asyncio tasks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.stats = {
+            'calls': 0,
+            'executed': 0,
+            'coalesced': 0,
+            'errors': 0
+        }
+
+    def _join(self, key):
+        """Return (future, is_leader) for key"""
+        with self._lock:
+            self.stats['calls'] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future, False
+
+            future = Future()
+            self._in_flight[key] = future
+            self.stats['executed'] += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if error is not None:
+                self.stats['errors'] += 1
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run(self, key, func, *args, **kwargs):
+        """Run func once per in-flight key, sharing the result with waiters"""
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def run_async(self, key, coro_func, *args, **kwargs):
+        """Async variant of run(); coro_func must return an awaitable"""
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await coro_func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def in_flight(self):
+        """Number of calls currently running"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def get_stats(self):
+        """Snapshot of coalescing metrics"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._in_flight)
+        return stats
+
+
+# Shared by every session in the process
+default_coalescer = RequestCoalescer()
+
+
+# Test the coalescer
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("=" * 50)
+    print("REQUEST COALESCER TEST")
+    print("=" * 50)
+
+    coalescer = RequestCoalescer()
+    model_calls = []
+
+    def slow_translate(text):
+        model_calls.append(text)
+        time.sleep(0.2)
+        return f"[Hindi] {text}"
+
+    key = make_key('translate', 'Rythu Bandhu Scheme', 'Hindi')
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(
+            lambda _: coalescer.run(key, slow_translate, 'Rythu Bandhu Scheme'),
+            range(8)
+        ))
+
+    print(f"   Threads: 8, model calls: {len(model_calls)}")
+    print(f"   Results identical: {len(set(results)) == 1}")
+
+    async def async_translate(text):
+        model_calls.append(text)
+        await asyncio.sleep(0.2)
+        return f"[Telugu] {text}"
+
+    async def main():
+        key = make_key('translate', 'Aasara Pension Scheme', 'Telugu')
+        return await asyncio.gather(*[
+            coalescer.run_async(key, async_translate, 'Aasara Pension Scheme')
+            for _ in range(5)
+        ])
+
+    asyncio.run(main())
+    print(f"   Stats: {coalescer.get_stats()}")
+    print("=" * 50)
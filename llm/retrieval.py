@@ -0,0 +1,335 @@
+"""
+Hybrid retrieval of chatbot context.
+
+Two first-stage retrievers rank the scheme list independently:
+
+- lexical: BM25 over phonetic word keys (utils/transliteration.py), with
+  the search index's field weights, so native-script and romanized words
+  match the English text;
+- vector: hashed character-trigram TF-IDF vectors (the hashing trick; no
+  model download, no numpy), scored by cosine similarity through an
+  inverted index over the hashed dimensions. Trigrams tolerate typos and
+  partial words that exact keys miss.
+
+Their rankings are merged with reciprocal-rank fusion (RRF), which only
+uses rank positions, so the two scores never need calibrating against
+each other. The top RERANK_DEPTH candidates of each retriever are then
+reranked by a cheap local scorer: field-aware overlap with the question's terms, plus
+agreement between the scheme's category and eligibility and what the
+question says about the asker (state or central, occupation, social
+category, gender, age), with the title matched fuzzily for misspelled
+scheme names. The eligibility term is weighted 0 since tuning (see
+RERANK_WEIGHTS).
+
+benchmarks/retrieval_eval.py measures recall@k, MRR and latency on a
+labeled query set (data/retrieval_queries.json).
+"""
+import heapq
+import math
+import re
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+
+from database.search_index import FIELD_WEIGHTS
+from utils.eligibility import (extract_eligibility, parse_clause, extract_state,
+                               UNRESTRICTED_AGE)
+from utils.transliteration import phonetic_key, phonetic_keys
+
+DEPTH = 50  # Candidates taken from each first-stage retriever
+# Candidates from each retriever that the reranker rescores. At 10k synthetic schemes,
+# 20 keeps ~94% of the top 3 that rescoring all DEPTH candidates picks, at ~75% of its latency
+RERANK_DEPTH = 20
+RRF_K = 60  # Rank offset in 1 / (RRF_K + rank); damps the influence of any single list
+BM25_K1 = 1.2
+BM25_B = 0.75
+DIMENSIONS = 1 << 18  # Hashed trigram space; collisions are rare at catalogue vocabulary sizes
+COMMON_DIMENSION_RATIO = 0.2  # Trigrams in more schemes than this carry no signal; not scored
+FUZZY_MATCH = 0.6  # Trigram similarity at which a misspelled word counts as a (partial) match
+
+# Reranker feature weights, chosen by `benchmarks/retrieval_eval.py --tune` on the
+# tuning split of the labeled questions (the test split is held out for reporting)
+RERANK_WEIGHTS = {
+    'fusion': 0.25,
+    'overlap': 1.0,
+    'title': 1.0,
+    'category': 0.3,
+    'eligibility': 0.0  # Did not help on the tuning split; describe_asker() still feeds 'category'
+}
+
+# Question words that say nothing about which scheme is meant
+STOPWORDS = {
+    'a', 'an', 'the', 'i', 'me', 'my', 'we', 'our', 'you', 'am', 'is', 'are', 'was', 'be',
+    'what', 'which', 'who', 'how', 'when', 'where', 'why', 'can', 'could', 'do', 'does',
+    'get', 'for', 'to', 'of', 'in', 'on', 'and', 'or', 'any', 'there', 'about', 'tell',
+    'give', 'with', 'from', 'by', 'it', 'this', 'that', 'some', 'please', 'need', 'want',
+    'scheme', 'schemes', 'yojana', 'years', 'year', 'old'
+}
+STOP_KEYS = {phonetic_key(word) for word in STOPWORDS}
+
+CENTRAL_WORDS = re.compile(r'\b(?:central|centre|center|india|indian|national|pm|pradhan mantri)\b')
+QUERY_AGE = re.compile(r'\b(?:age[d]?\s*)?(\d{1,3})\s*(?:years?|yrs?)(?:\s*old)?\b|\baged?\s*(\d{1,3})\b')
+
+
+def query_terms(text):
+    """Distinct phonetic keys of the words that carry meaning (numbers are left to describe_asker)"""
+    return list(dict.fromkeys(key for key in phonetic_keys(text) if key not in STOP_KEYS and not key.isdigit()))
+
+
+def trigrams(key):
+    padded = f"#{key}#"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+@lru_cache(maxsize=65536)
+def trigram_set(key):
+    return frozenset(trigrams(key))
+
+
+@lru_cache(maxsize=65536)
+def key_dimensions(key):
+    """Hashed vector dimensions of a key's trigrams"""
+    return tuple(hash(gram) % DIMENSIONS for gram in trigrams(key))
+
+
+def trigram_similarity(a, b):
+    """Dice coefficient of two keys' trigram sets"""
+    grams_a, grams_b = trigram_set(a), trigram_set(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """[(doc, score)] from several ranked doc lists, best first"""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            scores[doc] += 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class LexicalIndex:
+    """BM25 over field-weighted phonetic keys"""
+
+    def __init__(self, documents):
+        self.postings = defaultdict(dict)  # key -> {doc: weighted term frequency}
+        lengths = []
+        for doc, fields in enumerate(documents):
+            frequencies = Counter()
+            for field, keys in fields.items():
+                for key in keys:
+                    frequencies[key] += FIELD_WEIGHTS[field]
+            for key, frequency in frequencies.items():
+                self.postings[key][doc] = frequency
+            lengths.append(sum(frequencies.values()))
+        self.lengths = lengths
+        self.average_length = sum(lengths) / len(lengths) if lengths else 1.0
+
+    def idf(self, term):
+        total = len(self.lengths)
+        docs = len(self.postings.get(term, ()))
+        return math.log(1 + (total - docs + 0.5) / (docs + 0.5))
+
+    def search(self, terms, limit=DEPTH):
+        total = len(self.lengths)
+        scores = defaultdict(float)
+        for term in terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc, frequency in docs.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc] / self.average_length)
+                scores[doc] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [doc for doc, _ in ranked[:limit]]
+
+
+class VectorIndex:
+    """Cosine similarity over hashed character-trigram TF-IDF vectors"""
+
+    def __init__(self, documents):
+        # Field weights are left to BM25 and the reranker; unweighted counts keep this in C
+        frequency = Counter()
+        for fields in documents:
+            frequency.update(self._vector(fields).keys())
+
+        total = max(1, len(documents))
+        max_df = max(1, COMMON_DIMENSION_RATIO * total)
+        # Common trigrams are dropped from documents and queries alike
+        self.idf = {dim: math.log(total / df) for dim, df in frequency.items() if df <= max_df}
+        postings = defaultdict(lambda: (array('i'), array('f')))  # dim -> (docs, weights)
+        idf = self.idf
+        for doc, fields in enumerate(documents):
+            weights = [(dim, (1 + math.log(count)) * idf[dim])
+                       for dim, count in self._vector(fields).items() if dim in idf]
+            norm = math.sqrt(sum(w * w for _, w in weights)) or 1.0
+            for dim, weight in weights:
+                docs, values = postings[dim]
+                docs.append(doc)
+                values.append(weight / norm)
+        self.postings = dict(postings)
+
+    @staticmethod
+    def _vector(fields):
+        return Counter(chain.from_iterable(map(key_dimensions, chain.from_iterable(fields.values()))))
+
+    def search(self, terms, limit=DEPTH):
+        vector = Counter(dim for term in terms for dim in key_dimensions(term))
+        weights = {dim: (1 + math.log(count)) * self.idf[dim] for dim, count in vector.items() if dim in self.idf}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if not norm:
+            return []
+        scores = defaultdict(float)
+        for dim, weight in weights.items():
+            docs, values = self.postings[dim]
+            weight /= norm
+            for doc, value in zip(docs, values):
+                scores[doc] += weight * value
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [doc for doc, _ in ranked]
+
+
+def describe_asker(question):
+    """What the question says about the asker: state, central, occupation/social masks, gender, age"""
+    text = question.lower()
+    clause = parse_clause(text)
+    match = QUERY_AGE.search(text)
+    age = int(next(g for g in match.groups() if g)) if match else None
+    return {
+        'state': extract_state(text),
+        'central': bool(CENTRAL_WORDS.search(text)),
+        'occupation_mask': clause['occupation_mask'],
+        'social_mask': clause['social_mask'],
+        'gender': clause['gender'],
+        'age': age
+    }
+
+
+def eligibility_agreement(asker, criteria):
+    """-1..1: how well a scheme's eligibility fits the asker (0 when the question says nothing)"""
+    votes = []
+    for field in ('occupation_mask', 'social_mask'):
+        if asker[field] and criteria[field]:
+            votes.append(1 if asker[field] & criteria[field] else -1)
+    if asker['gender'] and criteria['gender']:
+        votes.append(1 if asker['gender'] == criteria['gender'] else -1)
+    if asker['age'] is not None and (criteria['age_min'], criteria['age_max']) != UNRESTRICTED_AGE:
+        votes.append(1 if criteria['age_min'] <= asker['age'] <= criteria['age_max'] else -1)
+    return sum(votes) / len(votes) if votes else 0.0
+
+
+def category_agreement(asker, category):
+    """1 when the question names the scheme's government (a state, or the centre), else 0"""
+    category = (category or '').lower()
+    if asker['state'] and category.startswith(asker['state'].lower()):
+        return 1.0
+    if asker['central'] and category.startswith('central'):
+        return 1.0
+    return 0.0
+
+
+class HybridRetriever:
+    def __init__(self, schemes, depth=DEPTH, rerank_depth=RERANK_DEPTH, weights=None):
+        self.schemes = schemes
+        self.depth = depth
+        self.rerank_depth = rerank_depth
+        self.weights = dict(RERANK_WEIGHTS, **(weights or {}))
+        documents = [self._document(scheme) for scheme in schemes]
+        self.fields = [{field: set(keys) for field, keys in document.items()} for document in documents]
+        self.lexical = LexicalIndex(documents)
+        self.vector = VectorIndex(documents)
+        self._criteria = {}  # doc -> extracted eligibility, filled as schemes reach the reranker
+
+    @staticmethod
+    def _document(scheme):
+        return {field: phonetic_keys(str(scheme.get(field) or '')) for field in FIELD_WEIGHTS}
+
+    def _eligibility(self, doc):
+        if doc not in self._criteria:
+            scheme = self.schemes[doc]
+            self._criteria[doc] = extract_eligibility(scheme.get('eligibility'), scheme.get('category'))
+        return self._criteria[doc]
+
+    def _term_match(self, term, keys, fuzzy=False):
+        """1.0 for an exact key, the trigram similarity of the closest key for a near miss, else 0"""
+        if term in keys:
+            return 1.0
+        if not fuzzy:
+            return 0.0
+        best = max((trigram_similarity(term, key) for key in keys), default=0.0)
+        return best if best >= FUZZY_MATCH else 0.0
+
+    def rerank_scores(self, question, terms, candidates):
+        """[(doc, score)] for {doc: fused score} candidates, best first"""
+        asker = describe_asker(question)
+        top = max(candidates.values(), default=0.0) or 1.0
+        idf = {term: self.lexical.idf(term) for term in terms}
+        total_idf = sum(idf.values()) * sum(FIELD_WEIGHTS.values())
+        term_set = set(terms)
+        weights = self.weights
+        scored = []
+        for doc, fusion in candidates.items():
+            fields = self.fields[doc]
+            # Titles are matched fuzzily: misspelled scheme names are the common typo
+            overlap = sum(weight * idf[term] * self._term_match(term, fields[field], field == 'title')
+                          for field, weight in FIELD_WEIGHTS.items() for term in terms) / total_idf
+            # How much of the title the question accounts for: "kalyan laxmi" is the
+            # two-word scheme, not a longer title that merely contains both words
+            title = fields['title'] - STOP_KEYS
+            coverage = sum(self._term_match(key, term_set, True) for key in title) / len(title) if title else 0.0
+            score = (weights['fusion'] * fusion / top
+                     + weights['overlap'] * overlap
+                     + weights['title'] * coverage
+                     + weights['category'] * category_agreement(asker, self.schemes[doc].get('category'))
+                     + (weights['eligibility'] * eligibility_agreement(asker, self._eligibility(doc))
+                        if weights['eligibility'] else 0.0))
+            scored.append((doc, score))
+        return sorted(scored, key=lambda item: (-item[1], item[0]))
+
+    def rank(self, question, method='rerank', limit=10):
+        """Ranked scheme positions for question: 'lexical', 'vector', 'hybrid' (RRF) or 'rerank'"""
+        terms = query_terms(question)
+        if not terms:
+            return []
+        if method == 'lexical':
+            return self.lexical.search(terms, limit)
+        if method == 'vector':
+            return self.vector.search(terms, limit)
+
+        lexical = self.lexical.search(terms, self.depth)
+        vector = self.vector.search(terms, self.depth)
+        fused = reciprocal_rank_fusion([lexical, vector])
+        if method == 'hybrid':
+            return [doc for doc, _ in fused[:limit]]
+        if method != 'rerank':
+            raise ValueError(f"Unknown retrieval method '{method}'")
+
+        # Each retriever's head is reranked even when the other list never saw it,
+        # which RRF alone ranks below documents both lists placed in the middle
+        fused_scores = dict(fused)
+        candidates = {doc: fused_scores[doc] for doc in lexical[:self.rerank_depth] + vector[:self.rerank_depth]}
+        reranked = [doc for doc, _ in self.rerank_scores(question, terms, candidates)]
+        return (reranked + [doc for doc, _ in fused if doc not in candidates])[:limit]
+
+    def retrieve(self, question, limit=3):
+        """The limit most relevant scheme dicts for question"""
+        return [self.schemes[doc] for doc in self.rank(question, 'rerank', limit)]
+
+
+# Test retrieval
+if __name__ == "__main__":
+    import json
+
+    print("=" * 50)
+    print("HYBRID RETRIEVAL TEST")
+    print("=" * 50)
+
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        retriever = HybridRetriever(json.load(f))
+
+    for question in ['I am a farmer in Telangana, what support can I get?', 'rythu bandu',
+                     'pension for a 70 year old widow', 'loan for street vendor', 'రైతు బంధు']:
+        titles = [s['title'] for s in retriever.retrieve(question)]
+        print(f"   {question:<52} -> {titles}")
+    print("=" * 50)
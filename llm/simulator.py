@@ -0,0 +1,247 @@
+"""
+Local LLM simulator for offline load and latency testing.
+
+SimulatedModel answers like FakeModel (an echo of the prompt's text) but
+behaves like a hosted model under load: a sampled time to first token,
+output produced at a fixed token rate, per-minute request and token quotas
+that fail with 429 errors, and streaming (generate_content(prompt,
+stream=True) yields chunks as they are "generated"). Responses carry
+usage_metadata, so UsageTracker records exact token counts.
+
+Latency is drawn from an RNG seeded with (seed, prompt), so the same prompt
+takes the same time in every run regardless of thread scheduling.
+
+Select it with SARAL_LLM_BACKEND=simulator (no API key needed) and tune it
+with a spec string in SARAL_SIMULATOR, e.g.
+
+    latency=lognormal:0.8:0.4,tps=60,rpm=60,tpm=32000,fail=0.01,seed=1
+"""
+import math
+import random
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from llm.fake_model import FakeModel
+from llm.usage_tracker import estimate_tokens
+
+QUOTA_WINDOW = 60  # Seconds; quotas are per minute like the hosted API
+DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+
+class QuotaExceededError(RuntimeError):
+    pass
+
+
+class LatencyDistribution:
+    """
+    Time to first token in seconds. mean is the average; spread is the
+    half-width (uniform), standard deviation (normal) or sigma of the
+    underlying normal (lognormal, which gives the long right tail real
+    backends show). fixed and exponential ignore spread.
+    """
+
+    def __init__(self, kind='fixed', mean=0.0, spread=0.0):
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{kind}' (one of {', '.join(DISTRIBUTIONS)})")
+        self.kind = kind
+        self.mean = mean
+        self.spread = spread
+
+    @classmethod
+    def parse(cls, spec):
+        """'lognormal:0.8:0.4' -> LatencyDistribution('lognormal', 0.8, 0.4); a bare number is fixed"""
+        parts = str(spec).split(':')
+        if len(parts) == 1:
+            return cls('fixed', float(parts[0]))
+        return cls(parts[0], *(float(part) for part in parts[1:3]))
+
+    def sample(self, rng):
+        if self.mean <= 0:
+            return 0.0
+        if self.kind == 'uniform':
+            return max(0.0, rng.uniform(self.mean - self.spread, self.mean + self.spread))
+        if self.kind == 'normal':
+            return max(0.0, rng.gauss(self.mean, self.spread))
+        if self.kind == 'lognormal':
+            # mu chosen so the distribution's mean (not its median) is self.mean
+            return rng.lognormvariate(math.log(self.mean) - self.spread ** 2 / 2, self.spread)
+        if self.kind == 'exponential':
+            return rng.expovariate(1 / self.mean)
+        return self.mean
+
+    def __repr__(self):
+        return f"{self.kind}:{self.mean}:{self.spread}"
+
+
+class SimulatedResponse:
+    def __init__(self, text, prompt_tokens, completion_tokens):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(prompt_token_count=prompt_tokens,
+                                              candidates_token_count=completion_tokens)
+
+
+class SimulatedStream:
+    """Streaming response: iterate for chunks; .text waits for the whole reply"""
+
+    def __init__(self, chunks, first_token, seconds_per_chunk, prompt_tokens, completion_tokens):
+        self._chunks = chunks
+        self._first_token = first_token
+        self._seconds_per_chunk = seconds_per_chunk
+        self._received = []
+        self._done = False
+        self.usage_metadata = SimpleNamespace(prompt_token_count=prompt_tokens,
+                                              candidates_token_count=completion_tokens)
+
+    def __iter__(self):
+        if self._done:
+            yield from (SimpleNamespace(text=chunk) for chunk in self._received)
+            return
+        time.sleep(self._first_token)
+        for i, chunk in enumerate(self._chunks):
+            if i:
+                time.sleep(self._seconds_per_chunk)
+            self._received.append(chunk)
+            yield SimpleNamespace(text=chunk)
+        self._done = True
+
+    @property
+    def text(self):
+        if not self._done:
+            for _ in self:
+                pass
+        return ''.join(self._received)
+
+
+class SimulatedModel(FakeModel):
+    """
+    FakeModel with realistic timing and quotas.
+
+    latency: LatencyDistribution (or seconds) until the first token
+    tokens_per_second: output rate after the first token (0 = instant)
+    requests_per_minute / tokens_per_minute: quotas (0 = unlimited);
+        calls over quota raise QuotaExceededError immediately
+    fail_rate: injected non-quota failures (see FakeModel)
+    chunk_tokens: tokens per streamed chunk
+    """
+
+    def __init__(self, latency=0.0, tokens_per_second=0.0, requests_per_minute=0, tokens_per_minute=0,
+                 fail_rate=0.0, seed=0, chunk_tokens=8):
+        super().__init__(fail_rate=fail_rate, seed=seed)
+        if not isinstance(latency, LatencyDistribution):
+            latency = LatencyDistribution('fixed', float(latency))
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.chunk_tokens = chunk_tokens
+        self.seed = seed
+        self.quota_errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._window = deque()  # (admitted_at, tokens) within the last QUOTA_WINDOW seconds
+        self._window_tokens = 0
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build from 'latency=lognormal:0.8:0.4,tps=60,rpm=60,tpm=32000,fail=0.01,seed=1,chunk=8'"""
+        options = {
+            'latency': ('latency', LatencyDistribution.parse),
+            'tps': ('tokens_per_second', float),
+            'rpm': ('requests_per_minute', int),
+            'tpm': ('tokens_per_minute', int),
+            'fail': ('fail_rate', float),
+            'seed': ('seed', int),
+            'chunk': ('chunk_tokens', int)
+        }
+        kwargs = {}
+        for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+            key, _, value = item.partition('=')
+            if key not in options:
+                raise ValueError(f"Unknown simulator option '{key}' (one of {', '.join(options)})")
+            name, convert = options[key]
+            kwargs[name] = convert(value)
+        return cls(**kwargs)
+
+    def _admit(self, tokens):
+        """Count the call against the per-minute quotas, or raise QuotaExceededError"""
+        with self._lock:
+            now = time.monotonic()
+            while self._window and self._window[0][0] <= now - QUOTA_WINDOW:
+                self._window_tokens -= self._window.popleft()[1]
+            if self.requests_per_minute and len(self._window) >= self.requests_per_minute:
+                self.quota_errors += 1
+                raise QuotaExceededError("429 Resource has been exhausted (simulated requests per minute)")
+            if self.tokens_per_minute and self._window_tokens + tokens > self.tokens_per_minute:
+                self.quota_errors += 1
+                raise QuotaExceededError("429 Resource has been exhausted (simulated tokens per minute)")
+            self._window.append((now, tokens))
+            self._window_tokens += tokens
+
+    def generate_content(self, prompt, stream=False):
+        if self._should_fail():
+            raise self.error
+
+        text = self._reply(prompt)
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        self._admit(prompt_tokens + completion_tokens)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+        rng = random.Random(f"{self.seed}:{prompt}")
+        first_token = self.latency.sample(rng)
+        seconds_per_token = 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+        if stream:
+            chars_per_chunk = max(1, math.ceil(len(text) / max(1, completion_tokens) * self.chunk_tokens))
+            chunks = [text[i:i + chars_per_chunk] for i in range(0, len(text), chars_per_chunk)] or ['']
+            return SimulatedStream(chunks, first_token, seconds_per_token * self.chunk_tokens,
+                                   prompt_tokens, completion_tokens)
+
+        time.sleep(first_token + seconds_per_token * completion_tokens)
+        return SimulatedResponse(text, prompt_tokens, completion_tokens)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'failures': self.failures,
+                'quota_errors': self.quota_errors,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens
+            }
+
+
+# Test the simulator
+if __name__ == "__main__":
+    print("=" * 50)
+    print("LLM SIMULATOR TEST")
+    print("=" * 50)
+
+    model = SimulatedModel.from_spec("latency=lognormal:0.2:0.5,tps=200,rpm=5,seed=1")
+    prompt = "Translate to Hindi.\n\nText: Financial assistance to farmers per acre per season\n\nTranslation:"
+
+    start = time.perf_counter()
+    response = model.generate_content(prompt)
+    print(f"   Reply: {response.text} ({time.perf_counter() - start:.3f}s, "
+          f"{response.usage_metadata.candidates_token_count} tokens)")
+
+    start = time.perf_counter()
+    for i, chunk in enumerate(model.generate_content(prompt, stream=True)):
+        if i == 0:
+            print(f"   First chunk after {time.perf_counter() - start:.3f}s: {chunk.text!r}")
+    print(f"   Stream finished after {time.perf_counter() - start:.3f}s")
+
+    samples = [LatencyDistribution('lognormal', 1.0, 0.6).sample(random.Random(i)) for i in range(2000)]
+    samples.sort()
+    print(f"   lognormal(1.0, 0.6): mean {sum(samples) / len(samples):.2f}s, "
+          f"p50 {samples[1000]:.2f}s, p99 {samples[1980]:.2f}s")
+
+    for i in range(5):
+        try:
+            model.generate_content(f"Text: quota probe {i}")
+        except QuotaExceededError as e:
+            print(f"   Call {model.calls}: {e}")
+    print(f"   Stats: {model.get_stats()}")
+    print("=" * 50)
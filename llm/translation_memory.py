@@ -0,0 +1,160 @@
+"""
+Sentence/clause-level translation memory.
+
+Scheme texts repeat the same sentences and clauses ("Direct benefit
+transfer to bank account.", "SC/ST/BC/Minority families"). Each text is
+split into segments, segments already translated to the target language
+come from the translation_memory table, and only the unseen ones go to the
+model - all of them in one numbered batch prompt - before the text is
+stitched back together with its original separators.
+"""
+import re
+import threading
+
+from llm.usage_tracker import estimate_tokens
+from utils import metrics
+
+# Sentence ends keep their punctuation; clause commas/semicolons become separators
+SEGMENT_BREAK = re.compile(r'(?<=[.!?।])\s+|[,;]\s+|\n+')
+# A "sentence end" after these is an abbreviation ("Rs. 5,000")
+ABBREVIATIONS = ('rs.', 'no.', 'dr.', 'govt.', 'e.g.', 'i.e.', 'sh.', 'smt.', 'mr.', 'mrs.', 'st.', 'vs.', 'approx.')
+SPACES = re.compile(r'\s+')
+MAX_BATCH_SEGMENTS = 40  # Segments per model call
+NUMBERED_LINE = re.compile(r'^\s*(\d+)[.)]\s*(.*\S)\s*$')
+
+
+def segment(text):
+    """Split text into [(segment, separator)]; joining segment + separator restores text"""
+    pieces = []
+    start = 0
+    for match in SEGMENT_BREAK.finditer(text):
+        piece = text[start:match.start()]
+        last_word = piece.rsplit(None, 1)[-1].lower() if piece.strip() else ''
+        if match.group(0)[0].isspace() and (last_word in ABBREVIATIONS or re.fullmatch(r'\w\.', last_word)):
+            continue  # Abbreviation or initial, not a sentence end
+        pieces.append((piece, match.group(0)))
+        start = match.end()
+    pieces.append((text[start:], ''))
+    return [(piece, separator) for piece, separator in pieces if piece.strip() or separator]
+
+
+def normalize(piece):
+    return SPACES.sub(' ', piece).strip()
+
+
+def build_batch_prompt(segments, language):
+    lines = '\n'.join(f"{i}. {text}" for i, text in enumerate(segments, 1))
+    return f"""Translate each numbered line below to {language}.
+Reply with exactly {len(segments)} numbered lines in the same order.
+Only provide the translations, no additional text or explanations.
+
+{lines}
+
+Translations:"""
+
+
+def parse_batch_reply(reply, count):
+    """Translations in order; ValueError unless every number 1..count is present"""
+    found = {}
+    for line in reply.splitlines():
+        match = NUMBERED_LINE.match(line)
+        if match and 1 <= int(match.group(1)) <= count:
+            found.setdefault(int(match.group(1)), match.group(2))
+    if len(found) != count:
+        raise ValueError(f"Batch reply had {len(found)} of {count} numbered translations")
+    return [found[i] for i in range(1, count + 1)]
+
+
+class TranslationMemory:
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        # This process's counters; the table keeps the all-time totals
+        self.segments = 0
+        self.reused = 0
+        self.tokens_saved = 0
+
+    def translate_texts(self, texts, language, translate_batch):
+        """
+        Translate several texts, reusing stored segments.
+        translate_batch(list_of_segments, language) -> list of translations
+        """
+        segmented = [segment(text or '') for text in texts]
+        wanted = list(dict.fromkeys(
+            key for pieces in segmented for piece, _ in pieces if (key := normalize(piece))
+        ))
+        known = self.db.get_segment_translations(language, wanted)
+        unseen = [key for key in wanted if key not in known]
+
+        fresh = {}
+        for start in range(0, len(unseen), MAX_BATCH_SEGMENTS):
+            batch = unseen[start:start + MAX_BATCH_SEGMENTS]
+            fresh.update(zip(batch, translate_batch(batch, language)))
+        if fresh:
+            self.db.save_segment_translations(language, [
+                (source, target, estimate_tokens(source), estimate_tokens(target))
+                for source, target in fresh.items()
+            ])
+
+        saved = sum(estimate_tokens(source) + estimate_tokens(known[source]) for source in known)
+        with self._lock:
+            self.segments += len(wanted)
+            self.reused += len(known)
+            self.tokens_saved += saved
+        metrics.inc('translation_memory_segments_total', len(known), result='hit')
+        metrics.inc('translation_memory_segments_total', len(unseen), result='miss')
+
+        translations = {**known, **fresh}
+        results = []
+        for text, pieces in zip(texts, segmented):
+            if not text:
+                results.append(text)
+                continue
+            results.append(''.join(
+                (translations[normalize(piece)] if normalize(piece) else piece) + separator
+                for piece, separator in pieces
+            ))
+        return results
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'segments': self.segments,
+                'reused': self.reused,
+                'reuse_ratio': self.reused / self.segments if self.segments else 0.0,
+                'tokens_saved': self.tokens_saved
+            }
+
+
+# Test the translation memory
+if __name__ == "__main__":
+    import json
+    import os
+    import tempfile
+
+    from database.db_manager import DatabaseManager
+    from llm.fake_model import FakeModel
+    from llm.gemini_handler import GeminiHandler
+
+    print("=" * 50)
+    print("TRANSLATION MEMORY TEST")
+    print("=" * 50)
+
+    print(segment("Rs. 2,000 per month. Direct benefit transfer to bank account, no paperwork."))
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'tm.db'))
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        schemes = json.load(f)
+
+    model = FakeModel()
+    memory = TranslationMemory(db)
+    handler = GeminiHandler(model=model, memory=memory)
+    handler.min_request_interval = 0
+    for scheme in schemes + schemes:
+        handler.translate_scheme(scheme, 'Hindi')
+
+    stats = memory.get_stats()
+    print(f"   {model.calls} model calls for {2 * len(schemes)} schemes")
+    print(f"   Segment reuse: {stats['reused']}/{stats['segments']} ({stats['reuse_ratio']:.0%}), "
+          f"~{stats['tokens_saved']:,} tokens saved")
+    print("=" * 50)
@@ -1,61 +1,145 @@
-import os
+import json
 from database.db_manager import DatabaseManager
-from llm.gemini_handler import GeminiHandler
+from llm.gemini_handler import GeminiHandler, llm_available
+from llm.request_coalescer import default_coalescer, make_key
+from llm.circuit_breaker import CircuitOpenError
+from llm.usage_tracker import UsageTracker
+from llm.translation_memory import TranslationMemory
+from utils import metrics
+
+TEXT_FIELDS = ("title", "description", "eligibility", "benefits")
 
 class SchemeTranslator:
-    def __init__(self, db_manager: DatabaseManager = None):
+    def __init__(self, db_manager: DatabaseManager = None, gemini: GeminiHandler = None):
         self.db = db_manager or DatabaseManager()
-        self.gemini = None
+        self.coalescer = default_coalescer
+        self.usage = UsageTracker(self.db)
+        self.memory = TranslationMemory(self.db)
+        self.gemini = gemini
 
-        # Check if GOOGLE_API_KEY is available before initializing GeminiHandler
-        if os.getenv("GOOGLE_API_KEY"):
-            try:
-                self.gemini = GeminiHandler()
-            except Exception as e:
-                print(f"Warning: Failed to initialize GeminiHandler: {e}")
+    @property
+    def gemini(self):
+        """GeminiHandler, created on first translation (None if unavailable)"""
+        if not self._gemini_loaded:
+            self._gemini_loaded = True
+
+            # Check a backend is configured (GOOGLE_API_KEY or the simulator) before initializing GeminiHandler
+            if llm_available():
+                try:
+                    self._gemini = GeminiHandler(usage_tracker=self.usage, memory=self.memory)
+                except Exception as e:
+                    print(f"Warning: Failed to initialize GeminiHandler: {e}")
+        return self._gemini
+
+    @gemini.setter
+    def gemini(self, handler):
+        self._gemini = handler
+        self._gemini_loaded = handler is not None
+        if handler is not None and handler.usage is None:
+            handler.usage = self.usage
+        if handler is not None and handler.memory is None:
+            handler.memory = self.memory
+
+    def llm_configured(self) -> bool:
+        """Whether translations can use the LLM, without constructing the client"""
+        if self._gemini_loaded:
+            return self._gemini is not None
+        return llm_available()
+
+    def _get_cached(self, scheme: dict, target_language: str):
+        """Return the cached translation merged into scheme, or None"""
+        scheme_id = scheme.get("id")
+        if not scheme_id:
+            return None
+
+        cached = self.db.get_translation(scheme_id, target_language)
+        if not cached:
+            return None
+
+        # For an alias this is the canonical scheme's translation (see get_translation)
+        return {
+            **scheme,
+            "title": cached.get("translated_title") or scheme.get("title", ""),
+            "description": cached.get("translated_description") or scheme.get("description", ""),
+            "eligibility": cached.get("translated_eligibility") or scheme.get("eligibility", ""),
+            "benefits": cached.get("translated_benefits") or scheme.get("benefits", "")
+        }
 
     def translate_scheme(self, scheme: dict, target_language: str) -> dict:
         """
         Translate a scheme dict to target_language using caching in SQLite database.
         If target_language is 'English', returns the original scheme.
         If Gemini is unavailable or fails, returns original scheme as fallback.
+        Concurrent callers translating the same scheme share one model call.
+        Near-duplicate aliases (database/dedup.py) reuse their canonical scheme's
+        translation, so each duplicate cluster is translated once.
+        While the LLM circuit breaker is open, falls back immediately.
         """
         if not target_language or target_language == "English":
             return scheme
 
-        scheme_id = scheme.get("id")
-
         # Check translation cache in DB if scheme has an id
-        if scheme_id:
-            cached = self.db.get_translation(scheme_id, target_language)
-            if cached:
-                return {
-                    **scheme,
-                    "title": cached.get("translated_title") or scheme.get("title", ""),
-                    "description": cached.get("translated_description") or scheme.get("description", ""),
-                    "eligibility": cached.get("translated_eligibility") or scheme.get("eligibility", ""),
-                    "benefits": cached.get("translated_benefits") or scheme.get("benefits", "")
-                }
-
-        # If Gemini AI handler is available, perform translation
-        if self.gemini:
+        cached = self._get_cached(scheme, target_language)
+        if cached:
+            metrics.inc("translation_cache_total", result="hit", language=target_language)
+            self.usage.record_cache_hit(
+                "translate", target_language,
+                " ".join(str(scheme.get(f) or "") for f in ("title", "description", "eligibility", "benefits")),
+                " ".join(str(cached.get(f) or "") for f in ("title", "description", "eligibility", "benefits"))
+            )
+            return cached
+        metrics.inc("translation_cache_total", result="miss", language=target_language)
+
+        # If Gemini AI handler is available (and not tripped), perform translation
+        if self.gemini and not self.gemini.breaker.is_open():
+            source_scheme = self._source_scheme(scheme)
+            source = json.dumps(
+                [source_scheme.get(field) for field in ("id",) + TEXT_FIELDS],
+                ensure_ascii=False
+            )
+            key = make_key("translate_scheme", source, target_language)
             try:
-                translated = self.gemini.translate_scheme(scheme, target_language)
-
-                # Save to database cache if scheme has an id
-                if scheme_id:
-                    self.db.save_translation(scheme_id, target_language, {
-                        "title": translated.get("title", scheme.get("title", "")),
-                        "description": translated.get("description", scheme.get("description", "")),
-                        "eligibility": translated.get("eligibility", scheme.get("eligibility", "")),
-                        "benefits": translated.get("benefits", scheme.get("benefits", ""))
-                    })
-                return {
-                    **scheme,
-                    **translated
-                }
+                translated = self.coalescer.run(key, self._translate_and_cache, source_scheme, target_language)
+                if source_scheme is scheme:
+                    return translated
+                return {**scheme, **{field: translated[field] for field in TEXT_FIELDS}}
+            except CircuitOpenError:
+                pass
             except Exception as e:
                 print(f"Translation failed: {e}")
 
         # Fallback to original scheme
         return scheme
+
+    def _source_scheme(self, scheme: dict) -> dict:
+        """The record a translation is made from: the canonical scheme for a near-duplicate alias"""
+        scheme_id = scheme.get("id")
+        if not scheme_id:
+            return scheme
+        canonical_id = self.db.get_canonical_id(scheme_id)
+        if canonical_id == scheme_id:
+            return scheme
+        return self.db.get_scheme_by_id(canonical_id) or scheme
+
+    def _translate_and_cache(self, scheme: dict, target_language: str) -> dict:
+        """Run the model translation and store it (executed once per in-flight key)"""
+        # Another caller may have filled the cache between our miss and taking the lead
+        cached = self._get_cached(scheme, target_language)
+        if cached:
+            return cached
+
+        scheme_id = scheme.get("id")
+        translated = self.gemini.translate_scheme(scheme, target_language)
+
+        # Save to database cache if scheme has an id
+        if scheme_id:
+            self.db.save_translation(scheme_id, target_language, {
+                "title": translated.get("title", scheme.get("title", "")),
+                "description": translated.get("description", scheme.get("description", "")),
+                "eligibility": translated.get("eligibility", scheme.get("eligibility", "")),
+                "benefits": translated.get("benefits", scheme.get("benefits", ""))
+            })
+        return {
+            **scheme,
+            **translated
+        }
@@ -0,0 +1,115 @@
+"""
+Summarize LLM token usage and estimated cost.
+
+Usage:
+    python -m llm.usage_report
+    python -m llm.usage_report --days 7 --db database/schemes.db
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from database.db_manager import DatabaseManager
+
+
+def build_report(rows, input_price, output_price):
+    """Aggregate summary rows into spent vs. saved totals (prices per 1M tokens)"""
+    def cost(prompt_tokens, completion_tokens):
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+    spent = [r for r in rows if not r['cached']]
+    saved = [r for r in rows if r['cached']]
+
+    total_tokens = sum((r['prompt_tokens'] or 0) + (r['completion_tokens'] or 0) for r in spent)
+    lines = []
+    for r in spent:
+        tokens = (r['prompt_tokens'] or 0) + (r['completion_tokens'] or 0)
+        lines.append({
+            'feature': r['feature'],
+            'language': r['language'] or '-',
+            'calls': r['calls'],
+            'prompt_tokens': r['prompt_tokens'] or 0,
+            'completion_tokens': r['completion_tokens'] or 0,
+            'share': tokens / total_tokens if total_tokens else 0,
+            'avg_latency_ms': r['avg_latency_ms'] or 0,
+            'cost': cost(r['prompt_tokens'] or 0, r['completion_tokens'] or 0),
+            'estimated': r['estimated_calls'] == r['calls']
+        })
+
+    saved_prompt = sum(r['prompt_tokens'] or 0 for r in saved)
+    saved_completion = sum(r['completion_tokens'] or 0 for r in saved)
+    return {
+        'lines': lines,
+        'total_calls': sum(r['calls'] for r in spent),
+        'total_tokens': total_tokens,
+        'total_cost': sum(line['cost'] for line in lines),
+        'cache_hits': sum(r['calls'] for r in saved),
+        'saved_tokens': saved_prompt + saved_completion,
+        'saved_cost': cost(saved_prompt, saved_completion)
+    }
+
+
+def print_report(report):
+    print(f"{'Feature':<10} {'Language':<10} {'Calls':>7} {'Prompt tok':>11} {'Output tok':>11} "
+          f"{'Share':>7} {'Avg ms':>8} {'Cost $':>9}")
+    print("-" * 80)
+    for line in report['lines']:
+        marker = '*' if line['estimated'] else ' '
+        print(f"{line['feature']:<10} {line['language']:<10} {line['calls']:>7} "
+              f"{line['prompt_tokens']:>11,} {line['completion_tokens']:>11,} "
+              f"{line['share']:>7.1%} {line['avg_latency_ms']:>8.0f} {line['cost']:>8.4f}{marker}")
+    print("-" * 80)
+    print(f"Total: {report['total_calls']} model calls, {report['total_tokens']:,} tokens, "
+          f"${report['total_cost']:.4f}")
+    print(f"Cache: {report['cache_hits']} hits avoided ~{report['saved_tokens']:,} tokens "
+          f"(~${report['saved_cost']:.4f})")
+    print("* token counts estimated locally (no usage metadata from the SDK)")
+
+
+def print_memory_report(rows, input_price, output_price):
+    """Translation memory reuse; tokens saved are split by the default price ratio"""
+    segments = sum(r['segments'] for r in rows)
+    hits = sum(r['hits'] or 0 for r in rows)
+    tokens = sum(r['tokens_saved'] or 0 for r in rows)
+    # Each reuse skips the segment in the prompt and its translation in the output
+    price = (input_price + output_price) / 2
+    print(f"Translation memory: {segments:,} segments in {len(rows)} languages, reused {hits:,} times "
+          f"(reuse ratio {hits / (hits + segments) if segments else 0:.1%}), "
+          f"~{tokens:,} tokens saved (~${tokens * price / 1_000_000:.4f})")
+    for r in rows:
+        print(f"   {r['language']:<10} {r['segments']:>7,} segments {r['hits'] or 0:>8,} reuses "
+              f"{r['tokens_saved'] or 0:>10,} tokens")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LLM token usage and cost report")
+    parser.add_argument('--db', default='database/schemes.db', help="SQLite database path")
+    parser.add_argument('--days', type=int, help="Only include the last N days")
+    parser.add_argument('--input-price', type=float, default=0.50,
+                        help="USD per 1M prompt tokens (default: 0.50)")
+    parser.add_argument('--output-price', type=float, default=1.50,
+                        help="USD per 1M output tokens (default: 1.50)")
+    args = parser.parse_args(argv)
+
+    since = None
+    if args.days:
+        since = (datetime.utcnow() - timedelta(days=args.days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    db = DatabaseManager(args.db)
+    rows = db.get_usage_summary(since)
+
+    print("=" * 80)
+    print("LLM USAGE REPORT" + (f" (last {args.days} days)" if args.days else ""))
+    print("=" * 80)
+    if not rows:
+        print("No usage recorded yet.")
+    else:
+        print_report(build_report(rows, args.input_price, args.output_price))
+    
+    memory_rows = db.get_translation_memory_stats()
+    if memory_rows:
+        print("-" * 80)
+        print_memory_report(memory_rows, args.input_price, args.output_price)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import math
+import threading
+import time
+import weakref
+
+FEATURES = ('translate', 'simplify', 'explain', 'answer', 'chat')
+
+
+def estimate_tokens(text):
+    """
+    Rough local token estimate for when the SDK returns no usage data.
+    ~4 characters per token for Latin text; Indic scripts tokenize far
+    denser, so count ~2 characters per token there.
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / 4 + other_chars / 2)
+
+
+def usage_from_response(response):
+    """(prompt_tokens, completion_tokens) from a Gemini response, or None"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return None
+    prompt_tokens = getattr(usage, 'prompt_token_count', None)
+    completion_tokens = getattr(usage, 'candidates_token_count', None)
+    if prompt_tokens is None or completion_tokens is None:
+        return None
+    return prompt_tokens, completion_tokens
+
+
+def _drain(db, lock, buffer, hits):
+    """Write and clear a tracker's buffered rows; takes its state, not the tracker,
+    so it can run from the tracker's finalizer"""
+    with lock:
+        rows = buffer[:]
+        buffer.clear()
+        rows += [{
+            'feature': feature,
+            'language': language,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'estimated': True,
+            'cached': True,
+            'calls': calls
+        } for (feature, language), (calls, prompt_tokens, completion_tokens) in hits.items()]
+        hits.clear()
+    if not rows:
+        return 0
+    try:
+        return db.save_usage_batch(rows)
+    except Exception as e:
+        print(f"Usage logging error: {e}")
+        return 0
+
+
+class UsageTracker:
+    """
+    Buffers per-call token usage and writes it to SQLite in batches.
+    A batch is flushed when it reaches batch_size rows, when flush_interval
+    seconds have passed since the last flush, when the tracker is garbage
+    collected, or at interpreter exit.
+    Cache hits are summed per (feature, language) and written as one row each.
+    """
+
+    def __init__(self, db, batch_size=25, flush_interval=30):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._hits = {}  # (feature, language) -> [calls, prompt_tokens, completion_tokens]
+        self._lock = threading.Lock()
+        self._last_flush = time.time()
+        # Holds the state, not self: per-session trackers can still be collected
+        self._finalizer = weakref.finalize(self, _drain, db, self._lock, self._buffer, self._hits)
+
+    def record(self, feature, language=None, prompt_tokens=0, completion_tokens=0,
+               latency_ms=0, estimated=False, cached=False):
+        row = {
+            'feature': feature,
+            'language': language,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'latency_ms': latency_ms,
+            'estimated': estimated,
+            'cached': cached
+        }
+        with self._lock:
+            self._buffer.append(row)
+            due = (len(self._buffer) >= self.batch_size
+                   or time.time() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def record_call(self, feature, language, prompt, response_text, response=None, latency_ms=0):
+        """Record a model call, using SDK usage metadata when available"""
+        usage = usage_from_response(response) if response is not None else None
+        if usage:
+            prompt_tokens, completion_tokens = usage
+        else:
+            prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(response_text)
+        self.record(feature, language, prompt_tokens, completion_tokens,
+                    latency_ms=latency_ms, estimated=usage is None)
+
+    def record_cache_hit(self, feature, language, source_text, cached_text):
+        """Record the tokens a cache hit avoided (always estimated)"""
+        prompt_tokens, completion_tokens = estimate_tokens(source_text), estimate_tokens(cached_text)
+        with self._lock:
+            totals = self._hits.setdefault((feature, language), [0, 0, 0])
+            totals[0] += 1
+            totals[1] += prompt_tokens
+            totals[2] += completion_tokens
+            due = time.time() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.time()
+        return _drain(self.db, self._lock, self._buffer, self._hits)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer) + len(self._hits)
@@ -0,0 +1,479 @@
+"""
+Content-addressed archive of raw scraped pages.
+
+Every response the scraper fetches is kept, keyed by the SHA-256 of its
+body: a page that has not changed since the last crawl costs one `pages`
+row, not another copy. Bodies are compressed with zstd when `zstandard`
+is installed, otherwise zlib. Pages from one site share most of their
+markup (navigation, headers, footers), so once a site has DICT_MIN_SAMPLES
+pages a compression dictionary is trained on them and the site's pages
+are recompressed with it: zstd's trained dictionaries, or for zlib a
+preset dictionary (zdict) of the lines most of the site's pages share.
+
+Re-parsing after a selector fix streams the latest copy of each archived
+URL through the site parsers in a process pool, with no network access.
+
+Usage:
+    python -m scraper.page_store stats
+    python -m scraper.page_store reparse --workers 4 --load
+    python -m scraper.page_store train www.telangana.gov.in
+    python -m scraper.page_store selftest
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from collections import Counter
+from multiprocessing import Pool
+from urllib.parse import urlparse
+
+from utils import metrics
+
+DEFAULT_PATH = 'data/pages.db'
+DICT_MIN_SAMPLES = 8  # Pages of a site needed before its dictionary is trained
+DICT_SAMPLES = 64  # Most recent pages a dictionary is trained on
+ZLIB_DICT_SIZE = 32 * 1024  # deflate's window: bytes further back are never referenced
+ZSTD_DICT_SIZE = 64 * 1024
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 10
+
+
+class PageStoreError(Exception):
+    pass
+
+
+def available_codec():
+    try:
+        import zstandard  # noqa: F401 - optional, trains real dictionaries
+        return 'zstd'
+    except ImportError:
+        return 'zlib'
+
+
+def build_zlib_dictionary(samples, size=ZLIB_DICT_SIZE):
+    """Preset dictionary of the lines at least half of the samples share"""
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(sample.splitlines(keepends=True)))
+    threshold = max(2, len(samples) // 2)
+    shared = sorted((line for line, n in counts.items() if n >= threshold and len(line.strip()) > 3),
+                    key=lambda line: counts[line] * len(line), reverse=True)
+    chosen, total = [], 0
+    for line in shared:
+        if total + len(line) <= size:
+            chosen.append(line)
+            total += len(line)
+    # deflate reaches the end of the dictionary most cheaply: most valuable lines last
+    return b''.join(reversed(chosen))
+
+
+def train_dictionary(codec, samples):
+    """Dictionary bytes for codec trained on samples (None if there is too little to learn from)"""
+    if codec == 'zstd':
+        import zstandard
+        try:
+            return zstandard.train_dictionary(ZSTD_DICT_SIZE, samples).as_bytes()
+        except zstandard.ZstdError:
+            return None
+    return build_zlib_dictionary(samples) or None
+
+
+def compress(codec, data, dictionary=None):
+    if codec == 'zstd':
+        import zstandard
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+    if codec == 'zlib':
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL)
+        return compressor.compress(data) + compressor.flush()
+    raise PageStoreError(f"Unknown codec '{codec}'")
+
+
+def decompress(codec, data, dictionary=None):
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise PageStoreError("Page is zstd-compressed; pip install zstandard to read it")
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    if codec == 'zlib':
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+    raise PageStoreError(f"Unknown codec '{codec}'")
+
+
+class PageStore:
+    def __init__(self, path=DEFAULT_PATH, codec=None):
+        self.path = path
+        self.codec = codec or available_codec()
+        self._dictionaries = {}  # id -> bytes; a trained dictionary never changes
+        self._train_at = {}  # site -> blob count to retry at after training found nothing to learn
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        try:
+            self._create_schema(conn)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _create_schema(conn):
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                site TEXT,
+                codec TEXT NOT NULL,
+                dictionary_id INTEGER,
+                raw_bytes INTEGER NOT NULL,
+                stored_bytes INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_blobs_site ON blobs (site);
+
+            -- One row per fetch; the body lives in blobs, shared by identical fetches
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                site TEXT NOT NULL,
+                sha256 TEXT NOT NULL REFERENCES blobs (sha256),
+                status INTEGER,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_url ON pages (url, id);
+
+            CREATE TABLE IF NOT EXISTS dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                samples INTEGER,
+                data BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        ''')
+
+    def _dictionary(self, cursor, dictionary_id):
+        if dictionary_id is None:
+            return None
+        if dictionary_id not in self._dictionaries:
+            cursor.execute('SELECT data FROM dictionaries WHERE id = ?', (dictionary_id,))
+            self._dictionaries[dictionary_id] = bytes(cursor.fetchone()[0])
+        return self._dictionaries[dictionary_id]
+
+    def _site_dictionary_id(self, cursor, site):
+        """Newest dictionary for site in this store's codec, or None"""
+        cursor.execute('''
+            SELECT MAX(id) FROM dictionaries WHERE site = ? AND codec = ?
+        ''', (site, self.codec))
+        return cursor.fetchone()[0]
+
+    def put(self, url, content, status=200):
+        """Archive one fetched page body; returns its SHA-256"""
+        site = urlparse(url).netloc
+        digest = hashlib.sha256(content).hexdigest()
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM blobs WHERE sha256 = ?', (digest,))
+            new_blob = cursor.fetchone() is None
+            if new_blob:
+                dictionary_id = self._site_dictionary_id(cursor, site)
+                data = compress(self.codec, content, self._dictionary(cursor, dictionary_id))
+                cursor.execute('''
+                    INSERT INTO blobs (sha256, site, codec, dictionary_id, raw_bytes, stored_bytes, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (digest, site, self.codec, dictionary_id, len(content), len(data), data))
+                metrics.inc('page_store_bytes_total', len(content), kind='raw')
+                metrics.inc('page_store_bytes_total', len(data), kind='stored')
+            metrics.inc('page_store_puts_total', result='new' if new_blob else 'duplicate')
+            cursor.execute('INSERT INTO pages (url, site, sha256, status) VALUES (?, ?, ?, ?)',
+                           (url, site, digest, status))
+            conn.commit()
+
+            train = False
+            if new_blob and dictionary_id is None:
+                cursor.execute('SELECT COUNT(*) FROM blobs WHERE site = ?', (site,))
+                blobs = cursor.fetchone()[0]
+                train = blobs >= max(DICT_MIN_SAMPLES, self._train_at.get(site, 0))
+        finally:
+            conn.close()
+        if train:
+            self.train(site)
+        return digest
+
+    def _load(self, cursor, digest):
+        cursor.execute('SELECT codec, dictionary_id, data FROM blobs WHERE sha256 = ?', (digest,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        codec, dictionary_id, data = row
+        return decompress(codec, data, self._dictionary(cursor, dictionary_id))
+
+    def get(self, digest):
+        """Raw body for a SHA-256, or None"""
+        conn = self._connect()
+        try:
+            return self._load(conn.cursor(), digest)
+        finally:
+            conn.close()
+
+    def train(self, site):
+        """Train a new dictionary on site's recent pages and recompress all of them with it"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT sha256 FROM blobs WHERE site = ? ORDER BY rowid DESC LIMIT ?
+            ''', (site, DICT_SAMPLES))
+            samples = [self._load(cursor, digest) for (digest,) in cursor.fetchall()]
+            dictionary = train_dictionary(self.codec, samples)
+            if dictionary is None:
+                # Retrying on every put would decompress DICT_SAMPLES pages each time:
+                # wait until the site has twice as many pages to learn from
+                cursor.execute('SELECT COUNT(*) FROM blobs WHERE site = ?', (site,))
+                self._train_at[site] = 2 * cursor.fetchone()[0]
+                metrics.inc('page_store_train_failures_total')
+                return None
+
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('INSERT INTO dictionaries (site, codec, samples, data) VALUES (?, ?, ?, ?)',
+                           (site, self.codec, len(samples), dictionary))
+            dictionary_id = cursor.lastrowid
+            cursor.execute('SELECT SUM(stored_bytes) FROM blobs WHERE site = ?', (site,))
+            before = cursor.fetchone()[0]
+            cursor.execute('SELECT sha256 FROM blobs WHERE site = ?', (site,))
+            for (digest,) in cursor.fetchall():
+                data = compress(self.codec, self._load(cursor, digest), dictionary)
+                cursor.execute('''
+                    UPDATE blobs SET codec = ?, dictionary_id = ?, stored_bytes = ?, data = ?
+                    WHERE sha256 = ?
+                ''', (self.codec, dictionary_id, len(data), data, digest))
+            cursor.execute('SELECT COUNT(*), SUM(stored_bytes) FROM blobs WHERE site = ?', (site,))
+            blobs, after = cursor.fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        return {'site': site, 'dictionary_bytes': len(dictionary), 'blobs': blobs,
+                'stored_before': before, 'stored_after': after}
+
+    def iter_pages(self, site=None):
+        """Yield (url, site, body) for the latest fetch of every archived URL, streaming"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            where, params = ('AND p.site = ?', (site,)) if site else ('', ())
+            cursor.execute(f'''
+                SELECT p.url, p.site, b.codec, b.dictionary_id, b.data
+                FROM pages p JOIN blobs b ON b.sha256 = p.sha256
+                WHERE p.id IN (SELECT MAX(id) FROM pages GROUP BY url) {where}
+                ORDER BY p.id
+            ''', params)
+            lookup = conn.cursor()
+            for url, page_site, codec, dictionary_id, data in cursor:
+                yield url, page_site, decompress(codec, data, self._dictionary(lookup, dictionary_id))
+        finally:
+            conn.close()
+
+    def get_stats(self):
+        """Fetches, unique bodies and raw vs stored bytes, overall and per site"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT site, COUNT(*), COUNT(DISTINCT url) FROM pages GROUP BY site')
+            fetches = {site: (count, urls) for site, count, urls in cursor.fetchall()}
+            cursor.execute('''
+                SELECT site, COUNT(*), SUM(raw_bytes), SUM(stored_bytes), MAX(dictionary_id)
+                FROM blobs GROUP BY site
+            ''')
+            sites = {}
+            for site, blobs, raw, stored, dictionary_id in cursor.fetchall():
+                count, urls = fetches.get(site, (0, 0))
+                sites[site] = {'fetches': count, 'urls': urls, 'blobs': blobs, 'raw_bytes': raw,
+                               'stored_bytes': stored, 'dictionary': dictionary_id is not None}
+        finally:
+            conn.close()
+        raw = sum(s['raw_bytes'] for s in sites.values())
+        stored = sum(s['stored_bytes'] for s in sites.values())
+        return {
+            'fetches': sum(count for count, _ in fetches.values()),
+            'blobs': sum(s['blobs'] for s in sites.values()),
+            'raw_bytes': raw,
+            'stored_bytes': stored,
+            'ratio': raw / stored if stored else 0.0,
+            'sites': sites
+        }
+
+
+def _parse_page(page):
+    """Pool worker: (url, site, body) -> (url, schemes or None if no parser knows the site)"""
+    from scraper.scrape_schemes import PARSERS
+
+    url, site, body = page
+    parser = PARSERS.get(site)
+    return url, parser(body) if parser else None
+
+
+def reparse(store, workers=None, site=None):
+    """Run every archived page through its site parser; returns (schemes, stats)"""
+    workers = workers or os.cpu_count() or 1
+    totals = {'pages': 0, 'raw_bytes': 0}
+
+    def pages():
+        for page in store.iter_pages(site):
+            totals['pages'] += 1
+            totals['raw_bytes'] += len(page[2])
+            yield page
+
+    start = time.perf_counter()
+    schemes, unparsed = [], 0
+    site_schemes = Counter()  # Schemes per site that has a parser, including sites that yielded none
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        results = pool.imap(_parse_page, pages(), chunksize=4) if pool else map(_parse_page, pages())
+        for url, parsed in results:
+            if parsed is None:
+                unparsed += 1
+            else:
+                schemes.extend(parsed)
+                site_schemes[urlparse(url).netloc] += len(parsed)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+
+    return schemes, {
+        'pages': totals['pages'],
+        'unparsed_pages': unparsed,
+        'schemes': len(schemes),
+        'empty_sites': sorted(s for s, count in site_schemes.items() if count == 0),
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'pages_per_second': round(totals['pages'] / elapsed, 1) if elapsed else None,
+        'mb_per_second': round(totals['raw_bytes'] / elapsed / 1e6, 2) if elapsed else None
+    }
+
+
+def load_schemes(schemes, stats, db_path, site=None):
+    """Replace the catalogue in db_path with re-parsed schemes, refusing a partial re-parse
+
+    insert_schemes() clears the schemes table first, so a selector that broke on
+    one site (or a --site re-parse) would otherwise drop every other site's schemes.
+    """
+    if site:
+        raise PageStoreError("--load replaces the whole catalogue; re-parse every site, not --site")
+    if not stats['schemes']:
+        raise PageStoreError("Re-parse found no schemes; keeping the current catalogue")
+    if stats['empty_sites']:
+        raise PageStoreError(f"No schemes parsed from {', '.join(stats['empty_sites'])}; "
+                             f"keeping the current catalogue")
+
+    from database.db_manager import DatabaseManager
+    from database.dedup import dedupe_catalogue
+
+    db = DatabaseManager(db_path)
+    db.insert_schemes(schemes)
+    return dedupe_catalogue(db)['aliases']
+
+
+def selftest():
+    """Re-parse a throwaway archive whose pages yield no schemes; --load must keep the catalogue"""
+    import tempfile
+    from database.db_manager import DatabaseManager
+    from scraper.scrape_schemes import CENTRAL_URL, TELANGANA_URL, SchemesScraper
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(os.path.join(tmp, 'pages.db'))
+        store.put(TELANGANA_URL, b'<html><body><div class="moved">Schemes</div></body></html>')
+        store.put(CENTRAL_URL, b'<html><body><a href="/schemes/pm-kisan">PM-KISAN</a></body></html>')
+        db_path = os.path.join(tmp, 'schemes.db')
+        db = DatabaseManager(db_path)
+        db.insert_schemes(SchemesScraper().get_dummy_central_schemes())
+        before = len(db.get_all_schemes())
+
+        schemes, stats = reparse(store, workers=1)
+        assert stats['schemes'] == 1 and stats['empty_sites'] == [urlparse(TELANGANA_URL).netloc], stats
+        for site in (None, urlparse(CENTRAL_URL).netloc):
+            try:
+                load_schemes(schemes, stats, db_path, site)
+                raise AssertionError("partial re-parse was loaded")
+            except PageStoreError as e:
+                print(f"✅ Refused: {e}")
+
+        empty = PageStore(os.path.join(tmp, 'empty.db'))
+        empty.put(TELANGANA_URL, b'<html></html>')
+        schemes, stats = reparse(empty, workers=1)
+        try:
+            load_schemes(schemes, stats, db_path)
+            raise AssertionError("empty re-parse was loaded")
+        except PageStoreError as e:
+            print(f"✅ Refused: {e}")
+        assert len(db.get_all_schemes()) == before
+    print(f"✅ Catalogue kept ({before} schemes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or re-parse the raw page archive")
+    parser.add_argument('--store', default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('stats', help="Show storage per site")
+
+    reparse_parser = sub.add_parser('reparse', help="Re-run the parsers over archived pages (no network)")
+    reparse_parser.add_argument('--site', help="Only pages from this host")
+    reparse_parser.add_argument('--workers', type=int, help="Parser processes (default: CPU count)")
+    reparse_parser.add_argument('--output', help="Write the parsed schemes as JSON to this path")
+    reparse_parser.add_argument('--load', action='store_true', help="Replace the schemes in --db")
+    reparse_parser.add_argument('--db', default='database/schemes.db')
+
+    train_parser = sub.add_parser('train', help="Retrain a site's dictionary and recompress its pages")
+    train_parser.add_argument('site')
+
+    sub.add_parser('selftest', help="Check that --load refuses a re-parse that lost a site")
+
+    args = parser.parse_args()
+    if args.command == 'selftest':
+        selftest()
+        return
+    try:
+        store = PageStore(args.store)
+        if args.command == 'stats':
+            stats = store.get_stats()
+            print(f"📦 {stats['fetches']} fetches, {stats['blobs']} unique pages: "
+                  f"{stats['raw_bytes'] / 1024:.1f} KB raw -> {stats['stored_bytes'] / 1024:.1f} KB stored "
+                  f"({stats['ratio']:.1f}x, {store.codec})")
+            for site, s in stats['sites'].items():
+                print(f"   {site:<28} {s['urls']:>5} URLs {s['blobs']:>5} pages "
+                      f"{s['raw_bytes'] / max(1, s['stored_bytes']):>6.1f}x "
+                      f"{'📖 dictionary' if s['dictionary'] else ''}")
+        elif args.command == 'reparse':
+            schemes, stats = reparse(store, args.workers, args.site)
+            print(f"✅ Re-parsed {stats['pages']} pages into {stats['schemes']} schemes in {stats['seconds']}s "
+                  f"({stats['pages_per_second']} pages/s, {stats['mb_per_second']} MB/s, "
+                  f"{stats['workers']} workers; {stats['unparsed_pages']} pages without a parser)")
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(schemes, f, indent=2, ensure_ascii=False)
+                print(f"💾 Saved to {args.output}")
+            if args.load:
+                print(f"🔗 {load_schemes(schemes, stats, args.db, args.site)} duplicate schemes linked")
+        else:
+            result = store.train(args.site)
+            if result is None:
+                print(f"⚠️ Not enough pages from {args.site} to train a dictionary")
+            else:
+                print(f"✅ {result['site']}: {result['dictionary_bytes']:,} byte dictionary, {result['blobs']} pages "
+                      f"{result['stored_before'] / 1024:.1f} KB -> {result['stored_after'] / 1024:.1f} KB")
+    except (PageStoreError, sqlite3.Error, OSError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,87 @@ import requests
 from bs4 import BeautifulSoup
 import json
 import time
+from urllib.parse import urlparse
+from utils import metrics
+
+TELANGANA_URL = "https://www.telangana.gov.in/schemes"
+CENTRAL_URL = "https://www.india.gov.in/"
+
+
+def parse_telangana_page(content):
+    """Schemes listed on a telangana.gov.in schemes page"""
+    soup = BeautifulSoup(content, 'html.parser')
+    schemes = []
+    
+    # This will likely fail on first try - that's OK, we have dummy data
+    scheme_cards = soup.find_all('div', class_='scheme-item')[:10]
+    
+    for card in scheme_cards:
+        scheme = {
+            'title': card.find('h3').text.strip() if card.find('h3') else 'N/A',
+            'description': card.find('p').text.strip() if card.find('p') else 'N/A',
+            'category': 'Telangana State',
+            'url': card.find('a')['href'] if card.find('a') else '#',
+            'eligibility': 'Details available on official website',
+            'benefits': 'Details available on official website'
+        }
+        schemes.append(scheme)
+    return schemes
+
+
+def parse_central_page(content):
+    """Scheme links on the india.gov.in home page"""
+    soup = BeautifulSoup(content, 'html.parser')
+    schemes = []
+    
+    # Attempt to find schemes
+    scheme_links = soup.find_all('a', href=True)[:5]
+    
+    for link in scheme_links:
+        if 'scheme' in link.get('href', '').lower():
+            scheme = {
+                'title': link.text.strip(),
+                'description': 'Central Government Scheme',
+                'category': 'Central Government',
+                'url': link['href'],
+                'eligibility': 'Details available on official website',
+                'benefits': 'Details available on official website'
+            }
+            schemes.append(scheme)
+    return schemes
+
+
+# Page parsers by site, so archived pages can be re-parsed offline (scraper/page_store.py)
+PARSERS = {
+    urlparse(TELANGANA_URL).netloc: parse_telangana_page,
+    urlparse(CENTRAL_URL).netloc: parse_central_page
+}
+
 
 class SchemesScraper:
-    def __init__(self):
+    def __init__(self, page_store=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.page_store = page_store  # Keeps every raw response for offline re-parsing
+    
+    def _fetch(self, url):
+        """GET a page, recording fetch latency and size (and archiving it if a page store is set)"""
+        site = urlparse(url).netloc
+        start = time.perf_counter()
+        try:
+            response = requests.get(url, headers=self.headers, timeout=10)
+        except Exception:
+            metrics.inc('scraper_fetch_total', site=site, status='error')
+            raise
+        finally:
+            metrics.observe('scraper_fetch_seconds', time.perf_counter() - start, site=site)
+        
+        metrics.inc('scraper_fetch_total', site=site, status=str(response.status_code))
+        metrics.inc('scraper_fetch_bytes_total', len(response.content), site=site)
+        if self.page_store is not None:
+            self.page_store.put(url, response.content, response.status_code)
+        return response
         
     def scrape_telangana_schemes(self):
         """Scrape Telangana government schemes with fallback to dummy data"""
@@ -15,24 +90,9 @@ class SchemesScraper:
         
         try:
             # Try to scrape real data
-            url = "https://www.telangana.gov.in/schemes"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # This will likely fail on first try - that's OK, we have dummy data
-            scheme_cards = soup.find_all('div', class_='scheme-item')[:10]
+            response = self._fetch(TELANGANA_URL)
+            schemes = parse_telangana_page(response.content)
             
-            for card in scheme_cards:
-                scheme = {
-                    'title': card.find('h3').text.strip() if card.find('h3') else 'N/A',
-                    'description': card.find('p').text.strip() if card.find('p') else 'N/A',
-                    'category': 'Telangana State',
-                    'url': card.find('a')['href'] if card.find('a') else '#',
-                    'eligibility': 'Details available on official website',
-                    'benefits': 'Details available on official website'
-                }
-                schemes.append(scheme)
-                
         except Exception as e:
             print(f"Real scraping failed (expected): {e}")
             print("Using dummy data for prototype...")
@@ -48,25 +108,9 @@ class SchemesScraper:
         schemes = []
         
         try:
-            url = "https://www.india.gov.in/"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Attempt to find schemes
-            scheme_links = soup.find_all('a', href=True)[:5]
+            response = self._fetch(CENTRAL_URL)
+            schemes = parse_central_page(response.content)
             
-            for link in scheme_links:
-                if 'scheme' in link.get('href', '').lower():
-                    scheme = {
-                        'title': link.text.strip(),
-                        'description': 'Central Government Scheme',
-                        'category': 'Central Government',
-                        'url': link['href'],
-                        'eligibility': 'Details available on official website',
-                        'benefits': 'Details available on official website'
-                    }
-                    schemes.append(scheme)
-                    
         except Exception as e:
             print(f"Central scraping failed (expected): {e}")
             
@@ -182,18 +226,26 @@ class SchemesScraper:
             }
         ]
     
-    def scrape_all(self):
-        """Scrape all schemes and save to JSON"""
+    def scrape_all(self, progress_callback=None):
+        """
+        Scrape all schemes and save to JSON.
+        progress_callback(step, total_steps, message) is called between stages;
+        it may raise to abort the crawl (used for job cancellation).
+        """
+        report = progress_callback or (lambda step, total, message: None)
+        
         print("=" * 50)
         print("GOVERNMENT SCHEMES DATA SCRAPER")
         print("=" * 50)
         
+        report(0, 3, "Scraping Telangana State schemes")
         print("\n[1/2] Scraping Telangana State Schemes...")
         telangana = self.scrape_telangana_schemes()
         print(f"✅ Collected {len(telangana)} Telangana schemes")
         
         time.sleep(1)  # Be respectful to servers
         
+        report(1, 3, "Scraping Central Government schemes")
         print("\n[2/2] Scraping Central Government Schemes...")
         central = self.scrape_central_schemes()
         print(f"✅ Collected {len(central)} Central schemes")
@@ -201,6 +253,7 @@ class SchemesScraper:
         all_schemes = telangana + central
         
         # Save to JSON
+        report(2, 3, f"Saving {len(all_schemes)} schemes")
         print(f"\n💾 Saving {len(all_schemes)} total schemes to data/scraped_schemes.json...")
         with open('data/scraped_schemes.json', 'w', encoding='utf-8') as f:
             json.dump(all_schemes, f, indent=2, ensure_ascii=False)
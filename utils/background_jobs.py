@@ -0,0 +1,81 @@
+"""
+Job handlers for work that must not run on the Streamlit request thread:
+crawling + ingestion, bulk pre-translation and query-log compaction.
+"""
+from database.db_manager import DatabaseManager
+from database.dedup import dedupe_catalogue
+from database.job_queue import JobQueue, JobRunner
+
+
+def crawl_schemes(ctx):
+    """Scrape all sources and bring the schemes table in line with them"""
+    # Imported on demand: requests/bs4 are only needed here
+    from scraper.page_store import PageStore
+    from scraper.scrape_schemes import SchemesScraper
+
+    scraper = SchemesScraper(page_store=PageStore())  # Raw pages kept for offline re-parsing
+    schemes = scraper.scrape_all(
+        progress_callback=lambda step, total, message: ctx.report(0.9 * step / total, message)
+    )
+
+    ctx.report(0.9, f"Saving {len(schemes)} schemes to database")
+    db = DatabaseManager(ctx.queue.db_name)
+    if db.get_stats()['total_schemes']:
+        # Re-crawl: update in place so ids survive; only schemes whose text changed lose their translations
+        kept = {db.upsert_scheme(scheme) for scheme in schemes}
+        db.prune_schemes(kept)
+        inserted = len(kept)
+    else:
+        inserted = db.insert_schemes(schemes)
+
+    ctx.report(0.95, "Linking duplicate schemes")
+    duplicates = dedupe_catalogue(db)
+    return {'schemes': inserted, 'duplicates': duplicates['aliases']}
+
+
+def translate_all(ctx):
+    """Warm the translation cache for every scheme in one language"""
+    from llm.translator import SchemeTranslator
+
+    language = ctx.params['language']
+    db = DatabaseManager(ctx.queue.db_name)
+    translator = SchemeTranslator(db)
+    if not translator.llm_configured():
+        raise RuntimeError("GOOGLE_API_KEY not configured")
+
+    schemes = db.get_all_schemes(canonical_only=True)  # Aliases share their canonical translation
+    for i, scheme in enumerate(schemes):
+        translator.translate_scheme(scheme, language)
+        ctx.report((i + 1) / len(schemes), f"Translated {i + 1}/{len(schemes)} schemes to {language}")
+    translator.usage.flush()
+    return {'schemes': len(schemes), 'language': language}
+
+
+def compact_query_log(ctx):
+    """Roll raw search logs into hourly/daily aggregates and prune old rows"""
+    ctx.report(0.1, "Rolling up the query log")
+    return DatabaseManager(ctx.queue.db_name).compact_query_log()
+
+
+HANDLERS = {
+    'crawl': crawl_schemes,
+    'translate_all': translate_all,
+    'compact_query_log': compact_query_log
+}
+
+# Maintenance the job runner queues by itself: kind -> seconds between runs
+PERIODIC_JOBS = {
+    'compact_query_log': 3600
+}
+
+JOB_LABELS = {
+    'crawl': '🔄 Loading schemes data',
+    'translate_all': '🌐 Translating all schemes',
+    'compact_query_log': '🧹 Compacting search logs'
+}
+
+
+def start_job_runner(db_manager: DatabaseManager, workers=2):
+    """Start the worker pool for this process; it queues PERIODIC_JOBS from startup on"""
+    queue = JobQueue(db_manager)
+    return JobRunner(queue, HANDLERS, workers=workers, periodic=PERIODIC_JOBS).start()
@@ -0,0 +1,256 @@
+"""
+Structured predicates from free-text eligibility.
+
+"Farmers above 60 years or widows with income below Rs. 1 lakh" is split
+into clauses that are alternatives (any one qualifies), each clause is
+parsed with simple rules, and the clauses are merged by keeping the loosest
+bound per field. Commas are not split on: "Age 18-60, income below ..." is
+one clause whose limits all apply. The result is deliberately conservative:
+a field is only restricted when every clause restricts it, and a clause
+stating several limits for a field keeps the loosest, so profile matching
+may return extra candidates but never hides a scheme someone qualifies for.
+"""
+import re
+from functools import lru_cache
+
+# Bit positions for the multi-valued fields (stored as integer masks; 0 = anyone)
+SOCIAL_CATEGORIES = ['SC', 'ST', 'OBC', 'Minority', 'EWS', 'General']
+OCCUPATIONS = ['farmer', 'student', 'street_vendor', 'artisan', 'small_business',
+               'worker', 'fisherman', 'weaver']
+
+SOCIAL_PATTERNS = {
+    'SC': r'\bsc\b|scheduled castes?',
+    'ST': r'\bst\b|scheduled tribes?',
+    'OBC': r'\bbc\b|\bobc\b|backward class',
+    'Minority': r'minorit',
+    'EWS': r'\bews\b|economically weaker'
+}
+OCCUPATION_PATTERNS = {
+    'farmer': r'farmer|landholding|agricultural land|cultivator|rythu|kisan',
+    'student': r'student|studying|pupil',
+    'street_vendor': r'street vendor|hawker',
+    'artisan': r'artisan|craftsm',
+    'small_business': r'small business|micro[- ]enterprise|entrepreneur|msme',
+    'worker': r'labou?rer|construction worker|workers?\b',
+    'fisherman': r'fisherm|fisher folk|fishing',
+    'weaver': r'weaver|handloom'
+}
+SOCIAL_PATTERNS = {name: re.compile(pattern) for name, pattern in SOCIAL_PATTERNS.items()}
+OCCUPATION_PATTERNS = {name: re.compile(pattern) for name, pattern in OCCUPATION_PATTERNS.items()}
+FEMALE = re.compile(r'\bwom[ae]n\b|\bgirls?\b|\bwidows?\b|pregnant|\bmothers?\b|\bfemale|daughters?')
+MALE = re.compile(r'\bmen\b|\bmale\b|\bboys?\b')
+# A clause whose subject is whole families or people in general ("families with
+# daughters", "elderly persons and widows") names a gender only in passing
+EVERYONE = re.compile(r'\bfamil(?:y|ies)\b|\bhouseholds?\b|\bpersons?\b|\bpeople\b|\bparents?\b'
+                      r'|\belderly\b|senior citizens?')
+STATES = ['Telangana', 'Andhra Pradesh', 'Karnataka', 'Tamil Nadu', 'Maharashtra', 'Kerala']
+
+AGE_RANGE = re.compile(r'(?:aged?|between)\s*(\d{1,3})\s*(?:-|–|to|and)\s*(\d{1,3})')
+AGE_PLUS = re.compile(r'(?:aged?\s*(\d{1,3})\s*\+|(\d{1,3})\s*(?:years?)?\s*(?:and|or)\s*(?:above|older|more))')
+AGE_ABOVE = re.compile(r'(?:above|over|older than|at least)\s*(?:the age of\s*)?(\d{1,3})\s*years')
+AGE_BELOW = re.compile(r'(?:below|under|up ?to|less than|not exceeding)\s*(?:the age of\s*)?(\d{1,3})\s*years')
+ANY_AGE = re.compile(r'any age|all ages')
+SENIOR = re.compile(r'elderly|senior citizen|old age')
+
+INCOME = re.compile(
+    r'income[^.;]*?(?:less than|below|under|up ?to|not exceeding|within|<)\s*'
+    r'(?:rs\.?|inr|₹)?\s*([\d,]+(?:\.\d+)?)\s*(lakhs?|lacs?|crores?|k\b)?'
+)
+# Further amounts after an income limit ("... Rs. 1.5 lakhs (rural) and Rs. 2 lakhs (urban)")
+AMOUNT = re.compile(
+    r'(?:rs\.?|inr|₹)\s*(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lacs?|crores?|k\b)?'
+    r'|(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lacs?|crores?)\b'
+)
+UNITS = {'lakh': 100_000, 'lac': 100_000, 'crore': 10_000_000, 'k': 1_000}
+
+# Only "or"/"either" mark alternatives; commas, "and" and "with" list conditions that all apply
+CLAUSE_SPLIT = re.compile(r'\b(?:either|or)\b')
+
+UNRESTRICTED_AGE = (0, 150)
+
+
+def _mask(text, patterns, names):
+    mask = 0
+    for name, pattern in patterns.items():
+        if pattern.search(text):
+            mask |= 1 << names.index(name)
+    return mask
+
+
+def mask_names(mask, names):
+    return [name for i, name in enumerate(names) if mask & (1 << i)]
+
+
+def _rupees(amount, unit):
+    return int(float(amount.replace(',', '')) * UNITS.get((unit or '').rstrip('s'), 1))
+
+
+def parse_income(text):
+    """Highest income ceiling in rupees stated by one clause, or None"""
+    ceilings = []
+    for match in INCOME.finditer(text):
+        ceilings.append(_rupees(match.group(1), match.group(2)))
+        # Amounts that follow qualify the same limit for other groups
+        for amount in AMOUNT.finditer(text[match.end():].split(';')[0]):
+            ceilings.append(_rupees(amount.group(1) or amount.group(3), amount.group(2) or amount.group(4)))
+    return max(ceilings) if ceilings else None
+
+
+def parse_age(text):
+    """Loosest (min, max) age stated by one clause, or None when it says nothing about age"""
+    if ANY_AGE.search(text):
+        return UNRESTRICTED_AGE
+    ranges = [(int(low), int(high)) for low, high in AGE_RANGE.findall(text)]
+    lows = [int(next(g for g in m.groups() if g))
+            for pattern in (AGE_PLUS, AGE_ABOVE) for m in pattern.finditer(text)]
+    highs = [int(high) for high in AGE_BELOW.findall(text)]
+    if not (ranges or lows or highs):
+        if SENIOR.search(text):
+            return 60, UNRESTRICTED_AGE[1]
+        return None
+    if not ranges and len(lows) <= 1 and len(highs) <= 1:
+        # "above 18 years and below 60 years" is one bounded range
+        low, high = (lows or [UNRESTRICTED_AGE[0]])[0], (highs or [UNRESTRICTED_AGE[1]])[0]
+        if low <= high:
+            return low, high
+    # Several limits ("men above 60 years, women above 55 years"): any one may apply
+    bounds = ranges + [(low, UNRESTRICTED_AGE[1]) for low in lows] + [(UNRESTRICTED_AGE[0], high) for high in highs]
+    return min(low for low, _ in bounds), max(high for _, high in bounds)
+
+
+def parse_clause(clause):
+    """Predicates stated by one clause (None/0 = not restricted by it)"""
+    female, male, everyone = FEMALE.search(clause), MALE.search(clause), EVERYONE.search(clause)
+    gender = None
+    named = female or male
+    # "Men and women ..." is open to both; "Women from BPL households" is still about women
+    if named and not (female and male) and (not everyone or named.start() < everyone.start()):
+        gender = 'female' if female else 'male'
+    return {
+        'age': parse_age(clause),
+        'income_max': parse_income(clause),
+        'gender': gender,
+        'social_mask': _mask(clause, SOCIAL_PATTERNS, SOCIAL_CATEGORIES),
+        'occupation_mask': _mask(clause, OCCUPATION_PATTERNS, OCCUPATIONS)
+    }
+
+
+def extract_state(text, category=None):
+    for state in STATES:
+        if state.lower() in text:
+            return state
+    # The scraper labels state-run schemes "<State> State"
+    for state in STATES:
+        if category and category.lower().startswith(state.lower()):
+            return state
+    return None
+
+
+def extract_eligibility(text, category=None):
+    """Structured eligibility for one scheme, ready for the scheme_eligibility table"""
+    return dict(_extract((text or '').lower(), category))
+
+
+@lru_cache(maxsize=16384)  # Catalogues repeat the same few eligibility phrasings
+def _extract(text, category):
+    clauses = [parse_clause(c) for c in CLAUSE_SPLIT.split(text) if c.strip()] or [parse_clause('')]
+
+    # Alternatives: a field is restricted only if every clause restricts it
+    ages = [c['age'] for c in clauses]
+    if all(ages):
+        age_min, age_max = min(a[0] for a in ages), max(a[1] for a in ages)
+    else:
+        age_min, age_max = UNRESTRICTED_AGE
+
+    incomes = [c['income_max'] for c in clauses]
+    income_max = None if None in incomes else max(incomes)
+
+    genders = {c['gender'] for c in clauses}
+    social_masks = [c['social_mask'] for c in clauses]
+    occupation_masks = [c['occupation_mask'] for c in clauses]
+
+    social_mask = 0 if 0 in social_masks else _union(social_masks)
+    occupation_mask = 0 if 0 in occupation_masks else _union(occupation_masks)
+
+    return (
+        ('age_min', age_min),
+        ('age_max', age_max),
+        ('income_max', income_max),
+        ('gender', genders.pop() if len(genders) == 1 and None not in genders else ''),
+        ('state', extract_state(text, category) or ''),
+        ('social_mask', social_mask),
+        ('occupation_mask', occupation_mask)
+    )
+
+
+def _union(masks):
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+def describe(criteria):
+    """Human-readable summary of extracted criteria"""
+    parts = []
+    if (criteria['age_min'], criteria['age_max']) != UNRESTRICTED_AGE:
+        if criteria['age_max'] == UNRESTRICTED_AGE[1]:
+            parts.append(f"age {criteria['age_min']}+")
+        else:
+            parts.append(f"age {criteria['age_min']}-{criteria['age_max']}")
+    if criteria['income_max']:
+        parts.append(f"income ≤ Rs. {criteria['income_max']:,}")
+    if criteria['gender']:
+        parts.append(criteria['gender'])
+    if criteria['state']:
+        parts.append(criteria['state'])
+    if criteria['social_mask']:
+        parts.append('/'.join(mask_names(criteria['social_mask'], SOCIAL_CATEGORIES)))
+    if criteria['occupation_mask']:
+        parts.append(', '.join(mask_names(criteria['occupation_mask'], OCCUPATIONS)))
+    return '; '.join(parts) or 'open to all'
+
+
+# Test extraction
+if __name__ == "__main__":
+    import json
+
+    print("=" * 50)
+    print("ELIGIBILITY EXTRACTION TEST")
+    print("=" * 50)
+
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        schemes = json.load(f)
+
+    for scheme in schemes:
+        criteria = extract_eligibility(scheme['eligibility'], scheme['category'])
+        print(f"   {scheme['title']:<28} -> {describe(criteria)}")
+
+    cases = {
+        'Women aged 18-40': 'female',
+        'Women from BPL households': 'female',
+        'Men and women above 60 years': '',
+        'Elderly persons and widows': '',
+        'Families with daughters below 10 years': '',
+        'Households with a girl child': '',
+        'Boys studying in class 10': 'male'
+    }
+    for text, gender in cases.items():
+        got = extract_eligibility(text)['gender']
+        assert got == gender, f"{text!r}: gender {got!r}, expected {gender!r}"
+    print(f"✅ {len(cases)} gender phrasings parsed as expected")
+
+    cases = {
+        'Farmers aged above 60 years or widows with income less than Rs. 1 lakh': (0, 150, None),
+        'Income below Rs. 1.5 lakhs (rural) and Rs. 2 lakhs (urban)': (0, 150, 200_000),
+        'Age 18-60, income less than Rs. 1,00,000': (18, 60, 100_000),
+        'Above 18 years and below 60 years': (18, 60, None),
+        'Men above 60 years, women above 55 years': (55, 150, None),
+        'SC/ST families with income below Rs. 2 lakhs or BC families with income below Rs. 1 lakh': (0, 150, 200_000)
+    }
+    for text, expected in cases.items():
+        criteria = extract_eligibility(text)
+        got = criteria['age_min'], criteria['age_max'], criteria['income_max']
+        assert got == expected, f"{text!r}: {got}, expected {expected}"
+    print(f"✅ {len(cases)} age/income phrasings parsed as expected")
+    print("=" * 50)
@@ -0,0 +1,219 @@
+"""
+Lightweight in-process instrumentation.
+
+Counters and histograms are aggregated in memory and can be exported in
+Prometheus text format. Collection is off unless SARAL_METRICS=1 (or
+enable() is called); when off, instrumented calls cost one global check.
+"""
+import functools
+import os
+import threading
+import time
+
+# Seconds; covers sub-millisecond SQLite reads up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+
+_enabled = os.getenv('SARAL_METRICS', '').lower() in ('1', 'true', 'yes')
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile from bucket upper bounds"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}  # name -> {label_key: value}
+        self.histograms = {}  # name -> {label_key: Histogram}
+        self.histogram_buckets = {}
+
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, buckets=None, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            buckets = self.histogram_buckets.setdefault(name, buckets or DEFAULT_BUCKETS)
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.histogram_buckets.clear()
+
+    def snapshot(self):
+        """Flat rows for display: one per series"""
+        rows = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                for key, value in sorted(series.items()):
+                    rows.append({'metric': name, 'labels': dict(key), 'type': 'counter', 'value': value})
+            for name, series in sorted(self.histograms.items()):
+                for key, h in sorted(series.items()):
+                    rows.append({
+                        'metric': name,
+                        'labels': dict(key),
+                        'type': 'histogram',
+                        'count': h.count,
+                        'sum': h.sum,
+                        'avg': h.sum / h.count if h.count else 0.0,
+                        'p50': h.quantile(0.5),
+                        'p95': h.quantile(0.95)
+                    })
+        return rows
+
+    def render_prometheus(self, prefix='saral_'):
+        """Export everything in Prometheus text exposition format"""
+        lines = []
+
+        def fmt_labels(key, extra=None):
+            items = list(key) + (extra or [])
+            if not items:
+                return ''
+            body = ','.join(f'{k}="{str(v)}"' for k, v in items)
+            return '{' + body + '}'
+
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                metric = prefix + name
+                lines.append(f'# TYPE {metric} counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f'{metric}{fmt_labels(key)} {value}')
+
+            for name, series in sorted(self.histograms.items()):
+                metric = prefix + name
+                lines.append(f'# TYPE {metric} histogram')
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(h.buckets) + ['+Inf'], h.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{metric}_bucket{fmt_labels(key, [("le", bound)])} {cumulative}')
+                    lines.append(f'{metric}_sum{fmt_labels(key)} {h.sum}')
+                    lines.append(f'{metric}_count{fmt_labels(key)} {h.count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def inc(name, value=1, **labels):
+    """Increment a counter (no-op when disabled)"""
+    if _enabled:
+        registry.inc(name, value, **labels)
+
+
+def observe(name, value, buckets=None, **labels):
+    """Record a histogram sample (no-op when disabled)"""
+    if _enabled:
+        registry.observe(name, value, buckets, **labels)
+
+
+def timed(name, **labels):
+    """Decorator recording call latency into histogram `name`, labelled op=<function name>"""
+    def decorator(func):
+        op_labels = {'op': func.__name__, **labels}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                registry.inc(name.replace('_seconds', '_errors_total'), **op_labels)
+                raise
+            finally:
+                registry.observe(name, time.perf_counter() - start, **op_labels)
+        return wrapper
+    return decorator
+
+
+def render_prometheus():
+    return registry.render_prometheus()
+
+
+# Test the registry
+if __name__ == "__main__":
+    print("=" * 50)
+    print("METRICS TEST")
+    print("=" * 50)
+
+    def plain(n):
+        return sum(range(n))
+
+    work = timed('demo_call_seconds')(plain)
+
+    calls = 200_000
+    start = time.perf_counter()
+    for _ in range(calls):
+        plain(10)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        work(10)
+    disabled = time.perf_counter() - start
+
+    enable()
+    start = time.perf_counter()
+    for _ in range(calls):
+        work(10)
+    enabled = time.perf_counter() - start
+
+    print(f"   Overhead per call - disabled: {(disabled - baseline) / calls * 1e9:.0f} ns, "
+          f"enabled: {(enabled - baseline) / calls * 1e9:.0f} ns")
+    inc('demo_total', kind='test')
+    print()
+    print(render_prometheus()[:600])
+    print("=" * 50)
@@ -0,0 +1,168 @@
+"""
+Cache for rendered scheme fragments.
+
+Scheme cards only change when the scheme or its translation changes, yet
+every Streamlit rerun re-translated (one cache lookup per scheme) and
+re-formatted each of them. Fragments are kept in a bounded LRU keyed by
+(content hash of the source scheme, language, view, data signature); a
+reload gives schemes new ids and so new keys, and untranslated fallbacks are
+never stored, so a translation that arrives later replaces the English card
+on the next run. The data signature (DatabaseManager.get_data_signature)
+moves when a translation is rewritten in place or aliases are relinked,
+which the scheme's own content does not show.
+The same LRU backs the API's response cache (api/server.py).
+"""
+import hashlib
+import html
+import json
+import threading
+from collections import OrderedDict
+
+from utils import metrics
+from utils.eligibility import describe as describe_eligibility
+
+CONTENT_FIELDS = ('id', 'title', 'description', 'category', 'url', 'eligibility', 'benefits')
+
+
+def content_hash(scheme):
+    """Stable hash of the fields a fragment is rendered from"""
+    payload = json.dumps([scheme.get(field) for field in CONTENT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class FragmentCache:
+    """Thread-safe LRU shared by all sessions"""
+
+    def __init__(self, max_entries=5000, name='render'):
+        self.max_entries = max_entries
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        metrics.inc('fragment_cache_total', cache=self.name, result='miss' if value is None else 'hit')
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0
+            }
+
+
+def _text(value):
+    return html.escape(str(value or ''))
+
+
+def render_fragment(display_scheme, view, criteria=None):
+    """Markup for one scheme in a view: 'card' and 'eligibility' are HTML, 'browse' is markdown parts"""
+    if view == 'card':
+        return f"""
+            <div class="scheme-card">
+                <h3>📄 {_text(display_scheme['title'])}</h3>
+                <p><strong>🏷️ Category:</strong> {_text(display_scheme['category'])}</p>
+                <p><strong>📝 Description:</strong> {_text(display_scheme['description'])}</p>
+                <p><strong>💰 Benefits:</strong> {_text(display_scheme['benefits'])}</p>
+            </div>
+        """
+    if view == 'eligibility':
+        return f"""
+            <div class="scheme-card">
+                <h3>📄 {_text(display_scheme['title'])}</h3>
+                <p><strong>👥 Eligibility:</strong> {_text(display_scheme['eligibility'])}</p>
+                <p><strong>🔍 Criteria:</strong> {_text(describe_eligibility(criteria))}</p>
+                <p><strong>💰 Benefits:</strong> {_text(display_scheme['benefits'])}</p>
+            </div>
+        """
+    if view == 'browse':
+        main = (f"**📝 Description:**\n\n{display_scheme['description']}\n\n"
+                f"**✅ Eligibility:**\n\n{display_scheme['eligibility']}\n\n"
+                f"**💰 Benefits:**\n\n{display_scheme['benefits']}")
+        side = f"**🏷️ Category:**\n\n{display_scheme['category']}"
+        if display_scheme.get('url') and display_scheme['url'] != '#':
+            side += f"\n\n**🔗 [Visit Website]({display_scheme['url']})**"
+        return {'title': f"📄 {display_scheme['title']}", 'main': main, 'side': side}
+    raise ValueError(f"Unknown view '{view}'")
+
+
+def cached_fragment(cache, translator, scheme, language, view, signature=None):
+    """Rendered fragment for scheme in language, translating and rendering only on a miss"""
+    key = (content_hash(scheme), language, view, signature)
+    fragment = cache.get(key)
+    if fragment is None:
+        display_scheme = translator.translate_scheme(scheme, language)
+        fragment = render_fragment(display_scheme, view, scheme.get('criteria'))
+        # translate_scheme() hands back the source scheme itself when it fell back to English
+        if display_scheme is not scheme or language == 'English':
+            cache.put(key, fragment)
+    return fragment
+
+
+# Test the cache
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    from database.db_manager import DatabaseManager
+    from llm.fake_model import FakeModel
+    from llm.gemini_handler import GeminiHandler
+    from llm.translator import SchemeTranslator
+
+    print("=" * 50)
+    print("RENDER CACHE TEST")
+    print("=" * 50)
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), 'render.db'))
+    with open('data/scraped_schemes.json', 'r', encoding='utf-8') as f:
+        db.insert_schemes(json.load(f))
+    translator = SchemeTranslator(db)
+    translator.gemini = GeminiHandler(model=FakeModel())
+    translator.gemini.min_request_interval = 0
+    schemes = db.get_all_schemes()
+
+    cache = FragmentCache()
+    for run in range(3):
+        start = time.perf_counter()
+        for scheme in schemes:
+            for view in ('card', 'browse'):
+                cached_fragment(cache, translator, scheme, 'Hindi', view)
+        print(f"   Rerun {run + 1}: {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(f"   {cache.get_stats()}")
+
+    # A translation rewritten in place keeps the scheme's content hash; the signature moves
+    scheme = schemes[0]
+    signature = db.get_data_signature()
+    before = cached_fragment(cache, translator, scheme, 'Hindi', 'card', signature)
+    db.save_translation(scheme['id'], 'Hindi', {'title': 'संशोधित शीर्षक', 'description': '', 'benefits': ''})
+    after = cached_fragment(cache, translator, scheme, 'Hindi', 'card', db.get_data_signature())
+    assert 'संशोधित शीर्षक' in after and after != before
+    print("   ✅ Re-translated card re-rendered")
+    print("=" * 50)
@@ -0,0 +1,155 @@
+"""
+Indic-script to Latin transliteration and romanization-insensitive keys.
+
+The Devanagari, Telugu, Tamil and Kannada Unicode blocks share one layout
+(inherited from ISCII), so a single offset table covers all four scripts.
+phonetic_key() then folds spelling variants ("raithu", "rythu", "రైతు")
+onto one key so native-script, romanized and English queries meet.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+SCRIPT_BLOCKS = {
+    'Devanagari': 0x0900,
+    'Tamil': 0x0B80,
+    'Telugu': 0x0C00,
+    'Kannada': 0x0C80
+}
+
+# Offsets within a block
+VOWELS = {
+    0x05: 'a', 0x06: 'aa', 0x07: 'i', 0x08: 'ii', 0x09: 'u', 0x0A: 'uu', 0x0B: 'ru',
+    0x0E: 'e', 0x0F: 'e', 0x10: 'ai', 0x12: 'o', 0x13: 'o', 0x14: 'au'
+}
+CONSONANTS = {
+    0x15: 'k', 0x16: 'kh', 0x17: 'g', 0x18: 'gh', 0x19: 'ng',
+    0x1A: 'ch', 0x1B: 'chh', 0x1C: 'j', 0x1D: 'jh', 0x1E: 'ny',
+    0x1F: 't', 0x20: 'th', 0x21: 'd', 0x22: 'dh', 0x23: 'n',
+    0x24: 't', 0x25: 'th', 0x26: 'd', 0x27: 'dh', 0x28: 'n', 0x29: 'n',
+    0x2A: 'p', 0x2B: 'ph', 0x2C: 'b', 0x2D: 'bh', 0x2E: 'm',
+    0x2F: 'y', 0x30: 'r', 0x31: 'r', 0x32: 'l', 0x33: 'l', 0x34: 'zh', 0x35: 'v',
+    0x36: 'sh', 0x37: 'sh', 0x38: 's', 0x39: 'h'
+}
+VOWEL_SIGNS = {
+    0x3E: 'aa', 0x3F: 'i', 0x40: 'ii', 0x41: 'u', 0x42: 'uu', 0x43: 'ru',
+    0x46: 'e', 0x47: 'e', 0x48: 'ai', 0x4A: 'o', 0x4B: 'o', 0x4C: 'au'
+}
+MARKS = {0x01: 'n', 0x02: 'm', 0x03: 'h'}  # Candrabindu, anusvara, visarga
+VIRAMA = 0x4D
+NUKTA = 0x3C
+
+ANUSVARA_BEFORE = re.compile(r'm(?=[kgcjtdnpbsh])')
+
+
+def _block_offset(ch):
+    code = ord(ch)
+    for base in SCRIPT_BLOCKS.values():
+        if base <= code < base + 0x80:
+            return code - base
+    return None
+
+
+def is_indic(text):
+    return any(_block_offset(ch) is not None for ch in text)
+
+
+def transliterate(text):
+    """Romanize Devanagari/Telugu/Tamil/Kannada text; other characters pass through"""
+    out = []
+    pending_a = False  # Inherent vowel of the previous consonant
+
+    for ch in text:
+        offset = _block_offset(ch)
+        if offset is None:
+            if pending_a:
+                out.append('a')
+                pending_a = False
+            out.append(ch)
+            continue
+
+        if offset in CONSONANTS:
+            if pending_a:
+                out.append('a')
+            out.append(CONSONANTS[offset])
+            pending_a = True
+        elif offset in VOWEL_SIGNS:
+            out.append(VOWEL_SIGNS[offset])
+            pending_a = False
+        elif offset == VIRAMA:
+            pending_a = False
+        elif offset == NUKTA:
+            continue
+        else:
+            if pending_a:
+                out.append('a')
+                pending_a = False
+            if offset in VOWELS:
+                out.append(VOWELS[offset])
+            elif offset in MARKS:
+                out.append(MARKS[offset])
+            elif 0x66 <= offset <= 0x6F:
+                out.append(str(offset - 0x66))
+
+    if pending_a:
+        out.append('a')
+
+    # Anusvara is pronounced as the nasal of the following consonant
+    return ANUSVARA_BEFORE.sub('n', ''.join(out))
+
+
+# Applied in order to a lowercase romanization
+PHONETIC_RULES = [
+    (re.compile(r'(?<=[^aeiou])y(?=[^aeiouy]|$)'), 'ai'),  # rythu -> raithu
+    (re.compile(r'x'), 'ks'),                              # laxmi -> laksmi
+    (re.compile(r'[st]ion'), 'shan'),                      # pension -> penshan
+    (re.compile(r'([kgcjtdpb])h'), r'\1'),                 # aspirates: th -> t, bh -> b
+    (re.compile(r'sh'), 's'),
+    (re.compile(r'ph|f'), 'p'),
+    (re.compile(r'w'), 'v'),
+    (re.compile(r'z'), 'j'),
+    (re.compile(r'q|ck'), 'k'),
+    (re.compile(r'ee|ii|ie'), 'i'),
+    (re.compile(r'oo|uu'), 'u'),
+    (re.compile(r'aa'), 'a'),
+    (re.compile(r'(.)\1+'), r'\1'),                        # collapse doubled letters
+]
+
+
+@lru_cache(maxsize=65536)  # Scheme vocabulary is small and highly repetitive
+def phonetic_key(token):
+    """Romanization-insensitive key for one word (any supported script)"""
+    if is_indic(token):
+        token = transliterate(token)
+    token = unicodedata.normalize('NFKD', token.lower())
+    token = ''.join(ch for ch in token if ch.isascii() and ch.isalnum())
+    for pattern, replacement in PHONETIC_RULES:
+        token = pattern.sub(replacement, token)
+    # Drop a trailing schwa so "kisaana"/"kisan" and "raitu"/"raithu" agree
+    if len(token) > 3 and token.endswith('a') and token[-2] not in 'aeiou':
+        token = token[:-1]
+    return token
+
+
+# \w alone splits words at Indic vowel signs and virama (combining marks)
+WORD = re.compile(r'[\w\u0900-\u0DFF\u200C\u200D]+')
+
+
+def tokenize(text):
+    """Split text into words, keeping Indic combining marks attached"""
+    return [m.group(0) for m in WORD.finditer(text or '')]
+
+
+def phonetic_keys(text):
+    return [key for key in (phonetic_key(token) for token in tokenize(text)) if key]
+
+
+# Test transliteration
+if __name__ == "__main__":
+    print("=" * 50)
+    print("TRANSLITERATION TEST")
+    print("=" * 50)
+    for word in ['రైతు', 'raithu', 'rythu', 'रैतु', 'किसान', 'kisan', 'పెన్షన్', 'pension',
+                 'ரைது', 'ರೈತ', 'बंधु', 'bandhu', 'पेंशन', 'laxmi', 'lakshmi']:
+        print(f"   {word:<10} -> {transliterate(word):<12} key: {phonetic_key(word)}")
+    print("=" * 50)